@@ -0,0 +1,88 @@
+'''
+Accuracy per dof of linear (T3) and quadratic (T6) triangles.
+
+    python benchmarks/accuracy.py --tol 2e-3 --output accuracy.json
+
+The cantilever of examples/cantilever_convergence.py (10 x 1, end shear traction) is refined
+for both element families until the tip deflection is within --tol of a fine T6 reference.
+For every mesh the table lists dofs, nnz of K and the solve time; the summary compares the
+first T3 and T6 meshes meeting the tolerance.
+'''
+from __future__ import annotations
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from pyfemlite.fem.elasticity2d import solve_elasticity_t3
+from pyfemlite.fem.materials import D_plane_stress
+from pyfemlite.mesh.mesh import Mesh
+from pyfemlite.mesh.quadratic import t3_to_t6
+from pyfemlite.mesh.structured_tri import structured_rectangle_tri
+from pyfemlite.post.beam_verify import tip_deflection_right_edge
+
+L, H, E, NU, T0 = 10.0, 1.0, 210e9, 0.3, 1e6
+
+def cantilever_tip(nx: int, ny: int, quadratic: bool) -> dict:
+    '''Tip deflection of the cantilever on an nx x ny grid of T3 or T6 elements.'''
+    X, T, boundary = structured_rectangle_tri(nx, ny, xlim=(0.0, L), ylim=(0.0, H))
+    if quadratic:
+        X, T, boundary = t3_to_t6(X, T, boundary)
+    mesh = Mesh(X, T)
+    zero = lambda x, y: (0.0, 0.0)
+    t0 = time.perf_counter()
+    u = solve_elasticity_t3(mesh, None, D_plane_stress(E, NU), zero, boundary=boundary,
+                            dirichlet={"left": zero}, traction={"right": lambda x, y: (0.0, -T0)})
+    elapsed = time.perf_counter() - t0
+    return {
+        "element": "T6" if quadratic else "T3",
+        "nx": nx, "ny": ny,
+        "ndof": 2 * mesh.nnode,
+        "nnz": mesh.assembly_plan(2).nnz,
+        "time": elapsed,
+        "tip": tip_deflection_right_edge(X, u.reshape(-1, 2), boundary),
+    }
+
+def refine_to_tolerance(quadratic: bool, tol: float, reference: float, *, nx0: int = 10, max_nx: int = 640) -> list[dict]:
+    '''Rows of successively doubled meshes (ny = nx / 10) until the relative error is below tol.'''
+    rows = []
+    nx = nx0
+    while nx <= max_nx:
+        row = cantilever_tip(nx, max(1, nx // 10), quadratic)
+        row["error"] = abs(row["tip"] - reference) / reference
+        rows.append(row)
+        if row["error"] <= tol:
+            break
+        nx *= 2
+    return rows
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="T3 vs T6 accuracy per dof")
+    parser.add_argument("--tol", type=float, default=2e-3, help="relative tip deflection error")
+    parser.add_argument("--max-nx", type=int, default=640)
+    parser.add_argument("--output", "-o", help="JSON result file")
+    args = parser.parse_args(argv)
+
+    reference = cantilever_tip(160, 16, quadratic=True)["tip"]
+    rows = []
+    for quadratic in (False, True):
+        rows += refine_to_tolerance(quadratic, args.tol, reference, max_nx=args.max_nx)
+    for r in rows:
+        print(f"{r['element']} {r['nx']:5d} x {r['ny']:3d} {r['ndof']:8d} dofs {r['nnz']:9d} nnz "
+              f"{r['time'] * 1e3:10.2f} ms  error {r['error']:.2e}")
+    best = {}
+    for r in rows:
+        if r["error"] <= args.tol and r["element"] not in best:
+            best[r["element"]] = r
+    if len(best) == 2:
+        t3, t6 = best["T3"], best["T6"]
+        print(f"tol {args.tol:g}: T6 needs {t3['ndof'] / t6['ndof']:.1f}x fewer dofs and "
+              f"{t3['time'] / t6['time']:.1f}x less solve time than T3.")
+    if args.output:
+        Path(args.output).write_text(json.dumps({"reference": reference, "tol": args.tol, "results": rows}, indent=1))
+        print(f"Wrote {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+'''
+Pipeline stages timed by `run.py`.
+
+Every physics maps to a function stages(nelem, workdir) returning an ordered list of
+`Stage`s. A stage reads its inputs from and stores its outputs in a shared context dict, so
+it can be repeated on its own once the stages before it have run.
+'''
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+import numpy as np
+
+from pyfemlite.fem.assembly import AssemblyPlan
+from pyfemlite.fem.bc import DirichletPartition
+from pyfemlite.fem.elasticity2d import (elasticity_B_matrices, elasticity_element_stiffness,
+                                        elasticity_element_stiffness_t6, rigid_body_modes)
+from pyfemlite.fem.flux import add_poisson_neumann_rhs
+from pyfemlite.fem.iterative import solve_cg
+from pyfemlite.fem.loads import element_load_vectors
+from pyfemlite.fem.materials import D_plane_stress
+from pyfemlite.fem.poisson2d import poisson_element_stiffness
+from pyfemlite.fem.shape_t3 import t3_areas_and_grads
+from pyfemlite.fem.traction import add_elasticity_traction_rhs
+from pyfemlite.io.vtu import write_vtu
+from pyfemlite.mesh.boundary import build_boundary_from_predicates
+from pyfemlite.mesh.mesh import Mesh
+from pyfemlite.mesh.quadratic import t3_to_t6
+from pyfemlite.mesh.structured_tri import structured_rectangle_tri
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    run: Callable[[dict], None]
+
+def mesh_size(nelem: int) -> tuple[int, int]:
+    '''(nx, ny) of a 2:1 structured rectangle with about nelem triangles (nelem = 4 ny^2).'''
+    ny = max(1, int(round(np.sqrt(nelem / 4.0))))
+    return 2 * ny, ny
+
+def _common_stages(nelem: int, dofs_per_node: int, quadratic: bool = False) -> list[Stage]:
+    nx, ny = mesh_size(nelem)
+
+    def mesh(ctx):
+        X, T, _ = structured_rectangle_tri(nx, ny, xlim=(0.0, 2.0), ylim=(0.0, 1.0))
+        ctx["X"], ctx["T"] = t3_to_t6(X, T)[:2] if quadratic else (X, T)
+
+    def boundary_build(ctx):
+        ctx["boundary"] = build_boundary_from_predicates(ctx["X"], ctx["T"], {
+            "left": lambda x, y: np.isclose(x, 0.0),
+            "right": lambda x, y: np.isclose(x, 2.0),
+            "bottom": lambda x, y: np.isclose(y, 0.0),
+            "top": lambda x, y: np.isclose(y, 1.0),
+        }, vectorized=True)
+
+    def boundary_validate(ctx):
+        ctx["mesh"] = Mesh(ctx["X"], ctx["T"])
+        ctx["boundary"].validate(ctx["mesh"], strict=True)
+
+    def assembly_plan(ctx):
+        ctx["plan"] = AssemblyPlan.from_connectivity(ctx["T"], dofs_per_node)
+
+    def geometry(ctx):
+        ctx["A"], ctx["dNdx"] = t3_areas_and_grads(ctx["X"], ctx["T"])
+
+    return [Stage("mesh", mesh), Stage("boundary_build", boundary_build),
+            Stage("boundary_validate", boundary_validate), Stage("assembly_plan", assembly_plan),
+            Stage("geometry", geometry)]
+
+def _solve_stages(solver: str, workdir: Path, field: str, dofs_per_node: int) -> list[Stage]:
+    def dirichlet(ctx):
+        part = DirichletPartition.from_dofs(ctx["K"].shape[0], ctx["dofs"])
+        ctx["partition"] = part
+        ctx["K_ff"], ctx["rhs"] = part.reduce(ctx["K"], ctx["f"], np.zeros(part.dofs.size))
+
+    def solve(ctx):
+        part = ctx["partition"]
+        if solver == "direct":
+            from scipy.sparse.linalg import spsolve
+            u_f = spsolve(ctx["K_ff"], ctx["rhs"], permc_spec="MMD_AT_PLUS_A")
+        else:
+            B = None if dofs_per_node == 1 else rigid_body_modes(ctx["X"])[part.free]
+            dof_node = np.unique(part.free // dofs_per_node, return_inverse=True)[1]
+            u_f, _ = solve_cg(ctx["K_ff"], ctx["rhs"], preconditioner="amg", rtol=1e-8,
+                              near_nullspace=B, dof_node=dof_node)
+        ctx["u"] = part.expand(u_f, np.zeros(part.dofs.size))
+
+    def vtk_output(ctx):
+        data = ctx["u"] if dofs_per_node == 1 else ctx["u"].reshape(-1, dofs_per_node)
+        write_vtu(workdir / f"{field}.vtu", ctx["X"], ctx["T"], {field: data})
+
+    return [Stage("dirichlet", dirichlet), Stage("solve", solve), Stage("vtk_output", vtk_output)]
+
+def poisson_stages(nelem: int, workdir: Path, *, solver: str = "direct") -> list[Stage]:
+    '''-lap(u) = 1 on [0,2]x[0,1], u = 0 on the left and bottom, flux on the right edge.'''
+    def element_kernels(ctx):
+        ctx["Ke"] = poisson_element_stiffness(ctx["A"], ctx["dNdx"], 1.0)
+
+    def assembly(ctx):
+        ctx["K"] = ctx["plan"].assemble(ctx["Ke"])
+
+    def loads(ctx):
+        X, T = ctx["X"], ctx["T"]
+        f = ctx["plan"].assemble_vector(element_load_vectors(X, T, ctx["A"], lambda x, y: np.ones_like(x), ncomp=1))
+        add_poisson_neumann_rhs(f, X, ctx["boundary"].edges["right"], lambda x, y: y, vectorized=True)
+        ctx["f"] = f
+        ctx["dofs"] = np.union1d(ctx["boundary"].nodes["left"], ctx["boundary"].nodes["bottom"])
+
+    return (_common_stages(nelem, 1)
+            + [Stage("element_kernels", element_kernels), Stage("assembly", assembly), Stage("loads", loads)]
+            + _solve_stages(solver, workdir, "u", 1))
+
+def elasticity_stages(nelem: int, workdir: Path, *, solver: str = "direct", quadratic: bool = False) -> list[Stage]:
+    '''Cantilever [0,2]x[0,1] clamped on the left with a shear traction and self-weight.'''
+    D = D_plane_stress(200e3, 0.3)
+
+    def element_kernels(ctx):
+        if quadratic:
+            ctx["Ke"] = elasticity_element_stiffness_t6(ctx["A"], ctx["dNdx"], D)
+        else:
+            ctx["Ke"] = elasticity_element_stiffness(ctx["A"], elasticity_B_matrices(ctx["dNdx"]), D)
+
+    def assembly(ctx):
+        ctx["K"] = ctx["plan"].assemble(ctx["Ke"])
+
+    def loads(ctx):
+        X, T = ctx["X"], ctx["T"]
+        weight = lambda x, y: (np.zeros_like(x), -np.ones_like(x))
+        f = ctx["plan"].assemble_vector(element_load_vectors(X, T, ctx["A"], weight, ncomp=2))
+        add_elasticity_traction_rhs(f, X, ctx["boundary"].edges["right"],
+                                    lambda x, y: (np.zeros_like(x), -np.ones_like(x)), vectorized=True)
+        ctx["f"] = f
+        ctx["dofs"] = (2 * ctx["boundary"].nodes["left"][:, None] + np.arange(2)).ravel()
+
+    return (_common_stages(nelem, 2, quadratic)
+            + [Stage("element_kernels", element_kernels), Stage("assembly", assembly), Stage("loads", loads)]
+            + _solve_stages(solver, workdir, "displacement", 2))
+
+def elasticity_t6_stages(nelem: int, workdir: Path, *, solver: str = "direct") -> list[Stage]:
+    '''`elasticity_stages` on quadratic (T6) elements: same element count, about 4x the dofs.'''
+    return elasticity_stages(nelem, workdir, solver=solver, quadratic=True)
+
+PIPELINES: dict[str, Callable[..., list[Stage]]] = {
+    "poisson": poisson_stages,
+    "elasticity": elasticity_stages,
+    "elasticity_t6": elasticity_t6_stages,
+}
@@ -0,0 +1,176 @@
+'''
+Stage benchmarks of the pyfemlite pipeline.
+
+    python benchmarks/run.py run --sizes 1e3,1e4,1e5,1e6 --output results.json
+    python benchmarks/run.py compare base.json results.json --threshold 1.25
+
+`run` times every stage of `pipeline.PIPELINES` (best of --repeat runs, bounded by --budget
+seconds per stage) and records the peak traced allocation of one extra run under tracemalloc
+(NumPy and Python memory; allocations inside SuperLU are only visible in max_rss_bytes, the
+process high-water mark after the stage).
+`compare` matches results by (physics, nelem, stage) and exits with status 1 if a stage got
+slower (or its peak memory grew) by more than the threshold ratio.
+'''
+from __future__ import annotations
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import scipy
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from pipeline import PIPELINES  # noqa: E402
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=Path(__file__).resolve().parent, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+def _max_rss_bytes() -> int | None:
+    try:
+        import resource
+    except ImportError:    # not available on Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return int(rss if sys.platform == "darwin" else rss * 1024)
+
+def metadata() -> dict:
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+def run_pipeline(physics: str, nelem: int, *, repeat: int = 3, budget: float = 10.0,
+                 memory: bool = True, solver: str = "direct", workdir: Path) -> list[dict]:
+    '''Time every stage of one pipeline; returns one record per stage.'''
+    ctx: dict = {}
+    records = []
+    for stage in PIPELINES[physics](nelem, workdir, solver=solver):
+        peak = None
+        if memory:
+            tracemalloc.start()
+            try:
+                stage.run(ctx)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        times: list[float] = []
+        while len(times) < repeat and (not times or sum(times) < budget):
+            t0 = time.perf_counter()
+            stage.run(ctx)
+            times.append(time.perf_counter() - t0)
+        records.append({
+            "physics": physics,
+            "nelem": int(ctx["T"].shape[0]),
+            "nnode": int(ctx["X"].shape[0]),
+            "stage": stage.name,
+            "solver": solver,
+            "times": times,
+            "min": min(times),
+            "median": float(np.median(times)),
+            "peak_bytes": peak,
+            "max_rss_bytes": _max_rss_bytes(),
+        })
+    return records
+
+def run(args) -> int:
+    sizes = [int(float(s)) for s in args.sizes.split(",")]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for physics in args.physics.split(","):
+            if physics not in PIPELINES:
+                raise ValueError(f"Unknown physics '{physics}'. Choose from {sorted(PIPELINES)}.")
+            for n in sizes:
+                recs = run_pipeline(physics, n, repeat=args.repeat, budget=args.budget, memory=not args.no_memory,
+                                    solver=args.solver, workdir=Path(tmp))
+                for r in recs:
+                    mem = "" if r["peak_bytes"] is None else f"{r['peak_bytes'] / 2**20:10.1f} MiB"
+                    print(f"{physics:11s} {r['nelem']:>9d} {r['stage']:18s} {r['min'] * 1e3:11.3f} ms {mem}")
+                results.extend(recs)
+    meta = metadata()
+    meta["max_rss_bytes"] = _max_rss_bytes()
+    out = {"meta": meta, "results": results}
+    if args.output:
+        Path(args.output).write_text(json.dumps(out, indent=1))
+        print(f"Wrote {args.output}")
+    return 0
+
+def compare_results(base: dict, new: dict, *, threshold: float = 1.25, min_time: float = 1e-3) -> list[dict]:
+    '''
+    Per-stage ratios new/base of the best time and peak memory for results present in both.
+
+    A stage is flagged as a regression if its time ratio exceeds `threshold` and it got slower by
+    more than `min_time` seconds (timer noise on tiny stages), or its memory ratio exceeds it.
+    '''
+    key = lambda r: (r["physics"], r["nelem"], r["stage"])
+    base_by_key = {key(r): r for r in base["results"]}
+    rows = []
+    for r in new["results"]:
+        b = base_by_key.get(key(r))
+        if b is None:
+            continue
+        t_ratio = r["min"] / b["min"] if b["min"] > 0 else float("inf")
+        m_ratio = None
+        if r.get("peak_bytes") and b.get("peak_bytes"):
+            m_ratio = r["peak_bytes"] / b["peak_bytes"]
+        slower = t_ratio > threshold and r["min"] - b["min"] > min_time
+        bigger = m_ratio is not None and m_ratio > threshold
+        rows.append({"physics": r["physics"], "nelem": r["nelem"], "stage": r["stage"],
+                     "base": b["min"], "new": r["min"], "time_ratio": t_ratio, "memory_ratio": m_ratio,
+                     "regression": bool(slower or bigger)})
+    return rows
+
+def compare(args) -> int:
+    base = json.loads(Path(args.base).read_text())
+    new = json.loads(Path(args.new).read_text())
+    rows = compare_results(base, new, threshold=args.threshold, min_time=args.min_time)
+    print(f"base {base['meta'].get('commit')} -> new {new['meta'].get('commit')}")
+    for r in rows:
+        mem = "" if r["memory_ratio"] is None else f" mem x{r['memory_ratio']:.2f}"
+        flag = "  REGRESSION" if r["regression"] else ""
+        print(f"{r['physics']:11s} {r['nelem']:>9d} {r['stage']:18s} {r['base'] * 1e3:11.3f} -> "
+              f"{r['new'] * 1e3:11.3f} ms  x{r['time_ratio']:.2f}{mem}{flag}")
+    n_bad = sum(r["regression"] for r in rows)
+    print(f"{len(rows)} stages compared, {n_bad} regressions (threshold x{args.threshold}).")
+    return 1 if n_bad else 0
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="pyfemlite stage benchmarks")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("run", help="Time every pipeline stage.")
+    p.add_argument("--physics", default="poisson,elasticity", help=f"comma list of {sorted(PIPELINES)}")
+    p.add_argument("--sizes", default="1e3,1e4,1e5,1e6", help="comma list of target element counts")
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--budget", type=float, default=10.0, help="max seconds of repeats per stage")
+    p.add_argument("--solver", choices=("direct", "cg"), default="direct", help="cg uses the AMG preconditioner")
+    p.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    p.add_argument("--output", "-o", help="JSON result file")
+
+    c = sub.add_parser("compare", help="Flag regressions between two result files.")
+    c.add_argument("base")
+    c.add_argument("new")
+    c.add_argument("--threshold", type=float, default=1.25)
+    c.add_argument("--min-time", type=float, default=1e-3)
+
+    args = parser.parse_args(argv)
+    return run(args) if args.cmd == "run" else compare(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+import numpy as np
+
+from pyfemlite.mesh.structured_tri import structured_rectangle_tri
+from pyfemlite.fem.materials import D_plane_stress
+from pyfemlite.adapt import adaptive_elasticity
+from pyfemlite.post.beam_verify import tip_deflection_right_edge, euler_bernoulli_tip_deflection_end_traction
+from pyfemlite.post.stress import stress_fields
+from pyfemlite.io.vtu import write_vtu
+
+# Same beam as examples/cantilever_convergence.py, refined where the ZZ indicator asks for it
+L, H = 10.0, 1.0
+E, nu = 210e9, 0.30
+T0 = 1e6
+D = D_plane_stress(E, nu)
+
+X, T, boundary = structured_rectangle_tri(20, 2, xlim=(0.0, L), ylim=(0.0, H))
+
+result = adaptive_elasticity(
+    X, T, D,
+    body_force=lambda x, y: (0.0, 0.0),
+    boundary=boundary,
+    dirichlet={"left": lambda x, y: (0.0, 0.0)},
+    traction={"right": lambda x, y: (0.0, -T0)},
+    max_dofs=40000,
+    theta=0.5,
+    solver="cg",
+    preconditioner="amg",
+)
+
+delta_eb = euler_bernoulli_tip_deflection_end_traction(T0=T0, L=L, H=H, E=E)
+for h in result.history:
+    print(f"ndof={h['ndof']:7d}  nelem={h['nelem']:7d}  eta={h['error']:.4e}")
+U = result.u.reshape(-1, 2)
+delta_fem = tip_deflection_right_edge(result.X, U, result.boundary, use_abs=True)
+print(f"Stopped on {result.reason}; tip deflection {delta_fem:.6e} (EB {delta_eb:.6e}, "
+      f"rel. diff {abs(delta_fem - delta_eb) / delta_eb:.4%})")
+
+point_data, cell_data = stress_fields(result.X, result.T, result.u, D, recovery="spr")
+cell_data["eta"] = result.eta
+write_vtu("cantilever_adaptive.vtu", result.X, result.T, point_data, cell_data)
+print("Wrote cantilever_adaptive.vtu")
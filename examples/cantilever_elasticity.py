@@ -3,7 +3,9 @@ from pyfemlite.mesh.structured_tri import structured_unit_square_tri
 from pyfemlite.fem.elasticity2d import solve_elasticity_t3
 from pyfemlite.fem.materials import D_plane_stress
 from pyfemlite.io.vtk import write_vtk_unstructured_tri
+from pyfemlite.io.vtu import write_vtu
 from pyfemlite.post.beam_verify import tip_deflection_right_edge, euler_bernoulli_tip_deflection_end_traction
+from pyfemlite.post.stress import stress_fields
 
 L, H = 10.0, 1.0
 nx, ny = 120, 12
@@ -39,6 +41,10 @@ U = u.reshape(-1, 2)
 write_vtk_unstructured_tri("cantilever_named_bc.vtk", X, T, {"U": U})
 print("Wrote cantilever_named_bc.vtk (open in ParaView).")
 
+point_data, cell_data = stress_fields(X, T, u, D, recovery="spr")
+write_vtu("cantilever_stress.vtu", X, T, point_data, cell_data)
+print("Wrote cantilever_stress.vtu (displacement, strain, stress, von Mises).")
+
 # Verification: tip deflection vs Euler–Bernoulli beam theory
 delta_fem = tip_deflection_right_edge(X, U, boundary, use_abs=True)
 delta_eb = euler_bernoulli_tip_deflection_end_traction(T0=T0, L=L, H=H, E=E)
@@ -1,2 +1,8 @@
-__all__ = ["mesh", "fem", "io", "post"]
+__all__ = ["mesh", "fem", "io", "post", "adapt", "rom", "profiling", "profile", "ProfileReport",
+           "precision", "PrecisionPolicy", "get_policy", "set_policy", "use_precision",
+           "cache", "DiskCache"]
 __version__ = "0.1.0"
+
+from .profiling import profile, ProfileReport
+from .precision import PrecisionPolicy, get_policy, set_policy, use_precision
+from .cache import DiskCache
@@ -0,0 +1,2 @@
+from .estimators import zz_error_estimate, poisson_residual_estimate, dorfler_mark
+from .loop import AdaptiveResult, adaptive_solve, adaptive_poisson, adaptive_elasticity
@@ -0,0 +1,106 @@
+from __future__ import annotations
+import numpy as np
+
+from pyfemlite.fem.loads import evaluate_pointwise
+from pyfemlite.fem.quadrature import triangle_rule
+from pyfemlite.mesh.mesh import Mesh, as_mesh
+from pyfemlite.post.stress import element_gradients, nodal_average, spr_recovery
+
+def _linear_mesh(X, T) -> Mesh:
+    mesh = as_mesh(X, T)
+    if mesh.nen != 3:
+        raise ValueError("Error estimators support linear (T3) triangles only.")
+    return mesh
+
+def zz_error_estimate(
+    X: np.ndarray | Mesh,
+    T: np.ndarray | None,
+    flux: np.ndarray,
+    *,
+    recovery: str = "spr",
+    metric=None,
+) -> np.ndarray:
+    '''
+    Zienkiewicz-Zhu element error indicators of a piecewise constant flux (nelem,k).
+
+    eta_e^2 = int_e (q* - q_h)^T W (q* - q_h) dA, with q* the recovered nodal flux ("spr" or
+    "average") interpolated linearly and q_h the element flux. metric W is None (identity),
+    a scalar or (nelem,) weight, or a (k,k) matrix -- e.g. inv(D) with stresses for the
+    energy norm of elasticity, 1/kappa with kappa*grad(u) for Poisson.
+    Integrated exactly with the 3-point triangle rule. Linear (T3) triangles only. Returns
+    eta (nelem,).
+    '''
+    mesh = _linear_mesh(X, T)
+    A, _ = mesh.geometry()
+    q = np.asarray(flux, dtype=float).reshape(mesh.nelem, -1)
+    if recovery == "spr":
+        q_star = spr_recovery(mesh, None, q)
+    elif recovery == "average":
+        q_star = nodal_average(mesh, None, q)
+    else:
+        raise ValueError(f"Unknown recovery '{recovery}'. Use 'spr' or 'average'.")
+    bary, w = triangle_rule(3)
+    diff = np.einsum("qa,eak->eqk", bary, q_star[mesh.T[:, :3]]) - q[:, None, :]
+    if metric is not None and np.ndim(metric) == 2:
+        sq = np.einsum("eqk,kl,eql->eq", diff, np.asarray(metric, dtype=float), diff)
+    else:
+        sq = (diff ** 2).sum(axis=2)
+        if metric is not None:
+            sq = sq * np.broadcast_to(np.asarray(metric, dtype=float), A.shape)[:, None]
+    return np.sqrt(np.maximum(A * (sq @ w), 0.0))
+
+def poisson_residual_estimate(
+    X: np.ndarray | Mesh,
+    T: np.ndarray | None,
+    u: np.ndarray,
+    kappa,
+    rhs_func,
+    *,
+    quadrature: int = 3,
+    vectorized: bool | None = None,
+) -> np.ndarray:
+    '''
+    Residual error indicators for -div(kappa grad u) = f on linear triangles:
+
+        eta_e^2 = h_e^2 ||f||_e^2 + 1/2 sum_{interior edges E of e} |E| ||[kappa grad u_h . n]||_E^2
+
+    h_e is the longest edge. Boundary edges do not contribute (Dirichlet, or Neumann data
+    resolved by the mesh). Returns eta (nelem,).
+    '''
+    mesh = _linear_mesh(X, T)
+    A, _ = mesh.geometry()
+    Xn, T3 = mesh.X, mesh.T[:, :3]
+    P = Xn[T3]
+    h2 = ((np.roll(P, -1, axis=1) - P) ** 2).sum(axis=2).max(axis=1)
+
+    bary, w = triangle_rule(quadrature)
+    xq = np.einsum("qa,ead->eqd", bary, P)
+    f = evaluate_pointwise(rhs_func, xq[..., 0].ravel(), xq[..., 1].ravel(), 1, vectorized).reshape(xq.shape[:2])
+    eta2 = h2 * A * ((f ** 2) @ w)
+
+    flux = element_gradients(mesh, None, u) * np.broadcast_to(np.asarray(kappa, dtype=float), A.shape)[:, None]
+    interior = mesh.edge_count == 2
+    E = mesh.edges[interior]
+    ee = mesh.edge_elem[interior]
+    t = Xn[E[:, 1]] - Xn[E[:, 0]]
+    dq = flux[ee[:, 0]] - flux[ee[:, 1]]
+    jump = dq[:, 0] * t[:, 1] - dq[:, 1] * t[:, 0]    # [q].n |E|, n |E| = (t_y, -t_x)
+    contrib = 0.5 * jump ** 2                          # 1/2 |E| ||[q].n||_E^2
+    eta2 += np.bincount(ee[:, 0], weights=contrib, minlength=mesh.nelem)
+    eta2 += np.bincount(ee[:, 1], weights=contrib, minlength=mesh.nelem)
+    return np.sqrt(eta2)
+
+def dorfler_mark(eta: np.ndarray, theta: float = 0.5) -> np.ndarray:
+    '''
+    Doerfler (bulk) marking: the smallest set of elements with the largest indicators such that
+    sum_marked eta^2 >= theta * sum eta^2. Returns a boolean mask.
+    '''
+    if not 0.0 < theta <= 1.0:
+        raise ValueError("theta must be in (0, 1].")
+    eta2 = np.asarray(eta, dtype=float) ** 2
+    order = np.argsort(-eta2, kind="stable")
+    csum = np.cumsum(eta2[order])
+    n = min(int(np.searchsorted(csum, theta * csum[-1] * (1.0 - 1e-12))) + 1, eta2.size)
+    mask = np.zeros(eta2.size, dtype=bool)
+    mask[order[:n]] = True
+    return mask
@@ -0,0 +1,158 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+import time
+from typing import Callable
+import numpy as np
+
+from pyfemlite.mesh.boundary import Boundary
+from pyfemlite.mesh.refine import longest_edge_first, prolong, refine_newest_vertex
+from .estimators import dorfler_mark, poisson_residual_estimate, zz_error_estimate
+
+@dataclass(frozen=True)
+class AdaptiveResult:
+    '''
+    Final mesh, solution and indicators of `adaptive_solve`.
+
+    history holds one dict per solve: ndof, nelem, error (sqrt of the summed squared
+    indicators), solve_time and estimate_time. `reason` is "tol", "max_dofs" or "max_iter".
+    '''
+    X: np.ndarray
+    T: np.ndarray
+    boundary: Boundary | None
+    u: np.ndarray
+    eta: np.ndarray
+    reason: str
+    history: list[dict] = field(default_factory=list)
+
+def adaptive_solve(
+    X: np.ndarray,
+    T: np.ndarray,
+    boundary: Boundary | None,
+    solve: Callable,
+    estimate: Callable,
+    *,
+    dofs_per_node: int = 1,
+    tol: float | None = None,
+    max_dofs: int | None = None,
+    theta: float = 0.5,
+    max_iter: int = 30,
+    warm_start: bool = True,
+) -> AdaptiveResult:
+    '''
+    Solve -> estimate -> mark -> refine until the estimated error drops below `tol`, the next
+    mesh would exceed `max_dofs`, or `max_iter` solves were done.
+
+    solve(X, T, boundary, x0) -> u ; estimate(X, T, u) -> eta (nelem,)
+    Elements are marked with `dorfler_mark(eta, theta)` and refined by newest-vertex bisection
+    (`refine_newest_vertex`; the initial mesh is relabelled with `longest_edge_first`). With
+    warm_start the previous solution, prolongated to the new mesh, is passed as x0 (used by
+    the iterative solvers).
+    '''
+    if tol is None and max_dofs is None and max_iter is None:
+        raise ValueError("Give at least one of tol, max_dofs or max_iter.")
+    X = np.asarray(X, dtype=float)
+    T = longest_edge_first(X, T)
+    x0 = None
+    history: list[dict] = []
+    it = 0
+    while True:
+        t0 = time.perf_counter()
+        u = solve(X, T, boundary, x0)
+        t1 = time.perf_counter()
+        eta = np.asarray(estimate(X, T, u), dtype=float)
+        t2 = time.perf_counter()
+        err = float(np.sqrt((eta ** 2).sum()))
+        history.append(dict(ndof=dofs_per_node * X.shape[0], nelem=T.shape[0], error=err,
+                            solve_time=t1 - t0, estimate_time=t2 - t1))
+        it += 1
+        reason = None
+        if tol is not None and err <= tol:
+            reason = "tol"
+        elif max_iter is not None and it >= max_iter:
+            reason = "max_iter"
+        if reason is None:
+            X_new, T_new, b_new, P = refine_newest_vertex(X, T, dorfler_mark(eta, theta), boundary)
+            if max_dofs is not None and dofs_per_node * X_new.shape[0] > max_dofs:
+                reason = "max_dofs"
+        if reason is not None:
+            return AdaptiveResult(X=X, T=T, boundary=boundary, u=u, eta=eta, reason=reason, history=history)
+        x0 = prolong(P, u, dofs_per_node) if warm_start else None
+        X, T, boundary = X_new, T_new, b_new
+
+def adaptive_poisson(
+    X: np.ndarray,
+    T: np.ndarray,
+    kappa: float,
+    rhs_func,
+    *,
+    boundary: Boundary | None = None,
+    dirichlet: dict | None = None,
+    neumann: dict | None = None,
+    estimator: str = "zz",
+    tol: float | None = None,
+    max_dofs: int | None = None,
+    theta: float = 0.5,
+    max_iter: int = 30,
+    warm_start: bool = True,
+    **solver_kwargs,
+) -> AdaptiveResult:
+    '''
+    `adaptive_solve` for `solve_poisson_t3` with the "zz" (flux recovery, energy norm) or
+    "residual" (`poisson_residual_estimate`) estimator. kappa must be a scalar; extra keyword
+    arguments go to the solver (e.g. solver="cg", preconditioner="amg").
+    '''
+    from pyfemlite.fem.poisson2d import solve_poisson_t3
+    from pyfemlite.post.stress import element_gradients
+
+    if np.ndim(kappa) != 0:
+        raise ValueError("adaptive_poisson needs a scalar kappa.")
+    if estimator not in ("zz", "residual"):
+        raise ValueError(f"Unknown estimator '{estimator}'. Use 'zz' or 'residual'.")
+
+    def solve(X, T, boundary, x0):
+        return solve_poisson_t3(X, T, kappa, rhs_func, boundary=boundary, dirichlet=dirichlet,
+                                neumann=neumann, x0=x0, **solver_kwargs)
+
+    def estimate(X, T, u):
+        if estimator == "residual":
+            return poisson_residual_estimate(X, T, u, kappa, rhs_func)
+        return zz_error_estimate(X, T, kappa * element_gradients(X, T, u), metric=1.0 / kappa)
+
+    return adaptive_solve(X, T, boundary, solve, estimate, dofs_per_node=1, tol=tol, max_dofs=max_dofs,
+                          theta=theta, max_iter=max_iter, warm_start=warm_start)
+
+def adaptive_elasticity(
+    X: np.ndarray,
+    T: np.ndarray,
+    D: np.ndarray,
+    body_force,
+    *,
+    boundary: Boundary | None = None,
+    dirichlet: dict | None = None,
+    traction: dict | None = None,
+    tol: float | None = None,
+    max_dofs: int | None = None,
+    theta: float = 0.5,
+    max_iter: int = 30,
+    warm_start: bool = True,
+    **solver_kwargs,
+) -> AdaptiveResult:
+    '''
+    `adaptive_solve` for `solve_elasticity_t3` with the ZZ estimator in the energy norm
+    (SPR-recovered stresses, metric inv(D)). Extra keyword arguments go to the solver.
+    '''
+    from pyfemlite.fem.elasticity2d import solve_elasticity_t3
+    from pyfemlite.post.stress import element_strains, element_stresses
+
+    D = np.asarray(D, dtype=float)
+    Dinv = np.linalg.inv(D)
+
+    def solve(X, T, boundary, x0):
+        return solve_elasticity_t3(X, T, D, body_force, boundary=boundary, dirichlet=dirichlet,
+                                   traction=traction, x0=x0, **solver_kwargs)
+
+    def estimate(X, T, u):
+        return zz_error_estimate(X, T, element_stresses(element_strains(X, T, u), D), metric=Dinv)
+
+    return adaptive_solve(X, T, boundary, solve, estimate, dofs_per_node=2, tol=tol, max_dofs=max_dofs,
+                          theta=theta, max_iter=max_iter, warm_start=warm_start)
@@ -0,0 +1,193 @@
+'''
+Persistent content-addressed cache of meshes, assembled operators and factorizations.
+
+Entries are sets of named arrays stored as uncompressed, 64-byte aligned .npz files
+(`pyfemlite.io.meshfile.save_arrays`) under a cache directory and returned as read-only
+np.memmaps, so a hit costs no parsing or copying. Keys are content hashes (`array_digest`)
+of the inputs that determine the entry: mesh arrays, material, Dirichlet dof set.
+
+    from pyfemlite.cache import DiskCache
+    u = solve_elasticity_t3(X, T, D, f, ..., disk_cache=DiskCache("~/.cache/pyfemlite"))
+
+or opt in for every solve by setting PYFEMLITE_CACHE_DIR (and optionally
+PYFEMLITE_CACHE_MAX_BYTES); `disk_cache=False` disables it for a call.
+
+Concurrent use from several processes is safe without locks: entries are written to a
+private temporary file and published with an atomic rename, so readers see either no entry
+or a complete one, and evicting an entry that another process has mapped only unlinks the
+name (POSIX keeps the mapped pages alive). Eviction is least recently used: hits refresh the
+entry's modification time and every put trims the directory to `max_bytes`.
+'''
+from __future__ import annotations
+import os
+import re
+import tempfile
+import time
+import zipfile
+import numpy as np
+
+from pyfemlite.io.meshfile import load_arrays, save_arrays
+
+CACHE_DIR_ENV = "PYFEMLITE_CACHE_DIR"
+CACHE_MAX_BYTES_ENV = "PYFEMLITE_CACHE_MAX_BYTES"
+DEFAULT_MAX_BYTES = 2 << 30
+_SUFFIX = ".npz"
+_KEY = re.compile(r"^[0-9A-Za-z_.-]+$")
+_STALE_TMP_SECONDS = 3600.0
+
+class DiskCache:
+    '''
+    Directory of array entries keyed on content hashes, bounded by size with LRU eviction.
+
+    directory : created if missing ("~" is expanded)
+    max_bytes : total size bound; entries larger than this are not stored
+    '''
+
+    def __init__(self, directory: str | os.PathLike, max_bytes: int = DEFAULT_MAX_BYTES):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive.")
+        self.directory = os.path.abspath(os.path.expanduser(os.fspath(directory)))
+        self.max_bytes = int(max_bytes)
+        os.makedirs(self.directory, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        if not _KEY.match(key):
+            raise ValueError(f"Invalid cache key {key!r} (letters, digits, '_', '.', '-' only).")
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def get(self, key: str) -> dict[str, np.ndarray] | None:
+        '''Memory-mapped arrays of an entry, or None on a miss; a hit marks the entry as recently used.'''
+        path = self._path(key)
+        try:
+            arrays = load_arrays(path, mmap=True)
+            os.utime(path)
+        except FileNotFoundError:      # missing, or evicted by another process meanwhile
+            self.misses += 1
+            return None
+        except (zipfile.BadZipFile, ValueError):     # not written by put (entries are published complete)
+            self.evict(key)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return arrays
+
+    def put(self, key: str, arrays: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+        '''Store an entry atomically (an existing entry with the same key is replaced) and trim the cache.'''
+        path = self._path(key)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=f".{key[:16]}-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                save_arrays(fh, arrays)
+            os.replace(tmp, path)
+        except OSError:
+            # e.g. Windows refuses to replace a file another process has mapped; that
+            # process stored the same content under the same key
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            if not os.path.exists(path):
+                raise
+        self.trim()
+        return arrays
+
+    def evict(self, key: str) -> bool:
+        try:
+            os.remove(self._path(key))
+            return True
+        except FileNotFoundError:
+            return False
+        except PermissionError:      # mapped by another process on Windows
+            return False
+
+    def clear(self) -> None:
+        for key in self.keys():
+            self.evict(key)
+
+    def keys(self) -> list[str]:
+        '''Keys from least to most recently used.'''
+        return [name[:-len(_SUFFIX)] for name, _, _ in self._entries()]
+
+    def size_bytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def trim(self, max_bytes: int | None = None) -> int:
+        '''Evict least recently used entries until the cache holds at most max_bytes; returns the number evicted.'''
+        limit = self.max_bytes if max_bytes is None else int(max_bytes)
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for name, size, _ in entries:
+            if total <= limit:
+                break
+            if self.evict(name[:-len(_SUFFIX)]):
+                evicted += 1
+            total -= size
+        now = time.time()
+        for entry in os.scandir(self.directory):     # temporaries of writers that died
+            if entry.name.endswith(".tmp"):
+                try:
+                    if now - entry.stat().st_mtime > _STALE_TMP_SECONDS:
+                        os.remove(entry.path)
+                except OSError:
+                    pass
+        return evicted
+
+    def _entries(self) -> list[tuple[str, int, float]]:
+        '''(file name, size, mtime) of the entries, oldest first.'''
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(_SUFFIX) or entry.name.startswith("."):
+                continue
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((entry.name, int(st.st_size), st.st_mtime))
+        entries.sort(key=lambda e: (e[2], e[0]))
+        return entries
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+def resolve_disk_cache(disk_cache: DiskCache | str | os.PathLike | bool | None) -> DiskCache | None:
+    '''
+    The cache a solver should use for its `disk_cache` argument.
+
+    A DiskCache is used as is and a path opens one; None defers to PYFEMLITE_CACHE_DIR (no
+    caching if unset), True requires it, and False disables caching.
+    '''
+    if disk_cache is None or disk_cache is True:
+        directory = os.environ.get(CACHE_DIR_ENV)
+        if not directory:
+            if disk_cache:
+                raise ValueError(f"disk_cache=True needs {CACHE_DIR_ENV}; pass a DiskCache or a directory instead.")
+            return None
+        max_bytes = int(os.environ.get(CACHE_MAX_BYTES_ENV, DEFAULT_MAX_BYTES))
+        return DiskCache(directory, max_bytes=max_bytes)
+    if disk_cache is False:
+        return None
+    if isinstance(disk_cache, DiskCache):
+        return disk_cache
+    return DiskCache(disk_cache)
+
+def validate_boundary_cached(boundary, mesh, disk_cache: DiskCache | None) -> None:
+    '''
+    `boundary.validate(mesh, strict=True)`, skipped when disk_cache records that the same
+    boundary groups already passed on the same mesh.
+    '''
+    if disk_cache is None:
+        boundary.validate(mesh, strict=True)
+        return
+    from pyfemlite.fem.linear_system import array_digest
+    parts = [mesh.digest()]
+    for kind, groups in (("nodes", boundary.nodes), ("edges", boundary.edges)):
+        for name in sorted(groups):
+            parts += [kind, name, groups[name]]
+    key = array_digest(*parts, tag="boundary_validate")
+    if disk_cache.get(key) is None:
+        boundary.validate(mesh, strict=True)
+        disk_cache.put(key, {})
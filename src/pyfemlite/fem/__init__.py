@@ -1,3 +1,8 @@
 from .poisson2d import solve_poisson_t3
 from .elasticity2d import solve_elasticity_t3
 from .materials import D_plane_stress, D_plane_strain
+from .assembly import AssemblyPlan
+from .linear_system import LinearSystem, FactorizationCache
+from .parallel import ParallelAssembler
+from .sweep import ElasticitySweep, SweepResult, material_grid
+from .matrix_free import MatrixFreeOperator, PoissonOperator, ElasticityOperator
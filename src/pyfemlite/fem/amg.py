@@ -0,0 +1,172 @@
+from __future__ import annotations
+import numpy as np
+from scipy.sparse import coo_matrix, csr_matrix, diags
+from scipy.sparse.linalg import LinearOperator, splu
+
+class SmoothedAggregationAMG:
+    '''
+    Smoothed-aggregation algebraic multigrid, written with NumPy/SciPy sparse kernels only.
+
+    Intended as a preconditioner for CG on SPD stiffness matrices: one application is a
+    symmetric V-cycle (damped Jacobi pre/post smoothing, exact coarsest solve).
+
+    Parameters
+    ----------
+    A : (n,n) SPD sparse matrix
+    near_nullspace : (n,k) candidate vectors (constants for Poisson, rigid body modes for
+        elasticity). Defaults to the constant vector.
+    dof_node : (n,) node id of every dof; dofs of one node are always aggregated together.
+    theta : strength-of-connection threshold
+    max_levels, max_coarse : hierarchy limits
+    '''
+
+    def __init__(
+        self,
+        A,
+        *,
+        near_nullspace: np.ndarray | None = None,
+        dof_node: np.ndarray | None = None,
+        theta: float = 0.08,
+        max_levels: int = 10,
+        max_coarse: int = 300,
+        seed: int = 0,
+    ):
+        A = csr_matrix(A, dtype=float)
+        n = A.shape[0]
+        B = np.ones((n, 1)) if near_nullspace is None else np.asarray(near_nullspace, dtype=float).reshape(n, -1)
+        dof_node = np.arange(n) if dof_node is None else np.asarray(dof_node, dtype=np.int64)
+        rng = np.random.default_rng(seed)
+
+        self.levels: list[tuple[csr_matrix, csr_matrix, np.ndarray]] = []
+        while len(self.levels) < max_levels - 1 and A.shape[0] > max_coarse:
+            agg = _aggregate(A, dof_node, theta, rng)
+            agg_dof = agg[dof_node]
+            P_tent, B_c, coarse_node = _tentative_prolongator(agg_dof, B)
+            if P_tent.shape[1] >= A.shape[0] or P_tent.shape[1] == 0:
+                break
+            Dinv = 1.0 / A.diagonal()
+            omega = 4.0 / (3.0 * _spectral_radius_dinv_a(A, Dinv, rng))
+            P = (P_tent - omega * (diags(Dinv) @ (A @ P_tent))).tocsr()
+            self.levels.append((A, P, omega * Dinv))
+            A = (P.T @ A @ P).tocsr()
+            B, dof_node = B_c, coarse_node
+        self.coarse_A = A
+        self._coarse = splu(A.tocsc())
+
+    @property
+    def n_levels(self) -> int:
+        return len(self.levels) + 1
+
+    @property
+    def operator_complexity(self) -> float:
+        nnz = [lvl[0].nnz for lvl in self.levels] + [self.coarse_A.nnz]
+        return float(sum(nnz) / nnz[0])
+
+    def vcycle(self, b: np.ndarray) -> np.ndarray:
+        return self._cycle(0, np.asarray(b, dtype=float))
+
+    def _cycle(self, lvl: int, b: np.ndarray) -> np.ndarray:
+        if lvl == len(self.levels):
+            return self._coarse.solve(b)
+        A, P, wDinv = self.levels[lvl]
+        x = wDinv * b
+        x += P @ self._cycle(lvl + 1, P.T @ (b - A @ x))
+        x += wDinv * (b - A @ x)
+        return x
+
+    def aslinearoperator(self) -> LinearOperator:
+        n = self.levels[0][0].shape[0] if self.levels else self.coarse_A.shape[0]
+        return LinearOperator((n, n), matvec=self.vcycle, dtype=float)
+
+def _spectral_radius_dinv_a(A: csr_matrix, Dinv: np.ndarray, rng, iters: int = 15) -> float:
+    x = rng.random(A.shape[0])
+    rho = 1.0
+    for _ in range(iters):
+        y = Dinv * (A @ x)
+        rho = float(np.linalg.norm(y) / np.linalg.norm(x))
+        x = y / np.linalg.norm(y)
+    return rho
+
+def _strength_graph(A: csr_matrix, dof_node: np.ndarray, theta: float) -> csr_matrix:
+    nnode = int(dof_node.max()) + 1
+    Ac = A.tocoo()
+    C = coo_matrix((np.abs(Ac.data), (dof_node[Ac.row], dof_node[Ac.col])), shape=(nnode, nnode)).tocsr()
+    d = C.diagonal()
+    C = C.tocoo()
+    keep = (C.row != C.col) & (C.data >= theta * np.sqrt(np.abs(d[C.row] * d[C.col])))
+    S = coo_matrix((np.ones(int(keep.sum())), (C.row[keep], C.col[keep])), shape=(nnode, nnode)).tocsr()
+    return ((S + S.T) > 0).astype(float).tocsr()
+
+def _neighbour_reduce(G: csr_matrix, values: np.ndarray, fill: float) -> np.ndarray:
+    '''Row-wise max of values over the (off-diagonal) neighbours in pattern G.'''
+    out = np.full(G.shape[0], fill, dtype=float)
+    counts = np.diff(G.indptr)
+    rows = np.flatnonzero(counts)
+    if rows.size:
+        out[rows] = np.maximum.reduceat(values[G.indices], G.indptr[rows])
+    return out
+
+def _luby_mis(G: csr_matrix, rng) -> np.ndarray:
+    n = G.shape[0]
+    w = rng.random(n)
+    state = np.zeros(n, dtype=np.int8)   # 0 undecided, 1 selected, -1 excluded
+    while np.any(state == 0):
+        undecided = state == 0
+        nbmax = _neighbour_reduce(G, np.where(undecided, w, -1.0), -1.0)
+        new = undecided & (w > nbmax)
+        state[new] = 1
+        hit = _neighbour_reduce(G, new.astype(float), 0.0) > 0
+        state[(state == 0) & hit] = -1
+    return np.flatnonzero(state == 1)
+
+def _aggregate(A: csr_matrix, dof_node: np.ndarray, theta: float, rng) -> np.ndarray:
+    S = _strength_graph(A, dof_node, theta)
+    S.setdiag(0.0)
+    S.eliminate_zeros()
+    G = (S @ S + S).tocsr()
+    G.setdiag(0.0)
+    G.eliminate_zeros()
+    roots = _luby_mis(G, rng)
+
+    agg = np.full(S.shape[0], -1, dtype=np.int64)
+    agg[roots] = np.arange(roots.size)
+    # every node is within distance 2 of a root; two sweeps attach all of them
+    for _ in range(2):
+        free = agg < 0
+        if not np.any(free):
+            break
+        label = _neighbour_reduce(S, agg.astype(float), -1.0)
+        take = free & (label >= 0)
+        agg[take] = label[take].astype(np.int64)
+    left = np.flatnonzero(agg < 0)
+    agg[left] = roots.size + np.arange(left.size)
+    return agg
+
+def _tentative_prolongator(agg_dof: np.ndarray, B: np.ndarray, tol: float = 1e-10):
+    '''Aggregate-wise modified Gram-Schmidt of the near-nullspace; rank-deficient columns are dropped.'''
+    n, k = B.shape
+    nagg = int(agg_dof.max()) + 1
+    Q = np.zeros((n, k))
+    R = np.zeros((nagg, k, k))
+    keep = np.zeros((nagg, k), dtype=bool)
+    for j in range(k):
+        v = B[:, j].copy()
+        for i in range(j):
+            rij = np.bincount(agg_dof, weights=Q[:, i] * v, minlength=nagg)
+            v -= rij[agg_dof] * Q[:, i]
+            R[:, i, j] = rij
+        nrm = np.sqrt(np.bincount(agg_dof, weights=v * v, minlength=nagg))
+        ref = np.sqrt(np.bincount(agg_dof, weights=B[:, j] ** 2, minlength=nagg))
+        ok = nrm > tol * np.maximum(ref, np.finfo(float).tiny)
+        R[:, j, j] = np.where(ok, nrm, 0.0)
+        Q[:, j] = np.where(ok[agg_dof], v / np.where(ok, nrm, 1.0)[agg_dof], 0.0)
+        keep[:, j] = ok
+
+    col_id = np.full((nagg, k), -1, dtype=np.int64)
+    col_id[keep] = np.arange(int(keep.sum()))
+    cols = col_id[agg_dof].ravel()
+    rows = np.repeat(np.arange(n), k)
+    m = cols >= 0
+    P = csr_matrix((Q.ravel()[m], (rows[m], cols[m])), shape=(n, int(keep.sum())))
+    coarse_node = np.nonzero(keep)[0]
+    return P, R[keep], coarse_node
@@ -1,9 +1,15 @@
 from __future__ import annotations
+from dataclasses import dataclass
 import numpy as np
 from scipy.sparse import coo_matrix, csr_matrix
 
+from pyfemlite.precision import index_dtype
+
 def assemble_global(n_dof: int, triplets_i, triplets_j, triplets_v) -> csr_matrix:
-    K = coo_matrix((triplets_v, (triplets_i, triplets_j)), shape=(n_dof, n_dof))
+    idx = index_dtype(max(n_dof - 1, 0))
+    I = np.asarray(triplets_i, dtype=idx)
+    J = np.asarray(triplets_j, dtype=idx)
+    K = coo_matrix((np.asarray(triplets_v, dtype=float), (I, J)), shape=(n_dof, n_dof))
     return K.tocsr()
 
 def add_local_to_triplets(edofs: np.ndarray, Ke: np.ndarray, I, J, V):
@@ -11,3 +17,89 @@ def add_local_to_triplets(edofs: np.ndarray, Ke: np.ndarray, I, J, V):
     I.extend(ii.ravel().tolist())
     J.extend(jj.ravel().tolist())
     V.extend(Ke.ravel().tolist())
+
+def element_dofs(T: np.ndarray, dofs_per_node: int) -> np.ndarray:
+    '''
+    Element dof table with interleaved node dofs, e.g. (ux0,uy0,ux1,uy1,...) for dofs_per_node=2.
+
+    Returns (nelem, nen*dofs_per_node) array in the policy index dtype (`pyfemlite.precision`),
+    widened to int64 when the dof ids overflow int32.
+    '''
+    T = np.asarray(T)
+    dtype = index_dtype(dofs_per_node * (int(T.max()) + 1) - 1 if T.size else 0)
+    if dofs_per_node == 1:
+        return T.astype(dtype)
+    edofs = dofs_per_node * T.astype(dtype, copy=False)[:, :, None] + np.arange(dofs_per_node, dtype=dtype)
+    return edofs.reshape(T.shape[0], -1)
+
+def element_triplets(edofs: np.ndarray, Ke: np.ndarray):
+    '''
+    Flattened COO triplets (I, J, V) for a batch of local matrices Ke (nelem,nd,nd)
+    scattered through the element dof table edofs (nelem,nd).
+    '''
+    nd = edofs.shape[1]
+    I = np.repeat(edofs, nd, axis=1).ravel()
+    J = np.tile(edofs, (1, nd)).ravel()
+    return I, J, np.asarray(Ke).ravel()
+
+@dataclass(frozen=True)
+class AssemblyPlan:
+    '''
+    Precomputed CSR sparsity pattern and element -> CSR data slot map.
+
+    Build once per mesh and dof layout, then every assembly is a single bincount of the
+    element matrices into the CSR data array (no triplet lists, no COO->CSR conversion).
+    indptr/indices and slots use the policy index dtype (`pyfemlite.precision`): int32 under
+    "auto" while nnz fits, which halves the memory of the plan.
+    '''
+    n_dof: int
+    edofs: np.ndarray     # (nelem, nd) element dof table
+    indptr: np.ndarray    # (n_dof+1,) CSR row pointers
+    indices: np.ndarray   # (nnz,) CSR column indices, sorted within each row
+    slots: np.ndarray     # (nelem, nd*nd) CSR data slot of each local entry Ke[e].ravel()
+
+    @classmethod
+    def from_connectivity(cls, T: np.ndarray, dofs_per_node: int = 1, n_dof: int | None = None) -> AssemblyPlan:
+        T = np.asarray(T)
+        edofs = element_dofs(T, dofs_per_node)
+        if n_dof is None:
+            n_dof = dofs_per_node * (int(T.max()) + 1 if T.size else 0)
+        return cls.from_element_dofs(edofs, n_dof)
+
+    @classmethod
+    def from_element_dofs(cls, edofs: np.ndarray, n_dof: int) -> AssemblyPlan:
+        edofs = np.asarray(edofs)
+        nelem, nd = edofs.shape
+        I = np.repeat(edofs, nd, axis=1).ravel().astype(np.int64)
+        J = np.tile(edofs, (1, nd)).ravel().astype(np.int64)
+        keys, slots = np.unique(I * n_dof + J, return_inverse=True)
+        rows = keys // n_dof
+        idx_dtype = index_dtype(max(keys.size, n_dof))
+        indices = (keys - rows * n_dof).astype(idx_dtype)
+        indptr = np.zeros(n_dof + 1, dtype=idx_dtype)
+        np.cumsum(np.bincount(rows, minlength=n_dof), out=indptr[1:])
+        return cls(
+            n_dof=int(n_dof),
+            edofs=edofs,
+            indptr=indptr,
+            indices=indices,
+            slots=slots.reshape(nelem, nd * nd).astype(index_dtype(max(keys.size - 1, 0))),
+        )
+
+    @property
+    def nnz(self) -> int:
+        return int(self.indices.size)
+
+    def assemble(self, Ke: np.ndarray) -> csr_matrix:
+        '''Global CSR matrix from element matrices Ke (nelem,nd,nd).'''
+        Ke = np.asarray(Ke, dtype=float)
+        if Ke.size != self.slots.size:
+            raise ValueError(f"Ke shape {Ke.shape} does not match assembly plan "
+                             f"({self.slots.shape[0]} elements, {self.edofs.shape[1]} dofs each).")
+        data = np.bincount(self.slots.ravel(), weights=Ke.ravel(), minlength=self.nnz)
+        return csr_matrix((data, self.indices, self.indptr), shape=(self.n_dof, self.n_dof))
+
+    def assemble_vector(self, fe: np.ndarray) -> np.ndarray:
+        '''Global vector from element vectors fe (nelem,nd).'''
+        fe = np.asarray(fe, dtype=float)
+        return np.bincount(self.edofs.ravel(), weights=fe.ravel(), minlength=self.n_dof)
@@ -1,11 +1,165 @@
 from __future__ import annotations
+from dataclasses import dataclass, field
 import numpy as np
 from scipy.sparse import csr_matrix
 
 def apply_dirichlet(K: csr_matrix, f: np.ndarray, dbc: dict[int, float]):
-    K = K.tolil()
-    for dof, val in dbc.items():
-        K.rows[dof] = [dof]
-        K.data[dof] = [1.0]
-        f[dof] = val
-    return K.tocsr(), f
+    '''
+    Legacy row-replacement Dirichlet: rows of constrained dofs become identity rows and
+    f[dof] = value. The result is generally nonsymmetric; see `apply_dirichlet_symmetric`
+    and `DirichletPartition` for SPD-preserving variants.
+    '''
+    dofs = np.fromiter(dbc.keys(), dtype=np.int64, count=len(dbc))
+    values = np.fromiter(dbc.values(), dtype=float, count=len(dbc))
+    K = csr_matrix(K, dtype=float, copy=True)
+    K.sum_duplicates()
+    fixed = np.zeros(K.shape[0], dtype=bool)
+    fixed[dofs] = True
+    rows = _entry_rows(K)
+    K.data[fixed[rows]] = 0.0
+    K = _set_unit_diagonal(K, dofs)
+    K.eliminate_zeros()
+    f[dofs] = values
+    return K, f
+
+def apply_dirichlet_symmetric(K: csr_matrix, f: np.ndarray, dofs, values):
+    '''
+    Symmetric lifting: f -= K[:, d] u_d, then rows and columns of the constrained dofs are
+    zeroed with a unit diagonal and f[d] = u_d. Works on the CSR arrays directly and keeps
+    the sparsity pattern (eliminated entries are stored as explicit zeros).
+
+    Returns (K_lifted, f_lifted); inputs are not modified.
+    '''
+    dofs = np.asarray(dofs, dtype=np.int64).ravel()
+    values = np.asarray(values, dtype=float).ravel()
+    K = csr_matrix(K, dtype=float, copy=True)
+    K.sum_duplicates()
+    f = np.array(f, dtype=float)
+    ud = np.zeros(K.shape[0], dtype=float)
+    ud[dofs] = values
+    f -= K @ ud
+    fixed = np.zeros(K.shape[0], dtype=bool)
+    fixed[dofs] = True
+    K.data[fixed[_entry_rows(K)] | fixed[K.indices]] = 0.0
+    K = _set_unit_diagonal(K, dofs)
+    f[dofs] = values
+    return K, f
+
+def merge_dirichlet(dofs_list, values_list) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Concatenate Dirichlet (dofs, values) pieces; a dof set several times keeps its last value.
+    Returns sorted unique dofs and their values.
+    '''
+    if not dofs_list:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=float)
+    dofs = np.concatenate([np.asarray(d, dtype=np.int64).ravel() for d in dofs_list])
+    values = np.concatenate([np.asarray(v, dtype=float).ravel() for v in values_list])
+    udofs, last = _last_occurrence(dofs)
+    return udofs, values[last]
+
+def _last_occurrence(dofs) -> tuple[np.ndarray, np.ndarray]:
+    '''Sorted unique dofs and, for each, the position of its last occurrence in dofs.'''
+    dofs = np.asarray(dofs, dtype=np.int64).ravel()
+    udofs, last = np.unique(dofs[::-1], return_index=True)
+    return udofs, dofs.size - 1 - last
+
+@dataclass(frozen=True)
+class DirichletPartition:
+    '''
+    Split of the dofs into constrained (`dofs`, sorted) and `free` sets, built once and
+    reused for every solve with the same Dirichlet dof set.
+
+    `reduce` extracts the free-dof system K_ff u_f = f_f - K_fd u_d straight from the CSR
+    arrays; `expand` scatters a free-dof solution back to full length. The Dirichlet values
+    they take are aligned with the sorted `dofs`; build with `from_dofs_values` to sort
+    values given in any dof order along with their dofs.
+    '''
+    n_dof: int
+    dofs: np.ndarray
+    free: np.ndarray
+    _fixed_mask: np.ndarray = field(repr=False)
+    _free_index: np.ndarray = field(repr=False)
+
+    @classmethod
+    def from_dofs(cls, n_dof: int, dofs) -> DirichletPartition:
+        dofs = np.unique(np.asarray(dofs, dtype=np.int64).ravel())
+        if dofs.size and (dofs[0] < 0 or dofs[-1] >= n_dof):
+            raise ValueError(f"Dirichlet dofs out of range [0, {n_dof}).")
+        fixed = np.zeros(n_dof, dtype=bool)
+        fixed[dofs] = True
+        free = np.flatnonzero(~fixed)
+        free_index = np.full(n_dof, -1, dtype=np.int64)
+        free_index[free] = np.arange(free.size)
+        return cls(n_dof=int(n_dof), dofs=dofs, free=free, _fixed_mask=fixed, _free_index=free_index)
+
+    @classmethod
+    def from_dofs_values(cls, n_dof: int, dofs, values) -> tuple[DirichletPartition, np.ndarray]:
+        '''
+        Partition and the values (ndir,) or (ndir,nrhs) reordered to its sorted `dofs`;
+        dofs may come in any order, a repeated dof takes its last value.
+        '''
+        dofs = np.asarray(dofs, dtype=np.int64).ravel()
+        values = np.asarray(values, dtype=float)
+        if values.shape[:1] != dofs.shape:
+            raise ValueError(f"Expected {dofs.size} Dirichlet values, got shape {values.shape}.")
+        _, last = _last_occurrence(dofs)
+        return cls.from_dofs(n_dof, dofs), values[last]
+
+    def reduce_matrix(self, K: csr_matrix) -> tuple[csr_matrix, csr_matrix]:
+        '''Return (K_ff, K_fd) with K_fd = K[free][:, dofs].'''
+        K = csr_matrix(K)
+        if not K.has_canonical_format:
+            K = K.copy()
+            K.sum_duplicates()
+        rows = _entry_rows(K)
+        row_free = ~self._fixed_mask[rows]
+        col_free = ~self._fixed_mask[K.indices]
+        K_ff = _compress(K, rows, row_free & col_free, self._free_index, self._free_index, self.free.size, self.free.size)
+        fixed_index = np.full(self.n_dof, -1, dtype=np.int64)
+        fixed_index[self.dofs] = np.arange(self.dofs.size)
+        K_fd = _compress(K, rows, row_free & ~col_free, self._free_index, fixed_index, self.free.size, self.dofs.size)
+        return K_ff, K_fd
+
+    def reduce(self, K: csr_matrix, f: np.ndarray, values) -> tuple[csr_matrix, np.ndarray]:
+        '''Free-dof system (K_ff, f_f - K_fd u_d); f may be (n_dof,) or (n_dof,nrhs).'''
+        K_ff, K_fd = self.reduce_matrix(K)
+        f = np.asarray(f, dtype=float)
+        return K_ff, f[self.free] - K_fd @ self._values_like(values, f.ndim)
+
+    def expand(self, u_free: np.ndarray, values) -> np.ndarray:
+        '''Full-length solution from free-dof values u_free and Dirichlet values.'''
+        u_free = np.asarray(u_free, dtype=float)
+        u = np.empty((self.n_dof,) + u_free.shape[1:], dtype=float)
+        u[self.dofs] = self._values_like(values, u_free.ndim)
+        u[self.free] = u_free
+        return u
+
+    def _values_like(self, values, ndim: int) -> np.ndarray:
+        values = np.asarray(values, dtype=float)
+        if values.shape[0] != self.dofs.size:
+            raise ValueError(f"Expected {self.dofs.size} Dirichlet values, got {values.shape[0]}.")
+        return values[:, None] if ndim == 2 and values.ndim == 1 else values
+
+def _entry_rows(K: csr_matrix) -> np.ndarray:
+    return np.repeat(np.arange(K.shape[0]), np.diff(K.indptr))
+
+def _set_unit_diagonal(K: csr_matrix, dofs: np.ndarray) -> csr_matrix:
+    rows = _entry_rows(K)
+    on_diag = rows == K.indices
+    has_diag = np.zeros(K.shape[0], dtype=bool)
+    has_diag[rows[on_diag]] = True
+    fixed = np.zeros(K.shape[0], dtype=bool)
+    fixed[dofs] = True
+    K.data[on_diag & fixed[rows]] = 1.0
+    missing = dofs[~has_diag[dofs]]
+    if missing.size:
+        ones = csr_matrix((np.ones(missing.size), (missing, missing)), shape=K.shape)
+        K = (K + ones).tocsr()
+    return K
+
+def _compress(K: csr_matrix, rows, keep, row_map, col_map, nrows: int, ncols: int) -> csr_matrix:
+    new_rows = row_map[rows[keep]]
+    indptr = np.zeros(nrows + 1, dtype=K.indptr.dtype)
+    np.cumsum(np.bincount(new_rows, minlength=nrows), out=indptr[1:])
+    indices = col_map[K.indices[keep]].astype(K.indices.dtype)
+    return csr_matrix((K.data[keep], indices, indptr), shape=(nrows, ncols))
@@ -1,86 +1,197 @@
 from __future__ import annotations
 import numpy as np
-from scipy.sparse.linalg import spsolve
 
-from .shape_t3 import t3_area_and_grads
-from .assembly import assemble_global, add_local_to_triplets
-from .bc import apply_dirichlet
+from .assembly import AssemblyPlan
+from .linear_system import FactorizationCache, array_digest
+from .linsolve import solve_with_dirichlet
+from .loads import element_load_vectors, nodal_values
+from .bc import merge_dirichlet
 from .traction import add_elasticity_traction_rhs
+from .matrix_free import ElasticityOperator
+from .parallel import ParallelAssembler
+from .quadrature import triangle_rule
+from .shape_t3 import t3_areas_and_grads
+from .shape_t6 import t6_shape_gradients
+from pyfemlite.cache import DiskCache, resolve_disk_cache, validate_boundary_cached
 from pyfemlite.mesh.boundary import Boundary
-
+from pyfemlite.mesh.mesh import Mesh, as_mesh
+from pyfemlite.profiling import profiled, stage
+
+def elasticity_B_matrices(dNdx: np.ndarray) -> np.ndarray:
+    '''
+    Strain-displacement matrices for a batch of elements.
+
+    dNdx : (nelem,nen,2) shape function gradients
+    Returns (nelem,3,2*nen) with strain ordering (exx, eyy, gxy) and interleaved dofs.
+    '''
+    nelem, nen = dNdx.shape[0], dNdx.shape[1]
+    B = np.zeros((nelem, 3, 2 * nen), dtype=float)
+    B[:, 0, 0::2] = dNdx[:, :, 0]
+    B[:, 1, 1::2] = dNdx[:, :, 1]
+    B[:, 2, 0::2] = dNdx[:, :, 1]
+    B[:, 2, 1::2] = dNdx[:, :, 0]
+    return B
+
+def elasticity_element_stiffness(A: np.ndarray, B: np.ndarray, D: np.ndarray) -> np.ndarray:
+    '''
+    Element stiffness matrices Ke = B^T D B * A for a batch of constant-strain elements.
+
+    Returns (nelem,2*nen,2*nen).
+    '''
+    DB = np.einsum("kl,elj->ekj", D, B)
+    return np.einsum("eki,ekj->eij", B, DB) * np.asarray(A)[:, None, None]
+
+def elasticity_element_stiffness_t6(A: np.ndarray, dLdx: np.ndarray, D: np.ndarray) -> np.ndarray:
+    '''
+    Element stiffness matrices of straight-sided T6 elements from the corner gradients dLdx
+    (nelem,3,2) of `t3_areas_and_grads`, integrated exactly with the 3-point rule.
+
+    Returns (nelem,12,12).
+    '''
+    bary, w = triangle_rule(3)
+    dNdx = t6_shape_gradients(bary, dLdx)
+    Nx, Ny = dNdx[..., 0], dNdx[..., 1]     # (nelem,nq,6)
+    wA = w[None, :, None] * np.asarray(A)[:, None, None]
+    # quadrature sums of the gradient products, e.g. xx[e,a,b] = sum_q wA dN_a/dx dN_b/dx;
+    # the 6x6 blocks of the x/y dof components are combinations of these (no 3x12 B matrices)
+    xx = np.matmul((Nx * wA).transpose(0, 2, 1), Nx)
+    yy = np.matmul((Ny * wA).transpose(0, 2, 1), Ny)
+    xy = np.matmul((Nx * wA).transpose(0, 2, 1), Ny)
+    yx = xy.transpose(0, 2, 1)
+    d = np.asarray(D, dtype=float)
+    Ke = np.empty((A.shape[0], 6, 2, 6, 2))
+    Ke[:, :, 0, :, 0] = d[0, 0] * xx + d[0, 2] * xy + d[2, 0] * yx + d[2, 2] * yy
+    Ke[:, :, 0, :, 1] = d[0, 1] * xy + d[0, 2] * xx + d[2, 1] * yy + d[2, 2] * yx
+    Ke[:, :, 1, :, 0] = d[1, 0] * yx + d[1, 2] * yy + d[2, 0] * xx + d[2, 2] * xy
+    Ke[:, :, 1, :, 1] = d[1, 1] * yy + d[1, 2] * yx + d[2, 1] * xy + d[2, 2] * xx
+    return Ke.reshape(A.shape[0], 12, 12)
+
+def elasticity_stiffness_kernel(X: np.ndarray, T: np.ndarray, D: np.ndarray) -> np.ndarray:
+    '''Element stiffness matrices of the elements T, geometry included (`ParallelAssembler` kernel).'''
+    A, dNdx = t3_areas_and_grads(X, T)
+    if T.shape[1] == 6:
+        return elasticity_element_stiffness_t6(A, dNdx, D)
+    return elasticity_element_stiffness(A, elasticity_B_matrices(dNdx), D)
+
+def rigid_body_modes(X: np.ndarray) -> np.ndarray:
+    '''In-plane rigid body modes (x-translation, y-translation, rotation) as (2*nnode,3).'''
+    R = np.zeros((2 * X.shape[0], 3), dtype=float)
+    R[0::2, 0] = 1.0
+    R[1::2, 1] = 1.0
+    R[0::2, 2] = -X[:, 1]
+    R[1::2, 2] = X[:, 0]
+    return R
+
+@profiled("solve_elasticity_t3")
 def solve_elasticity_t3(
-    X, T, D,
+    X: np.ndarray | Mesh, T: np.ndarray | None, D,
     body_force,
     *,
     boundary: Boundary | None = None,
     dirichlet: dict[str, callable] | None = None,   # group -> (ux,uy)
     traction: dict[str, callable] | None = None,    # group -> (tx,ty)
     validate_boundary: bool = False,
+    volume_quadrature: int | None = None,
+    edge_quadrature: int = 2,
+    vectorized: bool | None = None,
+    plan: AssemblyPlan | None = None,
+    cache: FactorizationCache | None = None,
+    disk_cache: DiskCache | str | bool | None = None,
+    solver: str = "direct",
+    preconditioner: str | None = "jacobi",
+    rtol: float = 1e-10,
+    maxiter: int | None = None,
+    x0: np.ndarray | None = None,
+    return_info: bool = False,
+    workers: int | None = None,
+    chunk_size: int = 1 << 16,
+    parallel_backend: str = "thread",
+    reorder: str | None = None,
+    profile: bool = False,   # handled by @profiled
     # legacy explicit
     dbc_dofs: dict[int, float] | None = None,
     traction_edges=None,
     traction_func=None,
 ):
-    if validate_boundary and boundary is not None:
-        boundary.validate(X, T, strict=True)
-
-    nnode = X.shape[0]
-    ndof = 2 * nnode
-    I, J, V = [], [], []
-    f = np.zeros(ndof, dtype=float)
-
-    for e in range(T.shape[0]):
-        conn = T[e]
-        Xe = X[conn, :]
-        A, dNdx = t3_area_and_grads(Xe)
-
-        B = np.zeros((3, 6), dtype=float)
-        for a in range(3):
-            dN_dx, dN_dy = dNdx[a, 0], dNdx[a, 1]
-            B[0, 2*a + 0] = dN_dx
-            B[1, 2*a + 1] = dN_dy
-            B[2, 2*a + 0] = dN_dy
-            B[2, 2*a + 1] = dN_dx
-
-        Ke = (B.T @ D @ B) * A
-
-        xc = Xe.mean(axis=0)
-        bx, by = body_force(xc[0], xc[1])
-
-        fe = np.zeros(6, dtype=float)
-        for a in range(3):
-            fe[2*a + 0] = bx * A / 3.0
-            fe[2*a + 1] = by * A / 3.0
-
-        edofs = np.array([2*conn[0], 2*conn[0]+1,
-                          2*conn[1], 2*conn[1]+1,
-                          2*conn[2], 2*conn[2]+1], dtype=int)
-
-        add_local_to_triplets(edofs, Ke, I, J, V)
-        f[edofs] += fe
-
-    if boundary is not None and traction:
-        for grp, tr_fn in traction.items():
-            add_elasticity_traction_rhs(f, X, boundary.edges[grp], tr_fn)
-
-    if traction_edges is not None and traction_func is not None:
-        add_elasticity_traction_rhs(f, X, traction_edges, traction_func)
-
-    K = assemble_global(ndof, I, J, V)
-
-    dbc: dict[int, float] = {}
-
-    if boundary is not None and dirichlet:
-        for grp, disp_fn in dirichlet.items():
-            for n in boundary.nodes[grp]:
-                x, y = X[int(n)]
-                ux, uy = disp_fn(float(x), float(y))
-                dbc[2*int(n)] = float(ux)
-                dbc[2*int(n)+1] = float(uy)
-
-    if dbc_dofs is not None:
-        dbc.update(dbc_dofs)
-
-    Kb, fb = apply_dirichlet(K, f, dbc)
-    u = spsolve(Kb, fb)
-    return u
+    with stage("setup") as s:
+        mesh = as_mesh(X, T)
+        disk = resolve_disk_cache(disk_cache)
+        renum = None
+        if reorder is not None:
+            if plan is not None:
+                raise ValueError("plan cannot be combined with reorder (it refers to the original numbering).")
+            renum, mesh = mesh.renumbered(reorder)
+            boundary = renum.permute_boundary(boundary)
+            x0 = renum.to_new(x0, 2)
+            traction_edges = renum.permute_nodes(traction_edges)
+            if dbc_dofs is not None:
+                dbc_dofs = dict(zip(renum.permute_dofs(list(dbc_dofs), 2).tolist(), dbc_dofs.values()))
+        X, T = mesh.X, mesh.T
+        if validate_boundary and boundary is not None:
+            validate_boundary_cached(boundary, mesh, disk)
+
+        nnode = X.shape[0]
+        ndof = 2 * nnode
+        f = np.zeros(ndof, dtype=float)
+        if plan is None and solver != "matrix_free":
+            plan = mesh.assembly_plan(2, disk_cache=disk)
+        elif plan is not None and (plan.n_dof != ndof or plan.edofs.shape[0] != T.shape[0]):
+            raise ValueError("AssemblyPlan does not match the mesh (n_dof or element count differ).")
+
+        A, dNdx = mesh.geometry()
+        s.update(nelem=int(T.shape[0]), ndof=ndof, reorder=reorder)
+
+    with stage("loads"):
+        # matrix-free solves never build the CSR pattern; loads are scattered straight from the dof table
+        assemble_vector = plan.assemble_vector if plan is not None else (
+            lambda fe: np.bincount(mesh.element_dofs(2).ravel(), weights=fe.ravel(), minlength=ndof))
+        f += assemble_vector(element_load_vectors(
+            X, T, A, body_force, ncomp=2, quadrature=volume_quadrature, vectorized=vectorized))
+
+        if boundary is not None and traction:
+            for grp, tr_fn in traction.items():
+                add_elasticity_traction_rhs(f, X, boundary.edges[grp], tr_fn, order=edge_quadrature, vectorized=vectorized)
+
+        if traction_edges is not None and traction_func is not None:
+            add_elasticity_traction_rhs(f, X, traction_edges, traction_func, order=edge_quadrature, vectorized=vectorized)
+
+    with stage("dirichlet_values") as s:
+        dofs_list, values_list = [], []
+
+        if boundary is not None and dirichlet:
+            for grp, disp_fn in dirichlet.items():
+                nodes = np.asarray(boundary.nodes[grp], dtype=int)
+                dofs_list.append(2 * nodes[:, None] + np.arange(2))
+                values_list.append(nodal_values(X, nodes, disp_fn, ncomp=2, vectorized=vectorized))
+
+        if dbc_dofs is not None:
+            dofs_list.append(np.fromiter(dbc_dofs.keys(), dtype=int, count=len(dbc_dofs)))
+            values_list.append(np.fromiter(dbc_dofs.values(), dtype=float, count=len(dbc_dofs)))
+
+        dofs, values = merge_dirichlet(dofs_list, values_list)
+        s["n_dirichlet"] = int(dofs.size)
+
+    key = operator_key = None
+    if cache is not None or disk is not None:
+        key = FactorizationCache.make_key(mesh, None, D, dofs, tag="elasticity_t3")
+    if disk is not None:
+        operator_key = array_digest(mesh.digest(), np.asarray(D, dtype=float), tag="elasticity_t3/K")
+
+    def assemble_K():
+        if workers is None:
+            if mesh.nen == 6:
+                return plan.assemble(elasticity_element_stiffness_t6(A, dNdx, D))
+            return plan.assemble(elasticity_element_stiffness(A, elasticity_B_matrices(dNdx), D))
+        with ParallelAssembler(plan, workers=workers, chunk_size=chunk_size, backend=parallel_backend) as pa:
+            return pa.assemble(elasticity_stiffness_kernel, X, T, np.asarray(D, dtype=float))
+
+    u, info = solve_with_dirichlet(
+        assemble_K, f, dofs, values,
+        solver=solver, cache=cache, cache_key=key, disk_cache=disk, operator_key=operator_key,
+        preconditioner=preconditioner, rtol=rtol, maxiter=maxiter, x0=x0, check_convergence=not return_info,
+        make_operator=lambda dofs: ElasticityOperator(mesh, None, D, dirichlet_dofs=dofs, chunk_size=chunk_size),
+        near_nullspace=rigid_body_modes(X), dofs_per_node=2,
+    )
+    if renum is not None:
+        u = renum.to_original(u, 2)
+    return (u, info) if return_info else u
@@ -1,25 +1,35 @@
 from __future__ import annotations
 import numpy as np
-from .quadrature import gauss_legendre_2, map_edge_reference_to_physical
+from .quadrature import edge_shape_functions, gauss_legendre, map_edges_reference_to_physical
+from .loads import evaluate_pointwise
 
-def add_poisson_neumann_rhs(f: np.ndarray, X: np.ndarray, edges: np.ndarray, g_func):
-    xi_q, w_q = gauss_legendre_2()
+def add_poisson_neumann_rhs(
+    f: np.ndarray,
+    X: np.ndarray,
+    edges: np.ndarray,
+    g_func,
+    *,
+    order: int = 2,
+    vectorized: bool | None = None,
+):
+    '''
+    Add the Neumann flux g = kappa*grad(u).n, g = g_func(x, y), integrated along edges to f.
 
+    Batched over all edges and `order` Gauss points, with one vectorized call of g_func
+    when possible (see `evaluate_pointwise`). (nedge,3) edges (a, b, m) of T6 meshes use
+    quadratic edge shape functions.
+    '''
     edges = np.asarray(edges, dtype=int)
     if edges.size == 0:
         return
+    edges = edges.reshape(-1, edges.shape[1] if edges.ndim == 2 else 2)
 
-    for (na, nb) in edges:
-        na = int(na); nb = int(nb)
-        Xa = X[na]; Xb = X[nb]
-        edofs = np.array([na, nb], dtype=int)
-        fe = np.zeros(2, dtype=float)
+    xi_q, w_q = gauss_legendre(order)
+    x, J = map_edges_reference_to_physical(xi_q, X[edges[:, 0]], X[edges[:, 1]])
+    ne, nq = x.shape[0], x.shape[1]
+    g = evaluate_pointwise(g_func, x[..., 0], x[..., 1], 1, vectorized).reshape(ne, nq)
 
-        for xi, w in zip(xi_q, w_q):
-            x, J = map_edge_reference_to_physical(float(xi), Xa, Xb)
-            g = float(g_func(float(x[0]), float(x[1])))
-            Na = 0.5 * (1.0 - xi)
-            Nb = 0.5 * (1.0 + xi)
-            fe += np.array([Na, Nb], dtype=float) * (g * w * J)
-
-        f[edofs] += fe
+    gwJ = g * w_q[None, :] * J[:, None]
+    N = edge_shape_functions(xi_q, edges.shape[1])
+    for a in range(edges.shape[1]):
+        np.add.at(f, edges[:, a], gwJ @ N[:, a])
@@ -0,0 +1,192 @@
+from __future__ import annotations
+import hashlib
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.linalg import splu, spsolve_triangular
+
+from .bc import DirichletPartition, _last_occurrence
+from pyfemlite.mesh.mesh import Mesh
+
+def array_digest(*arrays, tag: str = "") -> str:
+    '''
+    Content hash of a sequence of arrays (shape, dtype and bytes) plus an optional tag.
+    Scalars, strings and None are accepted and hashed by value.
+    '''
+    h = hashlib.sha1(tag.encode("utf-8"))
+    for a in arrays:
+        if a is None:
+            h.update(b"none")
+            continue
+        if isinstance(a, str):
+            h.update(a.encode("utf-8"))
+            continue
+        a = np.ascontiguousarray(a)
+        h.update(f"{a.dtype.str}{a.shape}".encode("utf-8"))
+        h.update(a.tobytes())
+    return h.hexdigest()
+
+def csr_to_arrays(M, name: str) -> dict[str, np.ndarray]:
+    '''CSR components of M as named arrays ("<name>.data", ".indices", ".indptr", ".shape").'''
+    M = csr_matrix(M)
+    return {f"{name}.data": M.data, f"{name}.indices": M.indices, f"{name}.indptr": M.indptr,
+            f"{name}.shape": np.asarray(M.shape, dtype=np.int64)}
+
+def csr_from_arrays(arrays: dict[str, np.ndarray], name: str) -> csr_matrix:
+    '''Inverse of `csr_to_arrays`; the components are used without copying (memmaps stay mapped).'''
+    shape = tuple(int(n) for n in arrays[f"{name}.shape"])
+    return csr_matrix((arrays[f"{name}.data"], arrays[f"{name}.indices"], arrays[f"{name}.indptr"]), shape=shape)
+
+class StoredFactors:
+    '''
+    Sparse LU factors Pr A Pc = L U kept as plain CSR arrays, solved with two triangular
+    solves. Stands in for a SuperLU object (which cannot be saved) when a factorization is
+    reloaded, e.g. memory-mapped from a `DiskCache`; a solve is slower than SuperLU's
+    supernodal one but needs no refactorization.
+    '''
+
+    def __init__(self, L: csr_matrix, U: csr_matrix, perm_r: np.ndarray, perm_c: np.ndarray):
+        self.L, self.U = L, U
+        self.perm_r, self.perm_c = perm_r, perm_c
+
+    def solve(self, b: np.ndarray) -> np.ndarray:
+        y = np.empty_like(b, dtype=float)
+        y[self.perm_r] = b
+        z = spsolve_triangular(self.L, y, lower=True, unit_diagonal=True)
+        return spsolve_triangular(self.U, z, lower=False)[self.perm_c]
+
+class LinearSystem:
+    '''
+    Global operator with a fixed Dirichlet dof set, factorized once and reused for any
+    number of right-hand sides.
+
+    The free-dof block K_ff is factorized (symmetric-mode sparse LU with a minimum-degree
+    ordering on K+K^T), so only the dof set -- not the prescribed values -- enters the
+    factorization; K_fd is kept to lift new Dirichlet values onto the right-hand side.
+    Dirichlet values are matched to the dofs in the order given (`dirichlet_dofs`), which
+    need not be sorted; a repeated dof takes its last value.
+    '''
+
+    def __init__(self, K: csr_matrix, dirichlet_dofs=None):
+        dofs = np.array([] if dirichlet_dofs is None else dirichlet_dofs, dtype=np.int64).ravel()
+        partition = DirichletPartition.from_dofs(int(K.shape[0]), dofs)
+        self._factorize(partition, *partition.reduce_matrix(K))
+        self._set_dirichlet_order(dofs)
+
+    @classmethod
+    def from_reduced(cls, partition: DirichletPartition, K_ff: csr_matrix, K_fd: csr_matrix) -> LinearSystem:
+        '''System from blocks that are already reduced with `partition` (K_ff, K_fd).'''
+        system = cls.__new__(cls)
+        system._factorize(partition, K_ff, K_fd)
+        system._set_dirichlet_order(partition.dofs)
+        return system
+
+    def _factorize(self, partition: DirichletPartition, K_ff: csr_matrix, K_fd: csr_matrix) -> None:
+        self.n_dof = partition.n_dof
+        self.partition = partition
+        self._K_fd = K_fd
+        self._lu = splu(K_ff.tocsc(), permc_spec="MMD_AT_PLUS_A", options=dict(SymmetricMode=True))
+
+    def _set_dirichlet_order(self, dofs: np.ndarray) -> None:
+        # values given per `dofs` are gathered into the sorted order of `partition.dofs`
+        self._dirichlet_dofs = dofs
+        _, last = _last_occurrence(dofs)
+        self._value_order = None if np.array_equal(last, np.arange(dofs.size)) else last
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        '''Named arrays (LU factors, permutations, K_fd, dof set) that `from_arrays` turns back into this system.'''
+        arrays = {"n_dof": np.asarray(self.n_dof, dtype=np.int64), "dirichlet_dofs": self._dirichlet_dofs,
+                  "perm_r": self._lu.perm_r, "perm_c": self._lu.perm_c}
+        arrays.update(csr_to_arrays(self._lu.L, "L"))
+        arrays.update(csr_to_arrays(self._lu.U, "U"))
+        arrays.update(csr_to_arrays(self._K_fd, "K_fd"))
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, np.ndarray]) -> LinearSystem:
+        '''System from `to_arrays` output without refactorizing; solves use `StoredFactors`.'''
+        system = cls.__new__(cls)
+        system.n_dof = int(arrays["n_dof"])
+        dofs = np.array(arrays["dirichlet_dofs"], dtype=np.int64)
+        system.partition = DirichletPartition.from_dofs(system.n_dof, dofs)
+        system._set_dirichlet_order(dofs)
+        system._K_fd = csr_from_arrays(arrays, "K_fd")
+        system._lu = StoredFactors(csr_from_arrays(arrays, "L"), csr_from_arrays(arrays, "U"),
+                                   arrays["perm_r"], arrays["perm_c"])
+        return system
+
+    @property
+    def dirichlet_dofs(self) -> np.ndarray:
+        '''Dirichlet dofs in the order given; `solve` matches dirichlet_values to it.'''
+        return self._dirichlet_dofs
+
+    @property
+    def factor_nnz(self) -> int:
+        return int(self._lu.L.nnz + self._lu.U.nnz)
+
+    def solve(self, F: np.ndarray, dirichlet_values=None) -> np.ndarray:
+        '''
+        Solve for one (ndof,) or many (ndof,nrhs) right-hand sides.
+
+        dirichlet_values are aligned with `dirichlet_dofs` (the order given at construction),
+        shape (ndir,) or (ndir,nrhs); if None the Dirichlet rows of F are taken as the
+        prescribed values.
+        '''
+        F = np.asarray(F, dtype=float)
+        if F.shape[0] != self.n_dof:
+            raise ValueError(f"RHS has {F.shape[0]} rows, system has {self.n_dof} dofs.")
+        P = self.partition
+        if dirichlet_values is None:
+            vals = F[P.dofs]
+        else:
+            vals = np.asarray(dirichlet_values, dtype=float)
+            if vals.shape[0] != self._dirichlet_dofs.size:
+                raise ValueError(f"Expected {self._dirichlet_dofs.size} Dirichlet values, got {vals.shape[0]}.")
+            vals = P._values_like(vals if self._value_order is None else vals[self._value_order], F.ndim)
+        rhs = F[P.free] - self._K_fd @ vals
+        return P.expand(self._lu.solve(rhs), vals)
+
+class FactorizationCache:
+    '''
+    In-memory store of factorized `LinearSystem`s keyed on mesh, material and Dirichlet dof set.
+
+    Nothing is evicted implicitly; call `evict(key)` or `clear()` when a factorization is stale.
+    '''
+
+    def __init__(self):
+        self._systems: dict[str, LinearSystem] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(X, T, material, dirichlet_dofs, *, tag: str = "") -> str:
+        '''Key from the mesh (arrays or a `Mesh`, whose digest is cached), material and dof set.'''
+        dofs = np.unique(np.asarray(dirichlet_dofs, dtype=np.int64).ravel())
+        geom = (X.digest(),) if isinstance(X, Mesh) else (X, T)
+        return array_digest(*geom, np.asarray(material, dtype=float), dofs, tag=tag)
+
+    def get(self, key: str) -> LinearSystem | None:
+        system = self._systems.get(key)
+        if system is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return system
+
+    def put(self, key: str, system: LinearSystem) -> LinearSystem:
+        self._systems[key] = system
+        return system
+
+    def evict(self, key: str) -> bool:
+        return self._systems.pop(key, None) is not None
+
+    def clear(self) -> None:
+        self._systems.clear()
+
+    def keys(self) -> list[str]:
+        return list(self._systems.keys())
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._systems
+
+    def __len__(self) -> int:
+        return len(self._systems)
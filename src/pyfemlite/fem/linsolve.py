@@ -0,0 +1,160 @@
+from __future__ import annotations
+import time
+from typing import Callable
+import numpy as np
+from scipy.sparse import csc_matrix, csr_matrix
+from scipy.sparse.linalg import splu
+
+from .bc import DirichletPartition
+from .iterative import SolveInfo, pcg, solve_cg
+from .linear_system import FactorizationCache, LinearSystem, csr_from_arrays, csr_to_arrays
+from pyfemlite.cache import DiskCache
+from pyfemlite.profiling import stage
+
+SOLVERS = ("direct", "cg", "matrix_free")
+
+def solve_with_dirichlet(
+    assemble_K: Callable[[], csr_matrix],
+    f: np.ndarray,
+    dofs: np.ndarray,
+    values: np.ndarray,
+    *,
+    solver: str = "direct",
+    cache: FactorizationCache | None = None,
+    cache_key: str | None = None,
+    preconditioner: str | None = "jacobi",
+    rtol: float = 1e-10,
+    maxiter: int | None = None,
+    x0: np.ndarray | None = None,
+    near_nullspace: np.ndarray | None = None,
+    dofs_per_node: int = 1,
+    make_operator: Callable | None = None,
+    disk_cache: DiskCache | None = None,
+    operator_key: str | None = None,
+    check_convergence: bool = True,
+):
+    '''
+    Shared back end of the physics solvers: impose Dirichlet values and solve K u = f.
+
+    assemble_K is only called when the operator is actually needed (not on a cache hit).
+
+    Both back ends work on the SPD free-dof system K_ff u_f = f_f - K_fd u_d (`DirichletPartition`).
+    solver="direct": sparse LU of K_ff (cached in `cache` if given).
+    disk_cache: a `pyfemlite.cache.DiskCache`; stores K under operator_key and, for the
+    direct solver, the factorization under cache_key, so later runs skip assembly and LU.
+    Stored factors are only solved with when no memory `cache` is given; with one, a miss is
+    refactorized from the disk-cached K so repeated solves keep SuperLU's speed.
+    solver="cg": preconditioned CG, warm-started from x0 (full-length) if given. With
+    check_convergence a run that stops at maxiter raises ValueError; pass False to get the
+    partial solution and inspect `SolveInfo.converged` instead.
+    solver="matrix_free": CG on make_operator(dofs), a Dirichlet-masked `MatrixFreeOperator`
+    (K is never assembled); preconditioner "jacobi" or None; convergence is checked as for "cg".
+
+    Returns (u, SolveInfo).
+    '''
+    ndof = f.shape[0]
+    part, values = DirichletPartition.from_dofs_values(ndof, dofs, values)
+    dofs = part.dofs
+
+    def operator() -> csr_matrix:
+        if disk_cache is None or operator_key is None:
+            return _assemble(assemble_K)
+        arrays = disk_cache.get(operator_key)
+        if arrays is not None:
+            return csr_from_arrays(arrays, "K")
+        K = _assemble(assemble_K)
+        disk_cache.put(operator_key, csr_to_arrays(K, "K"))
+        return K
+
+    if solver == "direct":
+        t0 = time.perf_counter()
+        if cache is not None or disk_cache is not None:
+            with stage("factorize") as s:
+                system = None if cache is None else cache.get(cache_key)
+                # stored factors solve several times slower than SuperLU: with a memory cache,
+                # refactorize once (from the disk-cached operator) and keep that in memory
+                if system is None and cache is None and disk_cache is not None:
+                    arrays = disk_cache.get(cache_key)
+                    system = None if arrays is None else LinearSystem.from_arrays(arrays)
+                    s["disk_cache_hit"] = system is not None
+                s["cache_hit"] = system is not None
+                if system is None:
+                    system = LinearSystem(operator(), dofs)
+                    if disk_cache is not None and cache_key not in disk_cache:
+                        disk_cache.put(cache_key, system.to_arrays())
+                if cache is not None and cache_key not in cache:
+                    cache.put(cache_key, system)
+                s["factor_nnz"] = system.factor_nnz
+            t1 = time.perf_counter()
+            with stage("solve"):
+                u = system.solve(f, values)
+        else:
+            with stage("reduce") as s:
+                K_ff, rhs = part.reduce(operator(), f, values)
+                s.update(n_free=int(part.free.size), n_dirichlet=int(part.dofs.size), nnz_ff=int(K_ff.nnz))
+            with stage("factorize") as s:
+                # the factorization spsolve performs on CSR input (LU of K_ff^T), kept to report its fill
+                lu = splu(csc_matrix((K_ff.data, K_ff.indices, K_ff.indptr), shape=K_ff.shape),
+                          permc_spec="MMD_AT_PLUS_A")
+                factor_nnz = int(lu.L.nnz + lu.U.nnz)
+                s.update(factor_nnz=factor_nnz, fill=round(factor_nnz / max(K_ff.nnz, 1), 3))
+            t1 = time.perf_counter()
+            with stage("solve"):
+                u = part.expand(lu.solve(rhs, trans="T"), values)
+        t2 = time.perf_counter()
+        info = SolveInfo(method="direct", preconditioner=None, converged=True, iterations=0,
+                         residual_norm=0.0, rtol=0.0, history=np.zeros(0),
+                         setup_time=t1 - t0, solve_time=t2 - t1)
+        return u, info
+
+    if solver == "cg":
+        with stage("reduce") as s:
+            K_ff, rhs = part.reduce(operator(), f, values)
+            s.update(n_free=int(part.free.size), n_dirichlet=int(part.dofs.size), nnz_ff=int(K_ff.nnz))
+        dof_node = np.unique(part.free // dofs_per_node, return_inverse=True)[1]
+        B = None if near_nullspace is None else near_nullspace[part.free]
+        x0_f = None if x0 is None else np.asarray(x0, dtype=float)[part.free]
+        u_f, info = solve_cg(K_ff, rhs, preconditioner=preconditioner, x0=x0_f, rtol=rtol,
+                             maxiter=maxiter, near_nullspace=B, dof_node=dof_node)
+        if check_convergence:
+            _check_converged(info)
+        return part.expand(u_f, values), info
+
+    if solver == "matrix_free":
+        if make_operator is None:
+            raise ValueError("solver='matrix_free' needs make_operator.")
+        if preconditioner not in (None, "none", "jacobi"):
+            raise ValueError("solver='matrix_free' supports only the 'jacobi' preconditioner.")
+        t0 = time.perf_counter()
+        with stage("operator"):
+            op = make_operator(dofs)
+            rhs = op.dirichlet_rhs(f, values)
+            M = op.jacobi() if preconditioner == "jacobi" else None
+            if x0 is not None:
+                x0 = np.array(x0, dtype=float)
+                x0[dofs] = values
+        t1 = time.perf_counter()
+        with stage("cg") as s:
+            u, converged, history = pcg(op, rhs, M=M, x0=x0, rtol=rtol, maxiter=maxiter)
+            s.update(iterations=int(history.size - 1), converged=bool(converged))
+        t2 = time.perf_counter()
+        info = SolveInfo(method="matrix_free", preconditioner=preconditioner, converged=converged,
+                         iterations=history.size - 1, residual_norm=float(history[-1]), rtol=rtol,
+                         history=history, setup_time=t1 - t0, solve_time=t2 - t1)
+        if check_convergence:
+            _check_converged(info)
+        return u, info
+
+    raise ValueError(f"Unknown solver '{solver}'. Choose from {SOLVERS}.")
+
+def _check_converged(info: SolveInfo) -> None:
+    if not info.converged:
+        raise ValueError(f"{info.method} did not converge in {info.iterations} iterations "
+                         f"(residual {info.residual_norm:.3e}, rtol {info.rtol:g}); raise maxiter, "
+                         f"use a stronger preconditioner, or pass return_info=True to get the partial solution.")
+
+def _assemble(assemble_K: Callable[[], csr_matrix]) -> csr_matrix:
+    with stage("assemble") as s:
+        K = assemble_K()
+        s.update(nnz=int(K.nnz), bytes=int(K.data.nbytes + K.indices.nbytes + K.indptr.nbytes))
+    return K
@@ -0,0 +1,86 @@
+from __future__ import annotations
+import numpy as np
+from .quadrature import triangle_rule
+from .shape_t6 import t6_shape_functions
+
+def evaluate_pointwise(func, x: np.ndarray, y: np.ndarray, ncomp: int = 1, vectorized: bool | None = None) -> np.ndarray:
+    '''
+    Evaluate a user load/value callable func(x, y) at many points.
+
+    A vectorized callable receives the coordinate arrays and returns either an array of
+    shape (npts,) / (npts,ncomp) or a tuple of ncomp components (arrays or scalars, which
+    are broadcast). With vectorized=None the vectorized call is tried first and the scalar
+    path -- one func(float(x), float(y)) call per point -- is used if it raises or returns
+    an unexpected shape.
+
+    Returns (npts,) for ncomp == 1, else (npts,ncomp).
+    '''
+    x = np.asarray(x, dtype=float).ravel()
+    y = np.asarray(y, dtype=float).ravel()
+    npts = x.size
+    if vectorized is not False and npts:
+        try:
+            out = _as_components(func(x, y), npts, ncomp)
+        except (TypeError, ValueError):
+            if vectorized:
+                raise
+            out = None
+        if out is not None:
+            return out
+        if vectorized:
+            raise ValueError(f"Vectorized callable did not return {ncomp} component(s) for {npts} points.")
+    vals = np.array([func(float(xi), float(yi)) for xi, yi in zip(x, y)], dtype=float)
+    return vals.reshape(npts) if ncomp == 1 else vals.reshape(npts, ncomp)
+
+def _as_components(res, npts: int, ncomp: int):
+    if ncomp == 1:
+        a = np.asarray(res, dtype=float)
+        if a.shape in ((), (npts,), (npts, 1)):
+            return np.broadcast_to(a.reshape(-1) if a.ndim else a, (npts,)).copy()
+        return None
+    if isinstance(res, (tuple, list)) and len(res) == ncomp:
+        comps = [np.asarray(c, dtype=float) for c in res]
+        if all(c.shape in ((), (npts,)) for c in comps):
+            return np.column_stack([np.broadcast_to(c, (npts,)) for c in comps])
+        return None
+    a = np.asarray(res, dtype=float)
+    return a.copy() if a.shape == (npts, ncomp) else None
+
+def element_load_vectors(
+    X: np.ndarray,
+    T: np.ndarray,
+    A: np.ndarray,
+    func,
+    *,
+    ncomp: int = 1,
+    quadrature: int | None = None,
+    vectorized: bool | None = None,
+) -> np.ndarray:
+    '''
+    Consistent element load vectors fe_a = int_e N_a b dA of a volume source b = func(x, y)
+    for linear (T3) or straight-sided quadratic (T6) triangles, using the `quadrature`-point
+    `triangle_rule` on every element (default 1 point for T3, 3 for T6).
+
+    The source is evaluated once on all (nelem*nq) quadrature points (see `evaluate_pointwise`).
+    Returns (nelem,nen) for ncomp == 1, else (nelem,nen*ncomp) with interleaved node components.
+    '''
+    nen = T.shape[1]
+    bary, w = triangle_rule(quadrature if quadrature is not None else (3 if nen == 6 else 1))
+    N = t6_shape_functions(bary) if nen == 6 else bary
+    xq = np.einsum("qa,ead->eqd", bary, X[T[:, :3]])
+    nelem, nq = xq.shape[0], xq.shape[1]
+    b = evaluate_pointwise(func, xq[..., 0], xq[..., 1], ncomp, vectorized).reshape(nelem, nq, ncomp)
+    fe = np.einsum("q,qa,eqc->eac", w, N, b) * np.asarray(A)[:, None, None]
+    return fe.reshape(nelem, nen * ncomp)
+
+def nodal_values(
+    X: np.ndarray,
+    nodes: np.ndarray,
+    func,
+    *,
+    ncomp: int = 1,
+    vectorized: bool | None = None,
+) -> np.ndarray:
+    '''Evaluate a prescribed-value callable func(x, y) at the given nodes.'''
+    nodes = np.asarray(nodes, dtype=int).ravel()
+    return evaluate_pointwise(func, X[nodes, 0], X[nodes, 1], ncomp, vectorized)
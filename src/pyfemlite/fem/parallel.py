@@ -0,0 +1,218 @@
+from __future__ import annotations
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from .assembly import AssemblyPlan
+
+BACKENDS = ("thread", "process")
+
+class ParallelAssembler:
+    '''
+    Parallel element assembly through an `AssemblyPlan` over contiguous element chunks.
+
+    Element matrices are computed chunk by chunk as kernel(X, T[s], *[a[s] for a in elem_args], *args)
+    into one (nelem,nd,nd) buffer. The CSR data array is then reduced in parallel over
+    contiguous slot ranges, each slot summing its contributions in element order: the same
+    order as the serial `AssemblyPlan.assemble`, so the matrix is bitwise identical for any
+    worker count, chunk size and backend.
+
+    backend : "thread" shares the arrays directly (NumPy kernels release the GIL);
+        "process" puts X, T and the work buffers in `multiprocessing.shared_memory` and runs
+        the chunks in a process pool, so the kernel must be a picklable module-level function.
+
+    Use as a context manager (or call `close()`) to shut the pool down.
+    '''
+
+    def __init__(self, plan: AssemblyPlan, *, workers: int | None = None, chunk_size: int = 1 << 16,
+                 backend: str = "thread"):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}'. Choose from {BACKENDS}.")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive.")
+        self.plan = plan
+        self.workers = int(workers or os.cpu_count() or 1)
+        self.chunk_size = int(chunk_size)
+        self.backend = backend
+        self._pool = None
+        self._order = None      # stable argsort of plan.slots.ravel() (array, or shared spec)
+        self._ptr = None        # (nnz+1,) start of every slot among the sorted entries
+        self._ptr_spec = None
+        self._segments: dict = {}
+
+    def __enter__(self) -> ParallelAssembler:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        _release_all(self._segments)
+        self._order = self._ptr = self._ptr_spec = None
+
+    def chunks(self) -> list[tuple[int, int]]:
+        '''(start, stop) element ranges processed as one task each.'''
+        nelem = self.plan.edofs.shape[0]
+        return [(s, min(s + self.chunk_size, nelem)) for s in range(0, nelem, self.chunk_size)]
+
+    def element_matrices(self, kernel, X: np.ndarray, T: np.ndarray, *args, elem_args=()) -> np.ndarray:
+        '''Element matrices (nelem,nd,nd) computed chunk-parallel by `kernel`.'''
+        nelem, nd = self.plan.edofs.shape
+        if T.shape[0] != nelem:
+            raise ValueError(f"T has {T.shape[0]} elements, the assembly plan {nelem}.")
+        for a in elem_args:
+            if np.shape(a)[:1] != (nelem,):
+                raise ValueError(f"Per-element argument with shape {np.shape(a)} does not match {nelem} elements.")
+        pool = self._executor()
+        if self.backend == "thread":
+            Ke = np.empty((nelem, nd, nd), dtype=float)
+
+            def run(rng):
+                s = slice(*rng)
+                Ke[s] = kernel(X, T[s], *[a[s] for a in elem_args], *args)
+
+            list(pool.map(run, self.chunks()))
+            return Ke
+
+        segments: dict = {}
+        try:
+            inputs = [_share(np.asarray(a), segments) for a in (X, T, *elem_args)]
+            out = _share_empty((nelem, nd, nd), float, segments)
+            _wait([pool.submit(_process_chunk, kernel, inputs, out, args, rng) for rng in self.chunks()])
+            return _copy_shared(out, segments)
+        finally:
+            _release_all(segments)
+
+    def reduce(self, Ke: np.ndarray) -> np.ndarray:
+        '''CSR data array (nnz,) from element matrices, reduced in parallel over slot ranges.'''
+        plan = self.plan
+        Ke = np.asarray(Ke, dtype=float)
+        if Ke.size != plan.slots.size:
+            raise ValueError(f"Ke shape {Ke.shape} does not match assembly plan "
+                             f"({plan.slots.shape[0]} elements, {plan.edofs.shape[1]} dofs each).")
+        self._build_reduction()
+        ranges = self._slot_ranges()
+        pool = self._executor()
+        if self.backend == "thread":
+            flat = Ke.reshape(-1)
+            data = np.empty(plan.nnz, dtype=float)
+            list(pool.map(lambda rng: _reduce_range(flat, self._order, self._ptr, data, *rng), ranges))
+            return data
+
+        segments: dict = {}
+        try:
+            flat = _share(Ke.reshape(-1), segments)
+            data = _share_empty((plan.nnz,), float, segments)
+            _wait([pool.submit(_process_reduce, flat, self._order, self._ptr_spec, data, rng) for rng in ranges])
+            return _copy_shared(data, segments)
+        finally:
+            _release_all(segments)
+
+    def assemble(self, kernel, X: np.ndarray, T: np.ndarray, *args, elem_args=()) -> csr_matrix:
+        '''Global CSR matrix: `element_matrices` followed by `reduce`.'''
+        data = self.reduce(self.element_matrices(kernel, X, T, *args, elem_args=elem_args))
+        plan = self.plan
+        return csr_matrix((data, plan.indices, plan.indptr), shape=(plan.n_dof, plan.n_dof))
+
+    def _executor(self):
+        if self._pool is None:
+            cls = ThreadPoolExecutor if self.backend == "thread" else ProcessPoolExecutor
+            self._pool = cls(max_workers=self.workers)
+        return self._pool
+
+    def _build_reduction(self) -> None:
+        if self._ptr is not None:
+            return
+        slots = self.plan.slots.ravel()
+        order = np.argsort(slots, kind="stable")
+        ptr = np.zeros(self.plan.nnz + 1, dtype=np.int64)
+        np.cumsum(np.bincount(slots, minlength=self.plan.nnz), out=ptr[1:])
+        self._ptr = ptr
+        if self.backend == "thread":
+            self._order = order
+        else:
+            self._order = _share(order, self._segments)
+            self._ptr_spec = _share(ptr, self._segments)
+
+    def _slot_ranges(self) -> list[tuple[int, int]]:
+        '''Contiguous slot ranges holding about chunk_size*nd*nd element entries each.'''
+        nd = self.plan.edofs.shape[1]
+        targets = np.arange(0, self._ptr[-1], self.chunk_size * nd * nd)
+        bounds = np.unique(np.concatenate([np.searchsorted(self._ptr, targets), [self.plan.nnz]]))
+        return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+def _reduce_range(flat: np.ndarray, order: np.ndarray, ptr: np.ndarray, data: np.ndarray, s0: int, s1: int) -> None:
+    seg = np.repeat(np.arange(s1 - s0), np.diff(ptr[s0:s1 + 1]))
+    data[s0:s1] = np.bincount(seg, weights=flat[order[ptr[s0]:ptr[s1]]], minlength=s1 - s0)
+
+def _wait(futures) -> None:
+    for fut in futures:
+        fut.result()
+
+# Process backend: arrays travel as (name, shape, dtype) specs of shared-memory segments.
+# Views into a segment must be dropped before it is closed, hence the small helpers.
+
+def _share_empty(shape, dtype, segments: dict):
+    dtype = np.dtype(dtype)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * dtype.itemsize))
+    segments[shm.name] = shm
+    return shm.name, tuple(shape), dtype.str
+
+def _share(a: np.ndarray, segments: dict):
+    spec = _share_empty(a.shape, a.dtype, segments)
+    _view(spec, segments[spec[0]])[...] = a
+    return spec
+
+def _copy_shared(spec, segments: dict) -> np.ndarray:
+    return _view(spec, segments[spec[0]]).copy()
+
+def _view(spec, shm) -> np.ndarray:
+    _, shape, dtype = spec
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+def _release_all(segments: dict) -> None:
+    for shm in segments.values():
+        shm.close()
+        shm.unlink()
+    segments.clear()
+
+def _attach(name: str):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)   # Python >= 3.13
+    except TypeError:
+        # Older Pythons register attached segments with the resource tracker, which then
+        # unlinks them behind the owner's back; the creating process owns their lifetime.
+        from multiprocessing import resource_tracker
+        register = resource_tracker.register
+        resource_tracker.register = lambda *a, **k: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+def _with_shared(specs, func, *args) -> None:
+    shms = [_attach(spec[0]) for spec in specs]
+    try:
+        func(*[_view(spec, shm) for spec, shm in zip(specs, shms)], *args)
+    finally:
+        for shm in shms:
+            try:
+                shm.close()
+            except BufferError:   # views still referenced by a propagating traceback
+                pass
+
+def _chunk_kernel(X, T, *rest):
+    *elem_args, out, kernel, args, (start, stop) = rest
+    s = slice(start, stop)
+    out[s] = kernel(X, T[s], *[a[s] for a in elem_args], *args)
+
+def _process_chunk(kernel, input_specs, out_spec, args, rng) -> None:
+    _with_shared([*input_specs, out_spec], _chunk_kernel, kernel, args, rng)
+
+def _process_reduce(flat_spec, order_spec, ptr_spec, data_spec, rng) -> None:
+    _with_shared([flat_spec, order_spec, ptr_spec, data_spec], _reduce_range, *rng)
@@ -1,15 +1,54 @@
 from __future__ import annotations
 import numpy as np
-from scipy.sparse.linalg import spsolve
 
-from .shape_t3 import t3_area_and_grads
-from .assembly import assemble_global, add_local_to_triplets
-from .bc import apply_dirichlet
+from .assembly import AssemblyPlan
+from .linear_system import FactorizationCache, array_digest
+from .linsolve import solve_with_dirichlet
+from .loads import element_load_vectors, nodal_values
+from .bc import merge_dirichlet
 from .flux import add_poisson_neumann_rhs
+from .matrix_free import PoissonOperator
+from .parallel import ParallelAssembler
+from .quadrature import triangle_rule
+from .shape_t3 import t3_areas_and_grads
+from .shape_t6 import t6_shape_gradients
+from pyfemlite.cache import DiskCache, resolve_disk_cache, validate_boundary_cached
 from pyfemlite.mesh.boundary import Boundary
+from pyfemlite.mesh.mesh import Mesh, as_mesh
+from pyfemlite.profiling import profiled, stage
 
+def poisson_element_stiffness(A: np.ndarray, dNdx: np.ndarray, kappa) -> np.ndarray:
+    '''
+    Element stiffness matrices Ke = kappa * grad(N) grad(N)^T * A for a batch of elements.
+
+    kappa may be a scalar or a (nelem,) array of element conductivities.
+    Returns (nelem,nen,nen).
+    '''
+    scale = np.asarray(kappa, dtype=float) * np.asarray(A)
+    return np.einsum("eid,ejd->eij", dNdx, dNdx) * np.broadcast_to(scale, A.shape)[:, None, None]
+
+def poisson_element_stiffness_t6(A: np.ndarray, dLdx: np.ndarray, kappa) -> np.ndarray:
+    '''
+    Element stiffness matrices of straight-sided T6 elements from the corner gradients dLdx
+    (nelem,3,2) of `t3_areas_and_grads`; the 3-point rule integrates the quadratic integrand
+    exactly. Returns (nelem,6,6).
+    '''
+    bary, w = triangle_rule(3)
+    dNdx = t6_shape_gradients(bary, dLdx)
+    scale = np.broadcast_to(np.asarray(kappa, dtype=float) * np.asarray(A), A.shape)
+    Nx, Ny = dNdx[..., 0], dNdx[..., 1]     # (nelem,nq,6)
+    wk = w[None, :, None] * scale[:, None, None]
+    return np.matmul((Nx * wk).transpose(0, 2, 1), Nx) + np.matmul((Ny * wk).transpose(0, 2, 1), Ny)
+
+def poisson_stiffness_kernel(X: np.ndarray, T: np.ndarray, kappa) -> np.ndarray:
+    '''Element stiffness matrices of the elements T, geometry included (`ParallelAssembler` kernel).'''
+    A, dNdx = t3_areas_and_grads(X, T)
+    stiffness = poisson_element_stiffness_t6 if T.shape[1] == 6 else poisson_element_stiffness
+    return stiffness(A, dNdx, kappa)
+
+@profiled("solve_poisson_t3")
 def solve_poisson_t3(
-    X, T,
+    X: np.ndarray | Mesh, T: np.ndarray | None,
     kappa,
     rhs_func,
     *,
@@ -17,54 +56,109 @@ def solve_poisson_t3(
     dirichlet: dict[str, callable] | None = None,
     neumann: dict[str, callable] | None = None,
     validate_boundary: bool = False,
+    volume_quadrature: int | None = None,
+    edge_quadrature: int = 2,
+    vectorized: bool | None = None,
+    plan: AssemblyPlan | None = None,
+    cache: FactorizationCache | None = None,
+    disk_cache: DiskCache | str | bool | None = None,
+    solver: str = "direct",
+    preconditioner: str | None = "jacobi",
+    rtol: float = 1e-10,
+    maxiter: int | None = None,
+    x0: np.ndarray | None = None,
+    return_info: bool = False,
+    workers: int | None = None,
+    chunk_size: int = 1 << 16,
+    parallel_backend: str = "thread",
+    reorder: str | None = None,
+    profile: bool = False,   # handled by @profiled
     # legacy explicit
     dirichlet_nodes=None,
     dirichlet_value_func=None,
     neumann_edges=None,
     neumann_g=None,
 ):
-    if validate_boundary and boundary is not None:
-        boundary.validate(X, T, strict=True)
+    with stage("setup") as s:
+        mesh = as_mesh(X, T)
+        disk = resolve_disk_cache(disk_cache)
+        renum = None
+        if reorder is not None:
+            if plan is not None:
+                raise ValueError("plan cannot be combined with reorder (it refers to the original numbering).")
+            renum, mesh = mesh.renumbered(reorder)
+            boundary = renum.permute_boundary(boundary)
+            x0 = renum.to_new(x0, 1)
+            dirichlet_nodes = renum.permute_nodes(dirichlet_nodes)
+            neumann_edges = renum.permute_nodes(neumann_edges)
+        X, T = mesh.X, mesh.T
+        if validate_boundary and boundary is not None:
+            validate_boundary_cached(boundary, mesh, disk)
+
+        nnode = X.shape[0]
+        ndof = nnode
+        f = np.zeros(ndof, dtype=float)
+        if plan is None and solver != "matrix_free":
+            plan = mesh.assembly_plan(1, disk_cache=disk)
+        elif plan is not None and (plan.n_dof != ndof or plan.edofs.shape[0] != T.shape[0]):
+            raise ValueError("AssemblyPlan does not match the mesh (n_dof or element count differ).")
 
-    nnode = X.shape[0]
-    ndof = nnode
-    I, J, V = [], [], []
-    f = np.zeros(ndof, dtype=float)
+        A, dNdx = mesh.geometry()
+        s.update(nelem=int(T.shape[0]), ndof=ndof, reorder=reorder)
 
-    for e in range(T.shape[0]):
-        conn = T[e]
-        Xe = X[conn, :]
-        A, dNdx = t3_area_and_grads(Xe)
-        Ke = kappa * (dNdx @ dNdx.T) * A
+    with stage("loads"):
+        # matrix-free solves never build the CSR pattern; loads are scattered straight from the dof table
+        assemble_vector = plan.assemble_vector if plan is not None else (
+            lambda fe: np.bincount(mesh.element_dofs(1).ravel(), weights=fe.ravel(), minlength=ndof))
+        f += assemble_vector(element_load_vectors(
+            X, T, A, rhs_func, ncomp=1, quadrature=volume_quadrature, vectorized=vectorized))
 
-        xc = Xe.mean(axis=0)
-        fe = np.full(3, rhs_func(xc[0], xc[1]) * A / 3.0)
+        if boundary is not None and neumann:
+            for grp, g_fn in neumann.items():
+                add_poisson_neumann_rhs(f, X, boundary.edges[grp], g_fn, order=edge_quadrature, vectorized=vectorized)
 
-        add_local_to_triplets(conn, Ke, I, J, V)
-        f[conn] += fe
+        if neumann_edges is not None and neumann_g is not None:
+            add_poisson_neumann_rhs(f, X, neumann_edges, neumann_g, order=edge_quadrature, vectorized=vectorized)
 
-    if boundary is not None and neumann:
-        for grp, g_fn in neumann.items():
-            add_poisson_neumann_rhs(f, X, boundary.edges[grp], g_fn)
+    with stage("dirichlet_values") as s:
+        dofs_list, values_list = [], []
 
-    if neumann_edges is not None and neumann_g is not None:
-        add_poisson_neumann_rhs(f, X, neumann_edges, neumann_g)
+        if boundary is not None and dirichlet:
+            for grp, fn in dirichlet.items():
+                nodes = np.asarray(boundary.nodes[grp], dtype=int)
+                dofs_list.append(nodes)
+                values_list.append(nodal_values(X, nodes, fn, vectorized=vectorized))
 
-    K = assemble_global(ndof, I, J, V)
+        if dirichlet_nodes is not None and dirichlet_value_func is not None:
+            nodes = np.asarray(dirichlet_nodes, dtype=int)
+            dofs_list.append(nodes)
+            values_list.append(nodal_values(X, nodes, dirichlet_value_func, vectorized=vectorized))
 
-    dbc: dict[int, float] = {}
+        dofs, values = merge_dirichlet(dofs_list, values_list)
+        s["n_dirichlet"] = int(dofs.size)
 
-    if boundary is not None and dirichlet:
-        for grp, fn in dirichlet.items():
-            for n in boundary.nodes[grp]:
-                x, y = X[int(n)]
-                dbc[int(n)] = float(fn(float(x), float(y)))
+    key = operator_key = None
+    if cache is not None or disk is not None:
+        key = FactorizationCache.make_key(mesh, None, kappa, dofs, tag="poisson_t3")
+    if disk is not None:
+        operator_key = array_digest(mesh.digest(), np.asarray(kappa, dtype=float), tag="poisson_t3/K")
 
-    if dirichlet_nodes is not None and dirichlet_value_func is not None:
-        for n in dirichlet_nodes:
-            x, y = X[int(n)]
-            dbc[int(n)] = float(dirichlet_value_func(float(x), float(y)))
+    def assemble_K():
+        if workers is None:
+            stiffness = poisson_element_stiffness_t6 if mesh.nen == 6 else poisson_element_stiffness
+            return plan.assemble(stiffness(A, dNdx, kappa))
+        k = np.asarray(kappa, dtype=float)
+        with ParallelAssembler(plan, workers=workers, chunk_size=chunk_size, backend=parallel_backend) as pa:
+            if k.ndim == 0:
+                return pa.assemble(poisson_stiffness_kernel, X, T, k)
+            return pa.assemble(poisson_stiffness_kernel, X, T, elem_args=(k,))
 
-    Kb, fb = apply_dirichlet(K, f, dbc)
-    u = spsolve(Kb, fb)
-    return u
+    u, info = solve_with_dirichlet(
+        assemble_K, f, dofs, values,
+        solver=solver, cache=cache, cache_key=key, disk_cache=disk, operator_key=operator_key,
+        preconditioner=preconditioner, rtol=rtol, maxiter=maxiter, x0=x0, check_convergence=not return_info,
+        make_operator=lambda dofs: PoissonOperator(mesh, None, kappa, dirichlet_dofs=dofs, chunk_size=chunk_size),
+    )
+    if renum is not None:
+        u = renum.to_original(u, 1)
+    return (u, info) if return_info else u
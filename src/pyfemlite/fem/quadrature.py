@@ -7,8 +7,70 @@ def gauss_legendre_2():
     w = np.array([1.0, 1.0], dtype=float)
     return xi, w
 
+def gauss_legendre(n: int):
+    '''n-point Gauss-Legendre rule on [-1, 1] (exact for polynomials of degree 2n-1).'''
+    if n < 1:
+        raise ValueError("Gauss-Legendre rule needs at least one point.")
+    if n == 2:
+        return gauss_legendre_2()
+    xi, w = np.polynomial.legendre.leggauss(n)
+    return xi.astype(float), w.astype(float)
+
+def triangle_rule(npts: int):
+    '''
+    Symmetric (Dunavant) quadrature on the reference triangle.
+
+    npts : 1 (degree 1), 3 (degree 2), 6 (degree 4) or 7 (degree 5)
+    Returns bary (nq,3) barycentric coordinates and w (nq,) weights summing to 1, so that
+    int_e g dA ~= A_e * sum_q w_q g(x_q).
+    '''
+    def orbit(a: float):
+        return [(1.0 - 2.0 * a, a, a), (a, 1.0 - 2.0 * a, a), (a, a, 1.0 - 2.0 * a)]
+
+    if npts == 1:
+        bary, w = [(1.0 / 3.0, 1.0 / 3.0, 1.0 / 3.0)], [1.0]
+    elif npts == 3:
+        bary, w = orbit(1.0 / 6.0), [1.0 / 3.0] * 3
+    elif npts == 6:
+        bary = orbit(0.445948490915965) + orbit(0.091576213509771)
+        w = [0.223381589678011] * 3 + [0.109951743655322] * 3
+    elif npts == 7:
+        r = np.sqrt(15.0)
+        bary = [(1.0 / 3.0, 1.0 / 3.0, 1.0 / 3.0)] + orbit((6.0 - r) / 21.0) + orbit((6.0 + r) / 21.0)
+        w = [9.0 / 40.0] + [(155.0 - r) / 1200.0] * 3 + [(155.0 + r) / 1200.0] * 3
+    else:
+        raise ValueError(f"No triangle rule with {npts} points; choose 1, 3, 6 or 7.")
+    return np.array(bary, dtype=float), np.array(w, dtype=float)
+
+def edge_shape_functions(xi: np.ndarray, nen: int = 2) -> np.ndarray:
+    '''
+    Shape functions of a 2-node (linear) or 3-node (quadratic, nodes a, b, midpoint) edge at
+    reference points xi (nq,) of [-1, 1]. Returns (nq,nen).
+    '''
+    xi = np.asarray(xi, dtype=float)
+    if nen == 2:
+        return np.stack([0.5 * (1.0 - xi), 0.5 * (1.0 + xi)], axis=1)
+    if nen == 3:
+        return np.stack([0.5 * xi * (xi - 1.0), 0.5 * xi * (xi + 1.0), 1.0 - xi ** 2], axis=1)
+    raise ValueError(f"Edges have 2 or 3 nodes, got {nen}.")
+
 def map_edge_reference_to_physical(xi: float, Xa: np.ndarray, Xb: np.ndarray):
     x = 0.5 * (1.0 - xi) * Xa + 0.5 * (1.0 + xi) * Xb
     L = float(np.linalg.norm(Xb - Xa))
     J = 0.5 * L
     return x, J
+
+def map_edges_reference_to_physical(xi: np.ndarray, Xa: np.ndarray, Xb: np.ndarray):
+    '''
+    Batched `map_edge_reference_to_physical` for all edges and reference points at once.
+
+    xi : (nq,), Xa/Xb : (nedge,2) end points
+    Returns x (nedge,nq,2) physical points and J (nedge,) edge Jacobians.
+    '''
+    Xa = np.asarray(Xa, dtype=float)
+    Xb = np.asarray(Xb, dtype=float)
+    Na = 0.5 * (1.0 - xi)
+    Nb = 0.5 * (1.0 + xi)
+    x = Na[None, :, None] * Xa[:, None, :] + Nb[None, :, None] * Xb[:, None, :]
+    J = 0.5 * np.linalg.norm(Xb - Xa, axis=1)
+    return x, J
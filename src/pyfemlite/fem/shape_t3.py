@@ -21,3 +21,26 @@ def t3_area_and_grads(Xe: np.ndarray):
                      [b2, c2],
                      [b3, c3]], dtype=float) / detJ
     return A, dNdx
+
+def t3_areas_and_grads(X: np.ndarray, T: np.ndarray):
+    '''
+    Batched version of `t3_area_and_grads` for all elements of a mesh.
+
+    Returns
+    -------
+    A    : (nelem,) element areas
+    dNdx : (nelem,3,2) shape function gradients, dNdx[e, a] = (dN_a/dx, dN_a/dy)
+    '''
+    Xe = X[T[:, :3]].astype(float, copy=False)   # float32 storage is promoted here
+    x = Xe[:, :, 0]
+    y = Xe[:, :, 1]
+    detJ = (x[:, 1] - x[:, 0]) * (y[:, 2] - y[:, 0]) - (x[:, 2] - x[:, 0]) * (y[:, 1] - y[:, 0])
+    A = 0.5 * np.abs(detJ)
+    bad = np.flatnonzero(~(A > 0.0))
+    if bad.size:
+        raise ValueError(f"Degenerate triangles with non-positive area: elements {bad.tolist()}")
+    # b_a = y_{a+1} - y_{a+2}, c_a = x_{a+2} - x_{a+1} (indices mod 3)
+    b = np.roll(y, -1, axis=1) - np.roll(y, -2, axis=1)
+    c = np.roll(x, -2, axis=1) - np.roll(x, -1, axis=1)
+    dNdx = np.stack([b, c], axis=2) / detJ[:, None, None]
+    return A, dNdx
@@ -0,0 +1,46 @@
+from __future__ import annotations
+import numpy as np
+
+# local node order: corners 0,1,2, then the mid-edge nodes of (0,1), (1,2), (2,0)
+# (the VTK_QUADRATIC_TRIANGLE order, and the local edge order of `mesh_edges`)
+T6_EDGES = np.array([[0, 1, 3], [1, 2, 4], [2, 0, 5]])
+
+def t6_shape_functions(L: np.ndarray) -> np.ndarray:
+    '''
+    Quadratic triangle shape functions at barycentric points.
+
+    L : (...,3) barycentric coordinates
+    Returns N (...,6): L_i (2 L_i - 1) on the corners, 4 L_i L_j on the mid-edge nodes.
+    '''
+    L = np.asarray(L, dtype=float)
+    L0, L1, L2 = L[..., 0], L[..., 1], L[..., 2]
+    return np.stack([L0 * (2.0 * L0 - 1.0), L1 * (2.0 * L1 - 1.0), L2 * (2.0 * L2 - 1.0),
+                     4.0 * L0 * L1, 4.0 * L1 * L2, 4.0 * L2 * L0], axis=-1)
+
+def t6_shape_derivatives(L: np.ndarray) -> np.ndarray:
+    '''
+    Derivatives dN_a/dL_b of the T6 shape functions at barycentric points L (nq,3).
+
+    Returns (nq,6,3).
+    '''
+    L = np.asarray(L, dtype=float)
+    G = np.zeros((L.shape[0], 6, 3), dtype=float)
+    for a in range(3):
+        G[:, a, a] = 4.0 * L[:, a] - 1.0
+    for m, (i, j, _) in zip(range(3, 6), T6_EDGES):
+        G[:, m, i] = 4.0 * L[:, j]
+        G[:, m, j] = 4.0 * L[:, i]
+    return G
+
+def t6_shape_gradients(L: np.ndarray, dLdx: np.ndarray) -> np.ndarray:
+    '''
+    Gradients of the T6 shape functions of straight-sided elements (mid-edge nodes at the
+    edge midpoints, constant Jacobian) at barycentric points L (nq,3).
+
+    dLdx : (nelem,3,2) gradients of the barycentric coordinates, i.e. the linear shape
+        function gradients of the corner triangle (`t3_areas_and_grads`)
+    Returns (nelem,nq,6,2).
+    '''
+    G = t6_shape_derivatives(L)
+    # one (nq*6,3) @ (3,2) product per element; much faster than the equivalent einsum
+    return np.matmul(G.reshape(-1, 3), dLdx).reshape(dLdx.shape[0], G.shape[0], 6, 2)
@@ -0,0 +1,201 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+import time
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from .bc import DirichletPartition, merge_dirichlet
+from .elasticity2d import elasticity_B_matrices
+from .linear_system import LinearSystem
+from .loads import element_load_vectors, nodal_values
+from .materials import D_plane_strain, D_plane_stress
+from .quadrature import triangle_rule
+from .shape_t6 import t6_shape_gradients
+from .traction import add_elasticity_traction_rhs
+from pyfemlite.mesh.boundary import Boundary
+from pyfemlite.mesh.mesh import Mesh, as_mesh
+from pyfemlite.precision import storage_dtype
+
+# independent entries of a symmetric 3x3 D, in the order of the basis matrices
+D_ENTRIES = ((0, 0), (1, 1), (2, 2), (0, 1), (0, 2), (1, 2))
+
+def material_grid(E, nu, *, plane: str = "stress") -> tuple[np.ndarray, np.ndarray]:
+    '''
+    D matrices for every (E, nu) combination of two 1-D grids.
+
+    Returns (D (n,3,3), params (n,2)) with params[k] = (E, nu) of D[k], E varying slowest.
+    '''
+    make = {"stress": D_plane_stress, "strain": D_plane_strain}.get(plane)
+    if make is None:
+        raise ValueError(f"Unknown plane '{plane}'. Use 'stress' or 'strain'.")
+    params = np.array([(e, n) for e in np.atleast_1d(E) for n in np.atleast_1d(nu)], dtype=float)
+    return np.stack([make(e, n) for e, n in params]), params
+
+@dataclass(frozen=True)
+class SweepResult:
+    '''
+    Stacked solutions of `ElasticitySweep.solve`: u[i, j] is the displacement vector (2*nnode,)
+    for material D[i] and load case j. timings holds the wall time (s) of each stage.
+    '''
+    u: np.ndarray
+    D: np.ndarray
+    timings: dict[str, float] = field(default_factory=dict)
+
+class ElasticitySweep:
+    '''
+    Many materials x many load cases on one mesh and one Dirichlet dof set.
+
+    Geometry and the six element basis matrices A * B_i^T B_j (one per independent entry of D,
+    symmetrised for i != j) are computed once and assembled through the mesh `AssemblyPlan`
+    directly into free-dof blocks. The operator of a material is then the linear combination
+    K(D) = sum_k D_k K_k of the basis data arrays (no element loop, no Dirichlet reduction);
+    each material is factorized once and all load cases are solved as one multi-RHS block.
+
+    dirichlet : group -> (ux,uy) callable fixing the dof set and default values; load cases
+        may prescribe other values on the same groups.
+    '''
+
+    def __init__(
+        self,
+        X: np.ndarray | Mesh,
+        T: np.ndarray | None = None,
+        *,
+        boundary: Boundary | None = None,
+        dirichlet: dict[str, callable] | None = None,
+        validate_boundary: bool = False,
+        vectorized: bool | None = None,
+    ):
+        t0 = time.perf_counter()
+        self.mesh = mesh = as_mesh(X, T)
+        if dirichlet and boundary is None:
+            raise ValueError("dirichlet groups need a boundary.")
+        if validate_boundary and boundary is not None:
+            boundary.validate(mesh, strict=True)
+        self.boundary = boundary
+        self.dirichlet = dict(dirichlet or {})
+        self.vectorized = vectorized
+        self.n_dof = 2 * mesh.nnode
+
+        dofs, self._default_values = self._dirichlet_values(self.dirichlet)
+        self.partition = DirichletPartition.from_dofs(self.n_dof, dofs)
+
+        plan = mesh.assembly_plan(2)
+        A, dNdx = mesh.geometry()
+        if mesh.nen == 6:
+            bary, w = triangle_rule(3)
+            dNdx6 = t6_shape_gradients(bary, dNdx)
+            Bq = [(wq, elasticity_B_matrices(dNdx6[:, q])) for q, wq in enumerate(w)]
+        else:
+            Bq = [(1.0, elasticity_B_matrices(dNdx))]
+        ff, fd = [], []
+        for i, j in D_ENTRIES:
+            Ke = sum(wq * np.einsum("ek,el->ekl", B[:, i], B[:, j]) for wq, B in Bq)
+            if i != j:
+                Ke = Ke + Ke.transpose(0, 2, 1)
+            K_ff, K_fd = self.partition.reduce_matrix(plan.assemble(Ke * A[:, None, None]))
+            ff.append(K_ff.data)
+            fd.append(K_fd.data)
+        self._ff_pattern = (K_ff.indices, K_ff.indptr, K_ff.shape)
+        self._fd_pattern = (K_fd.indices, K_fd.indptr, K_fd.shape)
+        self._ff = np.stack(ff)    # (6, nnz_ff)
+        self._fd = np.stack(fd)    # (6, nnz_fd)
+        self.setup_time = time.perf_counter() - t0
+
+    @staticmethod
+    def coefficients(D) -> np.ndarray:
+        '''Basis coefficients (..., 6) of symmetric D matrices (..., 3, 3).'''
+        D = np.asarray(D, dtype=float)
+        if D.shape[-2:] != (3, 3) or not np.allclose(D, np.swapaxes(D, -1, -2)):
+            raise ValueError("D must be symmetric with shape (3,3) or (n,3,3).")
+        return np.stack([D[..., i, j] for i, j in D_ENTRIES], axis=-1)
+
+    def operator(self, D) -> tuple[csr_matrix, csr_matrix]:
+        '''Free-dof blocks (K_ff, K_fd) of material D by linear combination of the basis.'''
+        c = self.coefficients(D)
+        indices, indptr, shape = self._ff_pattern
+        K_ff = csr_matrix((c @ self._ff, indices, indptr), shape=shape)
+        indices, indptr, shape = self._fd_pattern
+        return K_ff, csr_matrix((c @ self._fd, indices, indptr), shape=shape)
+
+    def reduced_terms(self) -> tuple[np.ndarray, tuple, np.ndarray, tuple]:
+        '''
+        Basis of the free-dof blocks as (ff (6, nnz_ff), ff_pattern, fd (6, nnz_fd),
+        fd_pattern): one data row per `coefficients` entry, sharing the CSR pattern
+        (indices, indptr, shape) of K_ff resp. K_fd.
+        '''
+        return self._ff, self._ff_pattern, self._fd, self._fd_pattern
+
+    def system(self, D) -> LinearSystem:
+        '''Factorized `LinearSystem` of material D.'''
+        return LinearSystem.from_reduced(self.partition, *self.operator(D))
+
+    def load_vectors(self, load_cases, *, volume_quadrature: int | None = None, edge_quadrature: int = 2):
+        '''
+        Right-hand sides F (n_dof, nload) and Dirichlet values (ndir, nload) of load cases.
+
+        Each load case is a dict with optional "body_force" ((bx,by) callable), "traction"
+        (group -> (tx,ty) callable) and "dirichlet" (group -> (ux,uy) callable, same groups
+        as the sweep), or an (n_dof,) force vector.
+        '''
+        mesh = self.mesh
+        X, T = mesh.X, mesh.T
+        A, _ = mesh.geometry()
+        plan = mesh.assembly_plan(2)
+        F = np.zeros((self.n_dof, len(load_cases)))
+        V = np.empty((self.partition.dofs.size, len(load_cases)))
+        for k, case in enumerate(load_cases):
+            V[:, k] = self._default_values
+            if not isinstance(case, dict):
+                F[:, k] = np.asarray(case, dtype=float)
+                continue
+            unknown = set(case) - {"body_force", "traction", "dirichlet"}
+            if unknown:
+                raise ValueError(f"Unknown load case keys {sorted(unknown)}.")
+            if case.get("body_force") is not None:
+                F[:, k] += plan.assemble_vector(element_load_vectors(
+                    X, T, A, case["body_force"], ncomp=2, quadrature=volume_quadrature, vectorized=self.vectorized))
+            for grp, fn in (case.get("traction") or {}).items():
+                add_elasticity_traction_rhs(F[:, k], X, self.boundary.edges[grp], fn, order=edge_quadrature,
+                                            vectorized=self.vectorized)
+            if case.get("dirichlet"):
+                if set(case["dirichlet"]) != set(self.dirichlet):
+                    raise ValueError("A load case must prescribe Dirichlet values on the sweep's groups.")
+                V[:, k] = self._dirichlet_values(case["dirichlet"])[1]
+        return F, V
+
+    def solve(self, D, load_cases, *, volume_quadrature: int | None = None, edge_quadrature: int = 2) -> SweepResult:
+        '''
+        Solve every load case for every material D (n,3,3) (or a single (3,3)).
+
+        Returns a `SweepResult` with u of shape (nmat, nload, n_dof) in the storage dtype of the
+        precision policy (float32 halves the result memory) and the timings of the "setup",
+        "loads", "assemble", "factorize" and "solve" stages (plus "total").
+        '''
+        D = np.asarray(D, dtype=float)
+        D = D[None] if D.ndim == 2 else D
+        t0 = time.perf_counter()
+        F, V = self.load_vectors(load_cases, volume_quadrature=volume_quadrature, edge_quadrature=edge_quadrature)
+        timings = dict(setup=self.setup_time, loads=time.perf_counter() - t0, assemble=0.0, factorize=0.0, solve=0.0)
+        P = self.partition
+        u = np.empty((D.shape[0], F.shape[1], self.n_dof), dtype=storage_dtype())
+        for i, Di in enumerate(D):
+            t0 = time.perf_counter()
+            K_ff, K_fd = self.operator(Di)
+            t1 = time.perf_counter()
+            system = LinearSystem.from_reduced(P, K_ff, K_fd)
+            t2 = time.perf_counter()
+            u[i] = system.solve(F, V).T
+            t3 = time.perf_counter()
+            timings["assemble"] += t1 - t0
+            timings["factorize"] += t2 - t1
+            timings["solve"] += t3 - t2
+        timings["total"] = sum(timings.values())
+        return SweepResult(u=u, D=D, timings=timings)
+
+    def _dirichlet_values(self, dirichlet: dict) -> tuple[np.ndarray, np.ndarray]:
+        dofs_list, values_list = [], []
+        for grp, fn in dirichlet.items():
+            nodes = np.asarray(self.boundary.nodes[grp], dtype=int)
+            dofs_list.append(2 * nodes[:, None] + np.arange(2))
+            values_list.append(nodal_values(self.mesh.X, nodes, fn, ncomp=2, vectorized=self.vectorized))
+        return merge_dirichlet(dofs_list, values_list)
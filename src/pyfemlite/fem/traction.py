@@ -1,29 +1,38 @@
 from __future__ import annotations
 import numpy as np
-from .quadrature import gauss_legendre_2, map_edge_reference_to_physical
+from .quadrature import edge_shape_functions, gauss_legendre, map_edges_reference_to_physical
+from .loads import evaluate_pointwise
 
-def add_elasticity_traction_rhs(f: np.ndarray, X: np.ndarray, edges: np.ndarray, traction_func):
-    xi_q, w_q = gauss_legendre_2()
+def add_elasticity_traction_rhs(
+    f: np.ndarray,
+    X: np.ndarray,
+    edges: np.ndarray,
+    traction_func,
+    *,
+    order: int = 2,
+    vectorized: bool | None = None,
+):
+    '''
+    Add consistent nodal forces of an edge traction (tx,ty) = traction_func(x, y) to f.
 
+    All edges and Gauss points (`order`-point Gauss-Legendre) are integrated at once; the
+    traction is evaluated in one call on the coordinate arrays when possible (see
+    `evaluate_pointwise`) and scattered with np.add.at. edges are (nedge,2) node pairs or,
+    on T6 meshes, (nedge,3) rows (a, b, m) integrated with quadratic edge shape functions
+    (straight edges, m at the midpoint).
+    '''
     edges = np.asarray(edges, dtype=int)
     if edges.size == 0:
         return
+    edges = edges.reshape(-1, edges.shape[1] if edges.ndim == 2 else 2)
 
-    for (na, nb) in edges:
-        na = int(na); nb = int(nb)
-        Xa = X[na]; Xb = X[nb]
-        edofs = np.array([2*na, 2*na+1, 2*nb, 2*nb+1], dtype=int)
-        fe = np.zeros(4, dtype=float)
+    xi_q, w_q = gauss_legendre(order)
+    x, J = map_edges_reference_to_physical(xi_q, X[edges[:, 0]], X[edges[:, 1]])
+    ne, nq = x.shape[0], x.shape[1]
+    t = evaluate_pointwise(traction_func, x[..., 0], x[..., 1], 2, vectorized).reshape(ne, nq, 2)
 
-        for xi, w in zip(xi_q, w_q):
-            x, J = map_edge_reference_to_physical(float(xi), Xa, Xb)
-            tx, ty = traction_func(float(x[0]), float(x[1]))
-            Na = 0.5 * (1.0 - xi)
-            Nb = 0.5 * (1.0 + xi)
-            Nmat = np.array([[Na, 0.0],
-                             [0.0, Na],
-                             [Nb, 0.0],
-                             [0.0, Nb]], dtype=float)
-            fe += (Nmat @ np.array([tx, ty], dtype=float)) * (w * J)
-
-        f[edofs] += fe
+    wJ = w_q[None, :] * J[:, None]
+    N = edge_shape_functions(xi_q, edges.shape[1])
+    comp = np.arange(2)
+    for a in range(edges.shape[1]):
+        np.add.at(f, 2 * edges[:, [a]] + comp, np.einsum("q,eq,eqc->ec", N[:, a], wJ, t))
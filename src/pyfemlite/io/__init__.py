@@ -1 +1,4 @@
 from .vtk import write_vtk_unstructured_tri
+from .vtu import write_vtu, PVDWriter
+from .gmsh import read_msh
+from .meshfile import save_mesh, load_mesh
@@ -0,0 +1,255 @@
+from __future__ import annotations
+import mmap
+import os
+import numpy as np
+
+from pyfemlite.mesh.boundary import Boundary
+from pyfemlite.precision import index_dtype, storage_dtype
+
+# Gmsh element type -> (dimension, nodes per element); node order matches pyfemlite's
+# T3/T6 rows and (a, b, m) edge rows
+MSH_ELEMENT_TYPES = {15: (0, 1), 1: (1, 2), 8: (1, 3), 2: (2, 3), 9: (2, 6)}
+
+def read_msh(filename: str | os.PathLike, *, return_regions: bool = False):
+    '''
+    Read a Gmsh .msh 4.x file (ASCII or binary) with linear or quadratic triangles.
+
+    The file is memory-mapped and node and element blocks are parsed in bulk: np.frombuffer
+    on the mapping for binary files, one np.fromstring call per section for ASCII ones.
+    Nodes not used by any triangle are dropped and the rest renumbered 0..nnode-1 in file
+    order; clockwise triangles are reoriented. Physical groups map to a `Boundary`: curve
+    groups give edges ((nedge,2), or (nedge,3) rows (a, b, m) for quadratic lines) and their
+    nodes, point groups give nodes.
+
+    return_regions : also return the surface physical groups as name -> element ids.
+    Returns (X, T, boundary) or (X, T, boundary, regions). X uses the policy storage dtype
+    and T the policy index dtype (`pyfemlite.precision`).
+    '''
+    with open(filename, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        sections = _MshSections(buf)
+        names = sections.physical_names()
+        entity_phys = sections.entities()
+        tags, coords = sections.nodes()
+        blocks = sections.elements()
+        del sections
+
+    tri = [(etag, conn) for dim, etag, etype, conn in blocks if dim == 2]
+    if not tri:
+        raise ValueError("The mesh has no triangle elements.")
+    nen = {conn.shape[1] for _, conn in tri}
+    if len(nen) != 1:
+        raise ValueError("Mixed linear and quadratic triangles are not supported.")
+    to_local = _tag_lookup(tags)
+    T_tags = np.concatenate([conn for _, conn in tri])
+    T_all = to_local(T_tags)
+
+    used = np.zeros(tags.size, dtype=bool)
+    used[T_all.ravel()] = True
+    new_id = np.full(tags.size, -1, dtype=np.int64)
+    new_id[used] = np.arange(int(used.sum()))
+    nnode = int(used.sum())
+    idx = index_dtype(max(nnode - 1, 0))
+    X = np.ascontiguousarray(coords[used, :2], dtype=storage_dtype())
+    T = new_id[T_all].astype(idx)
+    _orient_ccw(X, T)
+
+    nodes: dict[str, list[np.ndarray]] = {}
+    edges: dict[str, list[np.ndarray]] = {}
+    regions: dict[str, list[np.ndarray]] = {}
+    first = 0
+    for etag, conn in tri:
+        for ptag in entity_phys.get((2, etag), ()):
+            regions.setdefault(names.get((2, ptag), str(ptag)), []).append(np.arange(first, first + conn.shape[0]))
+        first += conn.shape[0]
+    for dim, etag, etype, conn in blocks:
+        if dim not in (0, 1):
+            continue
+        ids = new_id[to_local(conn)]
+        keep = (ids >= 0).all(axis=1)     # lower dimensional elements off the triangle mesh
+        ids = ids[keep].astype(idx)
+        for ptag in entity_phys.get((dim, etag), ()):
+            name = names.get((dim, ptag), str(ptag))
+            nodes.setdefault(name, []).append(ids.ravel())
+            if dim == 1:
+                edges.setdefault(name, []).append(ids)
+
+    boundary = Boundary(
+        nodes={k: np.unique(np.concatenate(v)).astype(idx) for k, v in nodes.items()},
+        edges={k: np.concatenate(v) for k, v in edges.items()},
+    )
+    if return_regions:
+        return X, T, boundary, {k: np.concatenate(v).astype(idx) for k, v in regions.items()}
+    return X, T, boundary
+
+def _tag_lookup(tags: np.ndarray):
+    '''Map node tags to positions in `tags`: dense lookup table, or binary search for sparse tags.'''
+    lo, hi = int(tags.min()), int(tags.max())
+    if hi - lo + 1 <= 4 * tags.size:
+        table = np.full(hi - lo + 1, -1, dtype=np.int64)
+        table[tags - lo] = np.arange(tags.size)
+        def lookup(t):
+            t = np.asarray(t, dtype=np.int64)
+            out = np.where((t >= lo) & (t <= hi), table[np.clip(t - lo, 0, hi - lo)], -1)
+            if np.any(out < 0):
+                raise ValueError(f"Elements reference undefined nodes, e.g. tag {int(t[out < 0][0])}.")
+            return out
+        return lookup
+    order = np.argsort(tags, kind="stable")
+    sorted_tags = tags[order]
+    def lookup(t):
+        t = np.asarray(t, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(sorted_tags, t), sorted_tags.size - 1)
+        if np.any(sorted_tags[pos] != t):
+            raise ValueError(f"Elements reference undefined nodes, e.g. tag {int(t[sorted_tags[pos] != t][0])}.")
+        return order[pos]
+    return lookup
+
+def _orient_ccw(X: np.ndarray, T: np.ndarray) -> None:
+    '''Reverse clockwise triangles in place (swap nodes 1 and 2, and mid nodes 3 and 5 on T6).'''
+    P = X[T[:, :3]].astype(float)
+    det = ((P[:, 1, 0] - P[:, 0, 0]) * (P[:, 2, 1] - P[:, 0, 1])
+           - (P[:, 2, 0] - P[:, 0, 0]) * (P[:, 1, 1] - P[:, 0, 1]))
+    cw = det < 0
+    if np.any(cw):
+        T[cw, 1], T[cw, 2] = T[cw, 2], T[cw, 1].copy()
+        if T.shape[1] == 6:
+            T[cw, 3], T[cw, 5] = T[cw, 5], T[cw, 3].copy()
+
+class _MshSections:
+    '''Section access of a .msh 4.x buffer; binary sections are read in place with np.frombuffer.'''
+
+    def __init__(self, buf: bytes):
+        self.buf = buf
+        start, _ = self._find(b"MeshFormat")
+        line_end = buf.find(b"\n", start)
+        head = buf[start:line_end].split()
+        version, file_type, self.size_t = float(head[0]), int(head[1]), int(head[2])
+        if not 4.1 <= version < 5.0:
+            raise ValueError(f"Only MSH 4.1 files are supported, got version {version}.")
+        self.binary = file_type == 1
+        self.endian = "<"
+        if self.binary:   # the int 1 written after the format line gives the byte order
+            self.endian = "<" if np.frombuffer(buf, "<i4", 1, line_end + 1)[0] == 1 else ">"
+
+    def _find(self, name: bytes, required: bool = True):
+        '''(start, end) byte range of the body of section $name.'''
+        tag = b"$" + name + b"\n"
+        pos = self.buf.find(tag)
+        if pos < 0:    # CRLF line endings
+            tag = b"$" + name + b"\r\n"
+            pos = self.buf.find(tag)
+        if pos < 0:
+            if required:
+                raise ValueError(f"Section ${name.decode()} not found.")
+            return None
+        start = pos + len(tag)
+        end = self.buf.find(b"$End" + name, start)
+        if end < 0:
+            raise ValueError(f"Section ${name.decode()} is not terminated.")
+        return start, end
+
+    def _reader(self, name: bytes, required: bool = True):
+        span = self._find(name, required)
+        if span is None:
+            return None
+        start, end = span
+        if self.binary:
+            return _BinaryReader(self.buf, start, self.endian, self.size_t)
+        return _AsciiReader(np.fromstring(self.buf[start:end], sep=" "))
+
+    def physical_names(self) -> dict[tuple[int, int], str]:
+        span = self._find(b"PhysicalNames", required=False)     # ASCII in binary files too
+        names = {}
+        if span is None:
+            return names
+        lines = self.buf[span[0]:span[1]].decode().strip().splitlines()
+        for line in lines[1:]:
+            dim, tag, name = line.split(maxsplit=2)
+            names[(int(dim), int(tag))] = name.strip().strip('"')
+        return names
+
+    def entities(self) -> dict[tuple[int, int], tuple[int, ...]]:
+        '''(dim, entity tag) -> physical tags.'''
+        r = self._reader(b"Entities", required=False)
+        phys = {}
+        if r is None:
+            return phys
+        counts = r.size(4)
+        for dim, n in enumerate(counts):
+            for _ in range(int(n)):
+                tag = int(r.int(1)[0])
+                r.double(3 if dim == 0 else 6)
+                ptags = r.int(int(r.size(1)[0]))
+                if dim > 0:
+                    r.int(int(r.size(1)[0]))     # bounding entities
+                if ptags.size:
+                    phys[(dim, tag)] = tuple(int(abs(p)) for p in ptags)
+        return phys
+
+    def nodes(self) -> tuple[np.ndarray, np.ndarray]:
+        '''All node tags (n,) and coordinates (n,3) in file order.'''
+        r = self._reader(b"Nodes")
+        nblocks, nnodes = (int(v) for v in r.size(4)[:2])
+        tags = np.empty(nnodes, dtype=np.int64)
+        coords = np.empty((nnodes, 3), dtype=float)
+        pos = 0
+        for _ in range(nblocks):
+            dim, _, parametric = (int(v) for v in r.int(3))
+            n = int(r.size(1)[0])
+            tags[pos:pos + n] = r.size(n)
+            ncoord = 3 + (dim if parametric else 0)
+            coords[pos:pos + n] = r.double(n * ncoord).reshape(n, ncoord)[:, :3]
+            pos += n
+        return tags, coords
+
+    def elements(self) -> list[tuple[int, int, int, np.ndarray]]:
+        '''Element blocks as (dim, entity tag, element type, node tags (n,nen)).'''
+        r = self._reader(b"Elements")
+        nblocks = int(r.size(4)[0])
+        blocks = []
+        for _ in range(nblocks):
+            dim, etag, etype = (int(v) for v in r.int(3))
+            n = int(r.size(1)[0])
+            if etype not in MSH_ELEMENT_TYPES:
+                raise ValueError(f"Unsupported Gmsh element type {etype} (supported: {sorted(MSH_ELEMENT_TYPES)}).")
+            nen = MSH_ELEMENT_TYPES[etype][1]
+            data = r.size(n * (1 + nen)).reshape(n, 1 + nen)
+            blocks.append((dim, etag, etype, data[:, 1:].astype(np.int64)))   # copies out of the mapping
+        return blocks
+
+class _BinaryReader:
+    def __init__(self, buf: bytes, pos: int, endian: str, size_t: int):
+        self.buf, self.pos = buf, pos
+        self._int = np.dtype(endian + "i4")
+        self._size = np.dtype(endian + ("u8" if size_t == 8 else "u4"))
+        self._double = np.dtype(endian + "f8")
+
+    def _read(self, dtype: np.dtype, count: int) -> np.ndarray:
+        a = np.frombuffer(self.buf, dtype=dtype, count=count, offset=self.pos)
+        self.pos += a.nbytes
+        return a
+
+    def int(self, count: int) -> np.ndarray:
+        return self._read(self._int, count)
+
+    def size(self, count: int) -> np.ndarray:
+        return self._read(self._size, count).astype(np.int64)
+
+    def double(self, count: int) -> np.ndarray:
+        return self._read(self._double, count)
+
+class _AsciiReader:
+    def __init__(self, values: np.ndarray):
+        self.values, self.pos = values, 0
+
+    def double(self, count: int) -> np.ndarray:
+        a = self.values[self.pos:self.pos + count]
+        if a.size != count:
+            raise ValueError("Unexpected end of section.")
+        self.pos += count
+        return a
+
+    def int(self, count: int) -> np.ndarray:
+        return self.double(count).astype(np.int64)
+
+    size = int
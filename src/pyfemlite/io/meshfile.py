@@ -0,0 +1,90 @@
+from __future__ import annotations
+import os
+import struct
+import zipfile
+import numpy as np
+
+from pyfemlite.mesh.boundary import Boundary
+
+_ALIGN = 64
+_PAD_FIELD = 0x7066     # private zip extra field id used to align member data
+
+def save_arrays(filename: str | os.PathLike, arrays: dict[str, np.ndarray]) -> None:
+    '''
+    Write named arrays as an uncompressed .npz whose members `load_arrays` can memory-map.
+
+    Every member is a raw .npy array stored without compression and padded so its data
+    starts on a 64-byte boundary. Arrays are streamed to the file, so arrays larger than
+    memory can be written from memmaps; the file stays readable with np.load.
+    '''
+    with zipfile.ZipFile(filename, "w", compression=zipfile.ZIP_STORED, allowZip64=True) as zf:
+        for key, a in arrays.items():
+            info = zipfile.ZipInfo(key + ".npy", date_time=(1980, 1, 1, 0, 0, 0))
+            info.compress_type = zipfile.ZIP_STORED
+            name = info.filename.encode("utf-8")
+            # local header: 30 bytes + name + extra (ours, then the 20-byte zip64 field)
+            base = zf.fp.tell() + 30 + len(name) + 20
+            pad = -base % _ALIGN
+            pad += _ALIGN if pad < 4 else 0
+            info.extra = struct.pack("<HH", _PAD_FIELD, pad - 4) + b"\0" * (pad - 4)
+            with zf.open(info, "w", force_zip64=True) as fh:
+                np.lib.format.write_array(fh, np.asarray(a), allow_pickle=False)
+
+def load_arrays(filename: str | os.PathLike, *, mmap: bool = True) -> dict[str, np.ndarray]:
+    '''
+    Read the arrays of a `save_arrays` file (any .npz works) as name -> array.
+
+    mmap=True maps every stored member read-only with np.memmap instead of reading it:
+    opening is instant whatever the size, pages are loaded on first access, and processes
+    mapping the same file share them through the page cache.
+    '''
+    arrays = {}
+    with zipfile.ZipFile(filename) as zf, open(filename, "rb") as fh:
+        for info in zf.infolist():
+            if not info.filename.endswith(".npy"):
+                continue
+            key = info.filename[:-4]
+            if not mmap or info.compress_type != zipfile.ZIP_STORED:
+                with zf.open(info) as member:
+                    arrays[key] = np.lib.format.read_array(member, allow_pickle=False)
+                continue
+            fh.seek(info.header_offset + 26)
+            name_len, extra_len = struct.unpack("<HH", fh.read(4))
+            fh.seek(info.header_offset + 30 + name_len + extra_len)
+            version = np.lib.format.read_magic(fh)
+            read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+            shape, fortran, dtype = read_header(fh)
+            if int(np.prod(shape)) == 0:
+                arrays[key] = np.empty(shape, dtype=dtype)
+            elif not shape:      # scalars are read, np.memmap cannot map 0-d arrays
+                arrays[key] = np.fromfile(fh, dtype=dtype, count=1).reshape(())
+            else:
+                arrays[key] = np.memmap(filename, dtype=dtype, mode="r", shape=shape,
+                                        order="F" if fortran else "C", offset=fh.tell())
+    return arrays
+
+def save_mesh(filename: str | os.PathLike, X: np.ndarray, T: np.ndarray, boundary: Boundary | None = None) -> None:
+    '''
+    Write X, T and boundary groups with `save_arrays` (members "X", "T", "nodes/<group>",
+    "edges/<group>") so that `load_mesh` can memory-map them.
+    '''
+    arrays = {"X": X, "T": T}
+    if boundary is not None:
+        arrays.update({f"nodes/{name}": a for name, a in boundary.nodes.items()})
+        arrays.update({f"edges/{name}": a for name, a in boundary.edges.items()})
+    save_arrays(filename, arrays)
+
+def load_mesh(filename: str | os.PathLike, *, mmap: bool = True):
+    '''
+    Read a mesh written by `save_mesh`; returns (X, T, boundary).
+
+    mmap=True returns read-only np.memmap arrays (`load_arrays`), so multi-GB meshes open
+    instantly and worker processes share their pages.
+    '''
+    arrays = load_arrays(filename, mmap=mmap)
+    if "X" not in arrays or "T" not in arrays:
+        raise ValueError(f"{os.fspath(filename)} is not a pyfemlite mesh file (X or T missing).")
+    nodes = {k[6:]: a for k, a in arrays.items() if k.startswith("nodes/")}
+    edges = {k[6:]: a for k, a in arrays.items() if k.startswith("edges/")}
+    boundary = Boundary(nodes=nodes, edges=edges) if nodes or edges else None
+    return arrays["X"], arrays["T"], boundary
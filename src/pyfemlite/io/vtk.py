@@ -15,14 +15,14 @@ def write_vtk_unstructured_tri(filename: str, X: np.ndarray, T: np.ndarray, poin
             x, y = X[i]
             f.write(f"{x} {y} 0.0\n")
 
-        f.write(f"CELLS {nelem} {nelem*4}\n")
+        nen = T.shape[1]
+        f.write(f"CELLS {nelem} {nelem*(nen+1)}\n")
         for e in range(nelem):
-            n1, n2, n3 = T[e]
-            f.write(f"3 {n1} {n2} {n3}\n")
+            f.write(f"{nen} " + " ".join(str(n) for n in T[e]) + "\n")
 
         f.write(f"CELL_TYPES {nelem}\n")
         for _ in range(nelem):
-            f.write("5\n")  # VTK_TRIANGLE
+            f.write("22\n" if nen == 6 else "5\n")  # VTK_QUADRATIC_TRIANGLE / VTK_TRIANGLE
 
         if point_data:
             f.write(f"POINT_DATA {nnode}\n")
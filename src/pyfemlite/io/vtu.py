@@ -0,0 +1,174 @@
+from __future__ import annotations
+import base64
+import os
+import zlib
+from pathlib import Path
+import numpy as np
+
+from pyfemlite.precision import as_storage
+
+VTK_TRIANGLE = 5
+VTK_QUADRATIC_TRIANGLE = 22
+
+_VTK_TYPES = {
+    np.dtype("int8"): "Int8", np.dtype("uint8"): "UInt8",
+    np.dtype("int16"): "Int16", np.dtype("uint16"): "UInt16",
+    np.dtype("int32"): "Int32", np.dtype("uint32"): "UInt32",
+    np.dtype("int64"): "Int64", np.dtype("uint64"): "UInt64",
+    np.dtype("float32"): "Float32", np.dtype("float64"): "Float64",
+}
+
+def write_vtu(
+    filename: str | os.PathLike,
+    X: np.ndarray,
+    T: np.ndarray,
+    point_data: dict[str, np.ndarray] | None = None,
+    cell_data: dict[str, np.ndarray] | None = None,
+    *,
+    encoding: str = "appended",
+    compress: bool = False,
+    level: int = 1,
+    block_size: int = 1 << 20,
+    cell_type: int | None = None,
+) -> Path:
+    '''
+    Write a VTK XML unstructured grid (.vtu) with binary arrays taken straight from NumPy buffers.
+
+    encoding : "appended" (raw bytes after the XML header, smallest and fastest) or "base64"
+        (inline, pure XML).
+    compress : zlib-compress every array in blocks of `block_size` bytes.
+    point_data / cell_data : name -> (n,) scalars or (n,k) arrays; 2-component point arrays are
+        padded to 3 so ParaView treats them as vectors.
+    cell_type : VTK cell type; by default VTK_TRIANGLE for (nelem,3) and VTK_QUADRATIC_TRIANGLE
+        for (nelem,6) connectivity.
+
+    Points and floating point fields are written in the storage dtype of the precision policy
+    (`pyfemlite.precision`), i.e. as Float32 under storage="float32".
+    '''
+    if encoding not in ("appended", "base64"):
+        raise ValueError(f"Unknown encoding '{encoding}'. Use 'appended' or 'base64'.")
+    X = as_storage(X)
+    T = np.asarray(T)
+    nnode, nelem = X.shape[0], T.shape[0]
+    nen = T.shape[1]
+    if cell_type is None:
+        cell_type = VTK_QUADRATIC_TRIANGLE if nen == 6 else VTK_TRIANGLE
+
+    points = np.zeros((nnode, 3), dtype=X.dtype if X.dtype in (np.float32, np.float64) else float)
+    points[:, :X.shape[1]] = X
+    idx_dtype = np.int32 if T.dtype.itemsize <= 4 else np.int64
+    arrays: list[tuple[str, str, np.ndarray]] = []   # (section, name, array)
+
+    for name, data in (point_data or {}).items():
+        arrays.append(("PointData", name, _field_array(name, data, nnode, pad_vectors=True)))
+    for name, data in (cell_data or {}).items():
+        arrays.append(("CellData", name, _field_array(name, data, nelem, pad_vectors=False)))
+    arrays.append(("Points", "Points", points))
+    arrays.append(("Cells", "connectivity", T.astype(idx_dtype, copy=False)))
+    arrays.append(("Cells", "offsets", np.arange(nen, nen * nelem + 1, nen, dtype=idx_dtype)))
+    arrays.append(("Cells", "types", np.full(nelem, cell_type, dtype=np.uint8)))
+
+    blocks = [_encode_array(a, compress, level, block_size) for _, _, a in arrays]
+
+    head = ['<?xml version="1.0"?>']
+    comp_attr = ' compressor="vtkZLibDataCompressor"' if compress else ""
+    head.append(f'<VTKFile type="UnstructuredGrid" version="1.0" byte_order="LittleEndian" '
+                f'header_type="UInt64"{comp_attr}>')
+    head.append("  <UnstructuredGrid>")
+    head.append(f'    <Piece NumberOfPoints="{nnode}" NumberOfCells="{nelem}">')
+    offset = 0
+    for section in ("PointData", "CellData", "Points", "Cells"):
+        items = [(name, a, blk) for (sec, name, a), blk in zip(arrays, blocks) if sec == section]
+        if not items and section in ("PointData", "CellData"):
+            continue
+        head.append(f"      <{section}>")
+        for name, a, blk in items:
+            ncomp = a.shape[1] if a.ndim == 2 else 1
+            attrs = f'type="{_VTK_TYPES[a.dtype]}" Name="{name}" NumberOfComponents="{ncomp}"'
+            if encoding == "appended":
+                head.append(f'        <DataArray {attrs} format="appended" offset="{offset}"/>')
+                offset += sum(len(b) for b in blk)
+            else:
+                text = _base64_blocks(blk, compress)
+                head.append(f'        <DataArray {attrs} format="binary">{text}</DataArray>')
+        head.append(f"      </{section}>")
+    head.append("    </Piece>")
+    head.append("  </UnstructuredGrid>")
+
+    path = Path(filename)
+    with open(path, "wb") as f:
+        f.write(("\n".join(head) + "\n").encode("ascii"))
+        if encoding == "appended":
+            f.write(b'  <AppendedData encoding="raw">\n   _')
+            for blk in blocks:
+                for b in blk:
+                    f.write(b)
+            f.write(b"\n  </AppendedData>\n")
+        f.write(b"</VTKFile>\n")
+    return path
+
+class PVDWriter:
+    '''
+    ParaView collection (.pvd) of .vtu datasets (time steps or load cases), rewritten after
+    every `add` so the collection on disk is always complete and valid.
+    '''
+
+    def __init__(self, filename: str | os.PathLike):
+        self.path = Path(filename)
+        self._entries: list[tuple[float, int, str]] = []
+        self._flush()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, vtu_file: str | os.PathLike, time: float, *, part: int = 0) -> None:
+        rel = os.path.relpath(Path(vtu_file), self.path.parent)
+        self._entries.append((float(time), int(part), Path(rel).as_posix()))
+        self._flush()
+
+    def write(self, X: np.ndarray, T: np.ndarray, time: float, *, point_data=None, cell_data=None, **kwargs) -> Path:
+        '''Write the next dataset as <stem>_<index>.vtu next to the .pvd and register it.'''
+        vtu = self.path.with_name(f"{self.path.stem}_{len(self._entries):04d}.vtu")
+        write_vtu(vtu, X, T, point_data, cell_data, **kwargs)
+        self.add(vtu, time)
+        return vtu
+
+    def _flush(self) -> None:
+        lines = ['<?xml version="1.0"?>',
+                 '<VTKFile type="Collection" version="0.1" byte_order="LittleEndian">',
+                 "  <Collection>"]
+        for t, part, rel in self._entries:
+            lines.append(f'    <DataSet timestep="{t!r}" group="" part="{part}" file="{rel}"/>')
+        lines += ["  </Collection>", "</VTKFile>", ""]
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text("\n".join(lines), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+def _field_array(name: str, data, n: int, *, pad_vectors: bool) -> np.ndarray:
+    a = np.asarray(data)
+    if a.dtype not in _VTK_TYPES:
+        a = a.astype(float)
+    a = as_storage(a)
+    if a.shape[0] != n or a.ndim > 2:
+        raise ValueError(f"Unsupported data shape for {name}: {a.shape} (expected ({n},) or ({n},k)).")
+    if pad_vectors and a.ndim == 2 and a.shape[1] == 2:
+        a = np.column_stack([a, np.zeros(n, dtype=a.dtype)])
+    return a
+
+def _encode_array(a: np.ndarray, compress: bool, level: int, block_size: int) -> list[bytes]:
+    '''VTK binary blocks: UInt64 header followed by the (optionally zlib-compressed) payload.'''
+    a = np.ascontiguousarray(a, dtype=a.dtype.newbyteorder("<"))
+    raw = memoryview(a).cast("B")
+    if not compress:
+        return [np.array([raw.nbytes], dtype="<u8").tobytes(), raw]
+    n = raw.nbytes
+    nblocks = -(-n // block_size)
+    comp = [zlib.compress(raw[i:i + block_size], level) for i in range(0, n, block_size)]
+    last = n - (nblocks - 1) * block_size if nblocks else 0
+    header = np.array([nblocks, block_size, last, *(len(c) for c in comp)], dtype="<u8")
+    return [header.tobytes(), *comp]
+
+def _base64_blocks(blk: list[bytes], compress: bool) -> str:
+    if compress:
+        return (base64.b64encode(blk[0]) + base64.b64encode(b"".join(blk[1:]))).decode("ascii")
+    return base64.b64encode(blk[0] + bytes(blk[1])).decode("ascii")
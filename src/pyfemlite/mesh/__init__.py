@@ -1,2 +1,6 @@
-from .structured_tri import structured_unit_square_tri
-from .boundary import Boundary, extract_boundary_edges, build_boundary_from_predicates, edges_from_node_chain
+from .structured_tri import structured_unit_square_tri, structured_rectangle_tri, iter_structured_tri_elements
+from .boundary import Boundary, extract_boundary_edges, build_boundary_from_predicates, edges_from_node_chain, mesh_edges
+from .mesh import Mesh, as_mesh
+from .reorder import NodeRenumbering, compute_node_renumbering, renumber_mesh, matrix_bandwidth, reordering_report
+from .refine import refine_newest_vertex, longest_edge_first, prolong
+from .quadratic import t3_to_t6, structured_rectangle_t6
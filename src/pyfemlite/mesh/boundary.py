@@ -1,23 +1,44 @@
 from __future__ import annotations
 from dataclasses import dataclass
 import numpy as np
-from collections import defaultdict
 from typing import Callable
 
+from pyfemlite.precision import index_dtype
+
 @dataclass(frozen=True)
 class Boundary:
+    '''
+    Named boundary groups: node ids and edges, (nedge,2) corner pairs or, on quadratic (T6)
+    meshes, (nedge,3) rows (a, b, m) with the mid-side node m.
+    '''
     nodes: dict[str, np.ndarray]
     edges: dict[str, np.ndarray]
 
-    def validate(self, X: np.ndarray, T: np.ndarray, *, strict: bool = True) -> None:
+    def validate(
+        self,
+        X: np.ndarray,
+        T: np.ndarray | None = None,
+        *,
+        strict: bool = True,
+        boundary_edges: np.ndarray | None = None,
+    ) -> None:
+        from .mesh import Mesh
+        if isinstance(X, Mesh):
+            if boundary_edges is None:
+                boundary_edges = X.boundary_edges
+            X, T = X.X, X.T
+        elif T is None:
+            raise ValueError("T is required unless X is a Mesh.")
+        X, T = np.asarray(X), np.asarray(T)
         if X.ndim != 2 or X.shape[1] != 2:
             raise ValueError("X must have shape (nnode,2).")
-        if T.ndim != 2 or T.shape[1] != 3:
-            raise ValueError("T must have shape (nelem,3).")
+        if T.ndim != 2 or T.shape[1] not in (3, 6):
+            raise ValueError("T must have shape (nelem,3) or (nelem,6).")
 
         nnode = X.shape[0]
-        all_bnd_edges = extract_boundary_edges(T)
-        all_bnd_set = _edge_set(all_bnd_edges)
+        if boundary_edges is None:
+            boundary_edges = extract_boundary_edges(T)
+        all_bnd_keys = np.sort(_edge_keys(np.asarray(boundary_edges)[:, :2], nnode))
 
         for name, arr in self.nodes.items():
             a = np.asarray(arr, dtype=int).ravel()
@@ -33,42 +54,39 @@ class Boundary:
             e = np.asarray(E, dtype=int)
             if e.size == 0:
                 continue
-            if e.ndim != 2 or e.shape[1] != 2:
-                raise ValueError(f"Boundary.edges['{name}'] must have shape (nedges,2).")
-            i = np.minimum(e[:, 0], e[:, 1])
-            j = np.maximum(e[:, 0], e[:, 1])
-            e2 = np.column_stack([i, j]).astype(int)
+            if e.ndim != 2 or e.shape[1] not in (2, 3):
+                raise ValueError(f"Boundary.edges['{name}'] must have shape (nedges,2) or (nedges,3).")
+            if np.any(e < 0) or np.any(e >= nnode):
+                bad_rows = np.where(((e < 0) | (e >= nnode)).any(axis=1))[0]
+                raise ValueError(f"Boundary.edges['{name}'] has out-of-range node ids in rows: {bad_rows[:10]}")
+            e2 = np.sort(e[:, :2], axis=1)
 
             if np.any(e2[:, 0] == e2[:, 1]):
                 raise ValueError(f"Boundary.edges['{name}'] contains a zero-length edge (i==j).")
 
-            if np.any(e2 < 0) or np.any(e2 >= nnode):
-                bad_rows = np.where((e2 < 0) | (e2 >= nnode))[0]
-                raise ValueError(f"Boundary.edges['{name}'] has out-of-range node ids in rows: {bad_rows[:10]}")
-
-            if np.unique(e2, axis=0).shape[0] != e2.shape[0]:
+            keys = _edge_keys(e2, nnode)
+            if np.unique(keys).size != keys.size:
                 raise ValueError(f"Boundary.edges['{name}'] contains duplicate edges.")
 
-            grp_set = _edge_set(e2)
-            extra = grp_set.difference(all_bnd_set)
-            if extra:
-                ex = np.array(list(extra), dtype=int)
+            extra = ~_sorted_contains(all_bnd_keys, keys)
+            if np.any(extra):
                 raise ValueError(
-                    f"Boundary.edges['{name}'] contains edges not on the mesh boundary. Example: {ex[0].tolist()}"
+                    f"Boundary.edges['{name}'] contains edges not on the mesh boundary. "
+                    f"Example: {e2[np.argmax(extra)].tolist()}"
                 )
 
             if strict:
-                node_set = set(np.asarray(self.nodes.get(name, np.array([], dtype=int)), dtype=int).ravel().tolist())
-                if not node_set:
+                grp_nodes = np.asarray(self.nodes.get(name, np.array([], dtype=int)), dtype=int).ravel()
+                if grp_nodes.size == 0:
                     raise ValueError(
                         f"Boundary.edges['{name}'] is non-empty but Boundary.nodes['{name}'] is empty/missing."
                     )
-                for (a, b) in grp_set:
-                    if a not in node_set or b not in node_set:
-                        raise ValueError(
-                            f"Boundary group '{name}' edge endpoints must be included in nodes['{name}']. "
-                            f"Offending edge: {(a, b)}"
-                        )
+                missing = ~np.isin(e, grp_nodes).all(axis=1)
+                if np.any(missing):
+                    raise ValueError(
+                        f"Boundary group '{name}' edge nodes must be included in nodes['{name}']. "
+                        f"Offending edge: {tuple(e[np.argmax(missing)].tolist())}"
+                    )
 
     def summary(self) -> str:
         lines = ["Boundary groups:"]
@@ -81,53 +99,107 @@ class Boundary:
     def __str__(self) -> str:
         return self.summary()
 
-def _edge_set(edges: np.ndarray) -> set[tuple[int, int]]:
-    edges = np.asarray(edges, dtype=int)
-    if edges.size == 0:
-        return set()
-    return set((int(i), int(j)) for i, j in edges)
+def _edge_keys(edges: np.ndarray, nnode: int) -> np.ndarray:
+    e = np.sort(np.asarray(edges, dtype=np.int64).reshape(-1, 2), axis=1)
+    return e[:, 0] * np.int64(nnode) + e[:, 1]
+
+def _sorted_contains(sorted_keys: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    if sorted_keys.size == 0:
+        return np.zeros(keys.shape, dtype=bool)
+    pos = np.minimum(np.searchsorted(sorted_keys, keys), sorted_keys.size - 1)
+    return sorted_keys[pos] == keys
+
+def mesh_edges(T: np.ndarray):
+    '''
+    Unique undirected edges of a triangle mesh.
+
+    Returns
+    -------
+    edges     : (nedge,2) sorted node pairs (i<j), ordered by (i, j)
+    elem_edge : (nelem,3) edge id of the local edges (n0,n1), (n1,n2), (n2,n0)
+    counts    : (nedge,) number of elements sharing each edge (1 on the boundary)
+    '''
+    T = np.asarray(T)[:, :3]
+    nnode = int(T.max()) + 1 if T.size else 0
+    local = np.stack([T, np.roll(T, -1, axis=1)], axis=2).reshape(-1, 2)
+    keys = _edge_keys(local, nnode)
+    ukeys, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    edges = np.column_stack([ukeys // max(nnode, 1), ukeys % max(nnode, 1)]).astype(T.dtype)
+    elem_edge = inverse.reshape(T.shape[0], 3).astype(index_dtype(max(ukeys.size - 1, 0)))
+    return edges, elem_edge, counts
 
 def extract_boundary_edges(T: np.ndarray) -> np.ndarray:
-    edge_count = defaultdict(int)
-    for tri in T:
-        a, b, c = int(tri[0]), int(tri[1]), int(tri[2])
-        for i, j in [(a, b), (b, c), (c, a)]:
-            if i > j:
-                i, j = j, i
-            edge_count[(i, j)] += 1
-    bnd = [e for e, cnt in edge_count.items() if cnt == 1]
-    return np.array(bnd, dtype=int)
+    '''
+    Edges used by exactly one element: (nbedge,2) sorted corner pairs, or for T6 connectivity
+    (nbedge,3) rows (a, b, m) with the mid-side node m.
+    '''
+    T = np.asarray(T)
+    if T.size == 0:
+        ncol = 3 if T.ndim == 2 and T.shape[1] == 6 else 2
+        return np.zeros((0, ncol), dtype=T.dtype if np.issubdtype(T.dtype, np.integer) else int)
+    edges, elem_edge, counts = mesh_edges(T)
+    if T.shape[1] == 6:
+        mid = np.empty(edges.shape[0], dtype=T.dtype)
+        mid[elem_edge.ravel()] = T[:, 3:].ravel()   # local edge k = (n_k, n_k+1) has mid node 3+k
+        edges = np.column_stack([edges, mid])
+    return edges[counts == 1]
 
 def edges_from_node_chain(node_ids: np.ndarray) -> np.ndarray:
-    node_ids = np.asarray(node_ids, dtype=int).ravel()
+    node_ids = np.asarray(node_ids).ravel()
+    if not np.issubdtype(node_ids.dtype, np.integer):
+        node_ids = node_ids.astype(int)
     if node_ids.size < 2:
-        return np.zeros((0, 2), dtype=int)
+        return np.zeros((0, 2), dtype=node_ids.dtype)
     e = np.column_stack([node_ids[:-1], node_ids[1:]])
     a = np.minimum(e[:, 0], e[:, 1])
     b = np.maximum(e[:, 0], e[:, 1])
-    return np.column_stack([a, b]).astype(int)
+    return np.column_stack([a, b])
 
 def build_boundary_from_predicates(
     X: np.ndarray,
     T: np.ndarray,
     predicates: dict[str, Callable[[float, float], bool]],
+    *,
+    vectorized: bool | None = None,
+    boundary_edges: np.ndarray | None = None,
 ) -> Boundary:
-    all_bnd_edges = extract_boundary_edges(T)
+    '''
+    Boundary groups from node predicates pred(x, y) -> bool.
+
+    A node belongs to a group if the predicate holds there; a boundary edge belongs to it
+    if all its nodes do (endpoints, and the mid-side node of T6 edges). With
+    vectorized=None each predicate is first called once with the full coordinate arrays and
+    falls back to per-node scalar calls if that fails or does not return one flag per node;
+    True/False force either path.
+    '''
+    if boundary_edges is None:
+        boundary_edges = extract_boundary_edges(T)
+    boundary_edges = np.asarray(boundary_edges)
+    boundary_edges = boundary_edges.reshape(-1, boundary_edges.shape[1] if boundary_edges.ndim == 2 else 2)
+    idx = np.asarray(T).dtype if np.issubdtype(np.asarray(T).dtype, np.integer) else np.dtype(int)
+    boundary_edges = boundary_edges.astype(idx, copy=False)
 
     nodes: dict[str, np.ndarray] = {}
     edges: dict[str, np.ndarray] = {}
 
     for name, pred in predicates.items():
-        mask_nodes = np.array([bool(pred(float(x), float(y))) for x, y in X], dtype=bool)
-        group_nodes = np.where(mask_nodes)[0].astype(int)
-        nodes[name] = group_nodes
-
-        mask_edges = []
-        for i, j in all_bnd_edges:
-            xi, yi = X[int(i)]
-            xj, yj = X[int(j)]
-            mask_edges.append(bool(pred(float(xi), float(yi))) and bool(pred(float(xj), float(yj))))
-        group_edges = all_bnd_edges[np.array(mask_edges, dtype=bool)]
-        edges[name] = group_edges.astype(int)
+        mask_nodes = _eval_predicate(pred, X, vectorized)
+        nodes[name] = np.flatnonzero(mask_nodes).astype(idx)
+        edges[name] = boundary_edges[mask_nodes[boundary_edges].all(axis=1)]
 
     return Boundary(nodes=nodes, edges=edges)
+
+def _eval_predicate(pred, X: np.ndarray, vectorized: bool | None) -> np.ndarray:
+    nnode = X.shape[0]
+    if vectorized is not False:
+        try:
+            mask = np.asarray(pred(X[:, 0], X[:, 1]))
+        except (TypeError, ValueError):
+            if vectorized:
+                raise
+            mask = None
+        if mask is not None and mask.shape == (nnode,):
+            return mask.astype(bool)
+        if vectorized:
+            raise ValueError(f"Vectorized predicate must return shape ({nnode},), got {np.shape(mask)}.")
+    return np.fromiter((bool(pred(float(x), float(y))) for x, y in X), dtype=bool, count=nnode)
@@ -0,0 +1,189 @@
+from __future__ import annotations
+import numpy as np
+
+from .boundary import mesh_edges
+
+class Mesh:
+    '''
+    Triangle mesh (X, T) with lazily computed and cached topology. T is (nelem,3) for linear
+    or (nelem,6) for quadratic triangles (corners first, see `t3_to_t6`); edges, adjacency and
+    geometry refer to the corner triangles.
+
+    Connectivity (edges, element<->edge maps, node->element adjacency, boundary edges), dof
+    tables, assembly plans and element geometry are computed on first access and reused by
+    the solvers and `Boundary.validate`. X and T are treated as immutable: call
+    `invalidate()` after modifying them in place. X may be float32 storage (see
+    `pyfemlite.precision`); geometry and everything computed from it is float64.
+    '''
+    __slots__ = (
+        "X", "T",
+        "_edges", "_elem_edge", "_edge_count", "_edge_elem",
+        "_node_elem", "_boundary_edges", "_geometry", "_dofs", "_plans", "_digest", "_renumbered",
+    )
+
+    def __init__(self, X: np.ndarray, T: np.ndarray):
+        X = np.asarray(X)
+        if X.dtype not in (np.float32, np.float64):
+            X = X.astype(float)
+        T = np.asarray(T)
+        if X.ndim != 2 or X.shape[1] != 2:
+            raise ValueError("X must have shape (nnode,2).")
+        if T.ndim != 2 or T.shape[1] not in (3, 6):
+            raise ValueError("T must have shape (nelem,3) or (nelem,6).")
+        if not np.issubdtype(T.dtype, np.integer):
+            raise ValueError("T must be an integer array.")
+        self.X = X
+        self.T = T
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        '''Drop every cached quantity (after X or T were modified in place).'''
+        self._edges = None
+        self._elem_edge = None
+        self._edge_count = None
+        self._edge_elem = None
+        self._node_elem = None
+        self._boundary_edges = None
+        self._geometry = None
+        self._dofs = {}
+        self._plans = {}
+        self._digest = None
+        self._renumbered = {}
+
+    @property
+    def nnode(self) -> int:
+        return int(self.X.shape[0])
+
+    @property
+    def nelem(self) -> int:
+        return int(self.T.shape[0])
+
+    @property
+    def nen(self) -> int:
+        '''Nodes per element: 3 (T3) or 6 (T6).'''
+        return int(self.T.shape[1])
+
+    def _build_edges(self) -> None:
+        self._edges, self._elem_edge, self._edge_count = mesh_edges(self.T)
+
+    @property
+    def edges(self) -> np.ndarray:
+        '''(nedge,2) unique edges with sorted node pairs.'''
+        if self._edges is None:
+            self._build_edges()
+        return self._edges
+
+    @property
+    def elem_edge(self) -> np.ndarray:
+        '''(nelem,3) edge ids of the local edges (n0,n1), (n1,n2), (n2,n0).'''
+        if self._elem_edge is None:
+            self._build_edges()
+        return self._elem_edge
+
+    @property
+    def edge_count(self) -> np.ndarray:
+        '''(nedge,) number of elements sharing each edge.'''
+        if self._edge_count is None:
+            self._build_edges()
+        return self._edge_count
+
+    @property
+    def edge_elem(self) -> np.ndarray:
+        '''(nedge,2) elements on either side of each edge; -1 in column 1 on the boundary.'''
+        if self._edge_elem is None:
+            eid = self.elem_edge.ravel()
+            order = np.argsort(eid, kind="stable")
+            elem = (order // 3).astype(self.T.dtype)
+            start = np.zeros(self.edges.shape[0] + 1, dtype=np.int64)
+            np.cumsum(self.edge_count, out=start[1:])
+            ee = np.full((self.edges.shape[0], 2), -1, dtype=self.T.dtype)
+            ee[:, 0] = elem[start[:-1]]
+            two = self.edge_count > 1
+            ee[two, 1] = elem[start[:-1][two] + 1]
+            self._edge_elem = ee
+        return self._edge_elem
+
+    @property
+    def node_elem(self) -> tuple[np.ndarray, np.ndarray]:
+        '''Node->element adjacency in CSR form (indptr (nnode+1,), indices).'''
+        if self._node_elem is None:
+            flat = self.T[:, :3].ravel()
+            order = np.argsort(flat, kind="stable")
+            indptr = np.zeros(self.nnode + 1, dtype=np.int64)
+            np.cumsum(np.bincount(flat, minlength=self.nnode), out=indptr[1:])
+            self._node_elem = (indptr, (order // 3).astype(self.T.dtype))
+        return self._node_elem
+
+    @property
+    def boundary_edges(self) -> np.ndarray:
+        '''(nbedge,2) edges used by exactly one element.'''
+        if self._boundary_edges is None:
+            self._boundary_edges = self.edges[self.edge_count == 1]
+        return self._boundary_edges
+
+    def geometry(self):
+        '''Cached (A, dNdx) from `t3_areas_and_grads` (corner triangles: dNdx are the barycentric gradients on T6).'''
+        if self._geometry is None:
+            from pyfemlite.fem.shape_t3 import t3_areas_and_grads
+            self._geometry = t3_areas_and_grads(self.X, self.T)
+        return self._geometry
+
+    def element_dofs(self, dofs_per_node: int = 1) -> np.ndarray:
+        '''Cached element dof table with interleaved node dofs.'''
+        if dofs_per_node not in self._dofs:
+            from pyfemlite.fem.assembly import element_dofs
+            self._dofs[dofs_per_node] = element_dofs(self.T, dofs_per_node)
+        return self._dofs[dofs_per_node]
+
+    def assembly_plan(self, dofs_per_node: int = 1, disk_cache=None):
+        '''
+        Cached `AssemblyPlan` for the given number of dofs per node.
+
+        disk_cache : optional `pyfemlite.cache.DiskCache`; the CSR pattern and slot map are
+            then loaded from (or stored in) it, keyed on the mesh content and index policy.
+        '''
+        if dofs_per_node not in self._plans:
+            from pyfemlite.fem.assembly import AssemblyPlan
+            edofs = self.element_dofs(dofs_per_node)
+            n_dof = dofs_per_node * self.nnode
+            arrays = key = None
+            if disk_cache is not None:
+                from pyfemlite.fem.linear_system import array_digest
+                from pyfemlite.precision import get_policy
+                key = array_digest(self.digest(), dofs_per_node, get_policy().index, tag="assembly_plan")
+                arrays = disk_cache.get(key)
+            if arrays is not None:
+                plan = AssemblyPlan(n_dof=n_dof, edofs=edofs, indptr=arrays["indptr"],
+                                    indices=arrays["indices"], slots=arrays["slots"])
+            else:
+                plan = AssemblyPlan.from_element_dofs(edofs, n_dof)
+                if key is not None:
+                    disk_cache.put(key, {"indptr": plan.indptr, "indices": plan.indices, "slots": plan.slots})
+            self._plans[dofs_per_node] = plan
+        return self._plans[dofs_per_node]
+
+    def digest(self) -> str:
+        '''Cached content hash of X and T (used as the mesh part of cache keys).'''
+        if self._digest is None:
+            from pyfemlite.fem.linear_system import array_digest
+            self._digest = array_digest(self.X, self.T, tag="mesh")
+        return self._digest
+
+    def renumbered(self, method: str = "rcm"):
+        '''Cached (NodeRenumbering, renumbered Mesh) for a reordering method (see `compute_node_renumbering`).'''
+        if method not in self._renumbered:
+            from .reorder import compute_node_renumbering
+            renum = compute_node_renumbering(self, method=method)
+            self._renumbered[method] = (renum, Mesh(*renum.permute_mesh(self.X, self.T)))
+        return self._renumbered[method]
+
+    def __repr__(self) -> str:
+        return f"Mesh(nnode={self.nnode}, nelem={self.nelem})"
+
+def as_mesh(X, T=None) -> Mesh:
+    '''Return X if it already is a `Mesh`, otherwise wrap the (X, T) arrays.'''
+    if isinstance(X, Mesh):
+        return X
+    if T is None:
+        raise ValueError("T is required when X is not a Mesh.")
+    return Mesh(X, T)
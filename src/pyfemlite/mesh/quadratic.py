@@ -0,0 +1,55 @@
+from __future__ import annotations
+import numpy as np
+
+from .boundary import Boundary, mesh_edges, _edge_keys
+from .mesh import Mesh
+from .structured_tri import structured_rectangle_tri
+from pyfemlite.precision import index_dtype
+
+def t3_to_t6(X, T: np.ndarray | None = None, boundary: Boundary | None = None):
+    '''
+    Quadratic (T6) mesh from a linear triangle mesh: one node at the midpoint of every edge.
+
+    The T3 nodes keep their ids and the mid-edge node of edge k of `mesh_edges` gets id
+    nnode + k. T6 rows are (n0, n1, n2, m01, m12, m20), the VTK_QUADRATIC_TRIANGLE order.
+    Boundary groups gain the mid-side nodes of their edges, and their edges become
+    (nedge,3) rows (a, b, m) used by the 3-node traction/flux integration.
+
+    Returns (X6, T6, boundary6), or (mesh6, boundary6) for a `Mesh` input; boundary6 is None
+    without a boundary.
+    '''
+    if isinstance(X, Mesh):
+        X6, T6, b6 = t3_to_t6(X.X, X.T, boundary)
+        return Mesh(X6, T6), b6
+    X = np.asarray(X)
+    T = np.asarray(T)
+    if T.ndim != 2 or T.shape[1] != 3:
+        raise ValueError("T must have shape (nelem,3).")
+    nnode = X.shape[0]
+    edges, elem_edge, _ = mesh_edges(T)
+    X6 = np.concatenate([X, 0.5 * (X[edges[:, 0]] + X[edges[:, 1]])]).astype(X.dtype, copy=False)
+    idx = index_dtype(nnode + edges.shape[0] - 1)
+    T6 = np.concatenate([T.astype(idx), nnode + elem_edge.astype(idx)], axis=1)
+    if boundary is None:
+        return X6, T6, None
+
+    keys = _edge_keys(edges, nnode)    # sorted, as mesh_edges orders edges by (i, j)
+    nodes, bedges = {}, {}
+    for name, E in boundary.edges.items():
+        E = np.asarray(E)
+        E = E.reshape(-1, E.shape[1] if E.ndim == 2 else 2)[:, :2]
+        k = _edge_keys(E, nnode)
+        pos = np.minimum(np.searchsorted(keys, k), max(keys.size - 1, 0))
+        if k.size and (keys.size == 0 or np.any(keys[pos] != k)):
+            raise ValueError(f"Boundary.edges['{name}'] contains edges that are not mesh edges.")
+        mid = (nnode + pos).astype(idx)
+        bedges[name] = np.column_stack([E.astype(idx), mid])
+        nodes[name] = np.union1d(np.asarray(boundary.nodes.get(name, []), dtype=idx), mid).astype(idx)
+    for name, arr in boundary.nodes.items():
+        if name not in nodes:
+            nodes[name] = np.asarray(arr).astype(idx)
+    return X6, T6, Boundary(nodes=nodes, edges=bedges)
+
+def structured_rectangle_t6(nx: int, ny: int, **kwargs):
+    '''`structured_rectangle_tri` converted with `t3_to_t6`; returns (X, T, boundary).'''
+    return t3_to_t6(*structured_rectangle_tri(nx, ny, **kwargs))
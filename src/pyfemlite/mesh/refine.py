@@ -0,0 +1,108 @@
+from __future__ import annotations
+import numpy as np
+from scipy.sparse import csr_matrix, identity, kron
+
+from .boundary import Boundary, mesh_edges, _edge_keys, _sorted_contains
+
+def _linear_elements(T) -> np.ndarray:
+    T = np.asarray(T)
+    if T.ndim != 2 or T.shape[1] != 3:
+        raise ValueError("Refinement supports linear (T3) triangles only.")
+    return T
+
+def longest_edge_first(X: np.ndarray, T: np.ndarray) -> np.ndarray:
+    '''
+    Rotate the local node order of every triangle so that its longest edge is (n0, n1), the
+    refinement edge of `refine_newest_vertex`. Orientation and node ids are unchanged.
+    '''
+    T = _linear_elements(T)
+    P = X[T]
+    # squared length of local edge k = (n_k, n_{k+1})
+    L = ((np.roll(P, -1, axis=1) - P) ** 2).sum(axis=2)
+    shift = np.argmax(L, axis=1)
+    idx = (shift[:, None] + np.arange(3)) % 3
+    return np.take_along_axis(T, idx, axis=1)
+
+def refine_newest_vertex(
+    X: np.ndarray,
+    T: np.ndarray,
+    marked,
+    boundary: Boundary | None = None,
+):
+    '''
+    Conforming newest-vertex bisection of the marked elements.
+
+    Every triangle (n0, n1, n2) has refinement edge (n0, n1) opposite its newest vertex n2 and
+    is bisected into (n2, n0, m) and (n1, n2, m), m the edge midpoint (the children's newest
+    vertex). A closure pass marks the refinement edge of every element with a marked edge, so
+    the result has no hanging nodes; all steps are vectorized over elements.
+
+    marked : element ids or a boolean mask.
+    boundary : groups are carried over -- a split group edge is replaced by its two halves
+        and the midpoint is appended to the group's nodes.
+
+    Returns (X, T, boundary, P) with P the (nnode_new, nnode_old) sparse prolongation of
+    nodal P1 fields (see `prolong`). Old nodes keep their ids; new nodes are appended.
+    '''
+    X = np.asarray(X, dtype=float)
+    T = _linear_elements(T)
+    nnode, nelem = X.shape[0], T.shape[0]
+    mask = np.zeros(nelem, dtype=bool)
+    marked = np.asarray(marked)
+    mask[marked if marked.dtype == bool else marked.astype(np.int64)] = True
+
+    edges, elem_edge, _ = mesh_edges(T)
+    split = np.zeros(edges.shape[0], dtype=bool)
+    split[elem_edge[mask, 0]] = True
+    while True:   # closure: an element with any split edge must split its refinement edge
+        need = split[elem_edge].any(axis=1) & ~split[elem_edge[:, 0]]
+        if not need.any():
+            break
+        split[elem_edge[need, 0]] = True
+
+    new_edges = edges[split].astype(np.int64)
+    mid = nnode + np.arange(new_edges.shape[0])
+    X_new = np.vstack([X, 0.5 * (X[new_edges[:, 0]] + X[new_edges[:, 1]])])
+    n_total = X_new.shape[0]
+    keys = _edge_keys(new_edges, n_total)    # sorted, since edges are ordered by (i, j)
+
+    T_cur = T.astype(np.int64)
+    while True:
+        k = _edge_keys(T_cur[:, :2], n_total)
+        hit = _sorted_contains(keys, k)
+        if not hit.any():
+            break
+        m = mid[np.searchsorted(keys, k[hit])]
+        a, b, c = T_cur[hit, 0], T_cur[hit, 1], T_cur[hit, 2]
+        children = np.stack([np.column_stack([c, a, m]), np.column_stack([b, c, m])], axis=1).reshape(-1, 3)
+        T_cur = np.concatenate([T_cur[~hit], children])
+    dtype = T.dtype if n_total - 1 <= np.iinfo(T.dtype).max else np.int64
+    T_new = T_cur.astype(dtype)
+
+    rows = np.concatenate([np.arange(nnode), mid, mid])
+    cols = np.concatenate([np.arange(nnode), new_edges[:, 0], new_edges[:, 1]])
+    vals = np.concatenate([np.ones(nnode), np.full(2 * mid.size, 0.5)])
+    P = csr_matrix((vals, (rows, cols)), shape=(n_total, nnode))
+
+    if boundary is not None:
+        boundary = _refine_boundary(boundary, keys, mid, n_total)
+    return X_new, T_new, boundary, P
+
+def prolong(P: csr_matrix, u: np.ndarray, dofs_per_node: int = 1) -> np.ndarray:
+    '''Interpolate a nodal vector (interleaved dofs) from the coarse to the refined mesh.'''
+    if dofs_per_node == 1:
+        return P @ u
+    return kron(P, identity(dofs_per_node, format="csr"), format="csr") @ u
+
+def _refine_boundary(boundary: Boundary, keys: np.ndarray, mid: np.ndarray, nnode: int) -> Boundary:
+    nodes = {k: np.asarray(v, dtype=int) for k, v in boundary.nodes.items()}
+    edges = {}
+    for name, E in boundary.edges.items():
+        E = np.asarray(E, dtype=int).reshape(-1, 2)
+        hit = _sorted_contains(keys, _edge_keys(E, nnode))
+        m = mid[np.searchsorted(keys, _edge_keys(E[hit], nnode))]
+        halves = np.stack([np.column_stack([E[hit, 0], m]), np.column_stack([m, E[hit, 1]])], axis=1).reshape(-1, 2)
+        edges[name] = np.concatenate([E[~hit], halves]) if hit.any() else E
+        if name in nodes and m.size:
+            nodes[name] = np.concatenate([nodes[name], m])
+    return Boundary(nodes=nodes, edges=edges)
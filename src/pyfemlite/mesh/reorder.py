@@ -0,0 +1,266 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+import time
+import numpy as np
+from scipy.sparse import csr_matrix, tril
+from scipy.sparse.csgraph import reverse_cuthill_mckee
+
+from .boundary import Boundary
+from .mesh import Mesh, as_mesh
+
+METHODS = ("rcm", "nd")
+
+@dataclass(frozen=True)
+class NodeRenumbering:
+    '''
+    Node permutation: `perm[new] = old` and `inverse[old] = new`.
+
+    Maps meshes, boundary groups, node/dof ids and nodal vectors between the original and
+    the renumbered numbering; every method passes None through unchanged.
+    '''
+    perm: np.ndarray
+    inverse: np.ndarray
+    method: str = "custom"
+
+    @classmethod
+    def from_permutation(cls, perm, method: str = "custom") -> NodeRenumbering:
+        perm = np.asarray(perm, dtype=np.int64).ravel()
+        inverse = np.empty_like(perm)
+        inverse[perm] = np.arange(perm.size)
+        if not np.array_equal(perm[inverse], np.arange(perm.size)):
+            raise ValueError("perm is not a permutation.")
+        return cls(perm=perm, inverse=inverse, method=method)
+
+    @property
+    def nnode(self) -> int:
+        return int(self.perm.size)
+
+    def permute_mesh(self, X: np.ndarray, T: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        '''Renumbered (X, T); element order and local node order are kept.'''
+        T = np.asarray(T)
+        return np.asarray(X)[self.perm], self.inverse[T].astype(T.dtype)
+
+    def permute_nodes(self, nodes):
+        '''Renumbered node ids (any shape, e.g. node lists or (nedge,2) edge arrays).'''
+        if nodes is None:
+            return None
+        nodes = np.asarray(nodes, dtype=int)
+        return self.inverse[nodes]
+
+    def permute_dofs(self, dofs, dofs_per_node: int = 1):
+        '''Renumbered dof ids of an interleaved dof layout.'''
+        if dofs is None:
+            return None
+        dofs = np.asarray(dofs, dtype=int)
+        return dofs_per_node * self.inverse[dofs // dofs_per_node] + dofs % dofs_per_node
+
+    def permute_boundary(self, boundary: Boundary | None) -> Boundary | None:
+        if boundary is None:
+            return None
+        return Boundary(
+            nodes={k: self.permute_nodes(v) for k, v in boundary.nodes.items()},
+            edges={k: self.permute_nodes(v) for k, v in boundary.edges.items()},
+        )
+
+    def to_new(self, values, dofs_per_node: int = 1):
+        '''Nodal vector (nnode*dofs_per_node, ...) in the original numbering -> renumbered.'''
+        return self._take(values, self.perm, dofs_per_node)
+
+    def to_original(self, values, dofs_per_node: int = 1):
+        '''Nodal vector (nnode*dofs_per_node, ...) in the renumbered numbering -> original.'''
+        return self._take(values, self.inverse, dofs_per_node)
+
+    def _take(self, values, index: np.ndarray, dofs_per_node: int):
+        if values is None:
+            return None
+        values = np.asarray(values)
+        if values.shape[0] != dofs_per_node * self.nnode:
+            raise ValueError(f"Expected {dofs_per_node * self.nnode} rows, got {values.shape[0]}.")
+        v = values.reshape((self.nnode, dofs_per_node) + values.shape[1:])
+        return v[index].reshape(values.shape)
+
+def node_adjacency(T, nnode: int | None = None) -> csr_matrix:
+    '''
+    Symmetric node graph (nnode,nnode) of the mesh edges, without the diagonal; T may be a
+    `Mesh`. On T6 connectivity every pair of nodes of an element is coupled.
+    '''
+    if isinstance(T, Mesh) and T.nen == 3:
+        edges, nnode = T.edges, T.nnode
+    else:
+        if isinstance(T, Mesh):
+            T, nnode = T.T, T.nnode
+        T = np.asarray(T)
+        if nnode is None:
+            nnode = int(T.max()) + 1
+        if T.shape[1] == 6:
+            a, b = np.triu_indices(6, 1)
+            edges = np.column_stack([T[:, a].ravel(), T[:, b].ravel()])
+        else:
+            from .boundary import mesh_edges
+            edges = mesh_edges(T)[0]
+    i = np.concatenate([edges[:, 0], edges[:, 1]]).astype(np.int64)
+    j = np.concatenate([edges[:, 1], edges[:, 0]]).astype(np.int64)
+    return csr_matrix((np.ones(i.size, dtype=np.int8), (i, j)), shape=(nnode, nnode))
+
+def compute_node_renumbering(X, T: np.ndarray | None = None, *, method: str = "rcm",
+                             leaf_size: int = 64) -> NodeRenumbering:
+    '''
+    Bandwidth/fill reducing node permutation from the mesh connectivity.
+
+    method : "rcm" (reverse Cuthill-McKee: small bandwidth and profile, suited to banded and
+        skyline factorizations and to cache-friendly sweeps) or "nd" (geometric nested
+        dissection: recursive coordinate bisection with vertex separators numbered last,
+        down to `leaf_size` nodes).
+    '''
+    mesh = as_mesh(X, T)
+    adj = node_adjacency(mesh)
+    if method == "rcm":
+        perm = reverse_cuthill_mckee(adj, symmetric_mode=True)
+    elif method == "nd":
+        perm = _nested_dissection(mesh.X, adj, leaf_size)
+    else:
+        raise ValueError(f"Unknown reordering '{method}'. Choose from {METHODS}.")
+    return NodeRenumbering.from_permutation(perm, method)
+
+def renumber_mesh(X, T: np.ndarray | None = None, boundary: Boundary | None = None, *, method: str = "rcm"):
+    '''
+    Renumber the nodes of (X, T) or a `Mesh` and its boundary groups.
+
+    Returns (X, T, boundary, renumbering), or (mesh, boundary, renumbering) for a Mesh input;
+    map solutions back with `renumbering.to_original(u, dofs_per_node)`.
+    '''
+    if isinstance(X, Mesh):
+        renum, mesh = X.renumbered(method)
+        return mesh, renum.permute_boundary(boundary), renum
+    renum = compute_node_renumbering(X, T, method=method)
+    X2, T2 = renum.permute_mesh(X, T)
+    return X2, T2, renum.permute_boundary(boundary), renum
+
+def matrix_bandwidth(K) -> tuple[int, int]:
+    '''(bandwidth, profile) of a symmetric sparse matrix: max |i-j| over the stored entries and
+    the envelope size sum_i (i - min_j), an upper bound of a natural-order Cholesky factor.'''
+    L = tril(csr_matrix(K), format="csr")
+    rows = np.repeat(np.arange(L.shape[0]), np.diff(L.indptr))
+    if rows.size == 0:
+        return 0, 0
+    first = np.full(L.shape[0], np.iinfo(np.int64).max)
+    np.minimum.at(first, rows, L.indices)
+    has = first <= np.arange(L.shape[0])
+    return int((rows - L.indices).max()), int((np.arange(L.shape[0]) - first)[has].sum())
+
+@dataclass(frozen=True)
+class ReorderingStats:
+    '''Measurements of one node ordering (see `reordering_report`).'''
+    method: str
+    bandwidth: int
+    profile: int
+    factor_nnz: int
+    factor_time: float
+    solve_time: float
+    reorder_time: float = 0.0
+
+@dataclass(frozen=True)
+class ReorderingReport:
+    '''Side-by-side `ReorderingStats`; the first entry is the original ordering.'''
+    ndof: int
+    stats: list[ReorderingStats] = field(default_factory=list)
+
+    def summary(self) -> str:
+        base = self.stats[0]
+        lines = [f"Node reordering report ({self.ndof} dofs):",
+                 f"  {'method':10s} {'bandwidth':>10s} {'profile':>12s} {'factor nnz':>12s} "
+                 f"{'factor s':>9s} {'solve s':>9s} {'reorder s':>9s}"]
+        for s in self.stats:
+            lines.append(f"  {s.method:10s} {s.bandwidth:10d} {s.profile:12d} {s.factor_nnz:12d} "
+                         f"{s.factor_time:9.4f} {s.solve_time:9.4f} {s.reorder_time:9.4f}")
+        for s in self.stats[1:]:
+            lines.append(f"  {s.method}: bandwidth x{_ratio(base.bandwidth, s.bandwidth)}, "
+                         f"profile x{_ratio(base.profile, s.profile)}, "
+                         f"factor nnz x{_ratio(base.factor_nnz, s.factor_nnz)}, "
+                         f"factor+solve time x{_ratio(base.factor_time + base.solve_time, s.factor_time + s.solve_time)}")
+        return "\n".join(lines)
+
+    def __str__(self) -> str:
+        return self.summary()
+
+def reordering_report(X, T: np.ndarray | None = None, *, methods=METHODS, dofs_per_node: int = 2,
+                      dirichlet_nodes=None, permc_spec: str = "MMD_AT_PLUS_A") -> ReorderingReport:
+    '''
+    Measure bandwidth, profile, sparse LU factor nnz and factor/solve times of the stiffness
+    matrix (Poisson for dofs_per_node=1, plane-stress elasticity for 2) in the original node
+    order and after each reordering method.
+
+    dirichlet_nodes : nodes clamped to make the operator SPD (default: all boundary nodes).
+    permc_spec : column ordering handed to SuperLU, as in the direct solver; use "NATURAL"
+        to see the fill produced by the node ordering alone.
+    '''
+    mesh = as_mesh(X, T)
+    if dirichlet_nodes is None:
+        dirichlet_nodes = np.unique(mesh.boundary_edges)
+    stats = [_ordering_stats("original", mesh, None, dofs_per_node, dirichlet_nodes, permc_spec)]
+    for method in methods:
+        t0 = time.perf_counter()
+        renum = compute_node_renumbering(mesh, method=method)
+        stats.append(_ordering_stats(method, mesh, renum, dofs_per_node, dirichlet_nodes, permc_spec,
+                                     time.perf_counter() - t0))
+    return ReorderingReport(ndof=dofs_per_node * mesh.nnode, stats=stats)
+
+def _ordering_stats(name, mesh, renum, dofs_per_node, dirichlet_nodes, permc_spec, reorder_time=0.0):
+    from scipy.sparse.linalg import splu
+    from pyfemlite.fem.bc import DirichletPartition
+
+    nodes = np.asarray(dirichlet_nodes, dtype=int)
+    if renum is not None:
+        mesh = Mesh(*renum.permute_mesh(mesh.X, mesh.T))
+        nodes = renum.permute_nodes(nodes)
+    K = _model_stiffness(mesh, dofs_per_node)
+    dofs = (dofs_per_node * nodes[:, None] + np.arange(dofs_per_node)).ravel()
+    K_ff, _ = DirichletPartition.from_dofs(K.shape[0], dofs).reduce_matrix(K)
+    bw, profile = matrix_bandwidth(K_ff)
+    t0 = time.perf_counter()
+    lu = splu(K_ff.tocsc(), permc_spec=permc_spec, options=dict(SymmetricMode=True))
+    t1 = time.perf_counter()
+    lu.solve(np.ones(K_ff.shape[0]))
+    t2 = time.perf_counter()
+    return ReorderingStats(method=name, bandwidth=bw, profile=profile, factor_nnz=int(lu.L.nnz + lu.U.nnz),
+                           factor_time=t1 - t0, solve_time=t2 - t1, reorder_time=reorder_time)
+
+def _model_stiffness(mesh: Mesh, dofs_per_node: int) -> csr_matrix:
+    A, dNdx = mesh.geometry()
+    if dofs_per_node == 1:
+        from pyfemlite.fem.poisson2d import poisson_element_stiffness
+        Ke = poisson_element_stiffness(A, dNdx, 1.0)
+    elif dofs_per_node == 2:
+        from pyfemlite.fem.elasticity2d import elasticity_B_matrices, elasticity_element_stiffness
+        from pyfemlite.fem.materials import D_plane_stress
+        Ke = elasticity_element_stiffness(A, elasticity_B_matrices(dNdx), D_plane_stress(1.0, 0.3))
+    else:
+        raise ValueError("dofs_per_node must be 1 (Poisson) or 2 (elasticity).")
+    return mesh.assembly_plan(dofs_per_node).assemble(Ke)
+
+def _ratio(before: float, after: float) -> str:
+    return f"{before / after:.2f}" if after else "inf"
+
+def _nested_dissection(X: np.ndarray, adj: csr_matrix, leaf_size: int) -> np.ndarray:
+    '''Recursive coordinate bisection; each separator is numbered after both halves.'''
+    order: list[np.ndarray] = []
+    leaf_size = max(int(leaf_size), 1)
+
+    def dissect(nodes: np.ndarray) -> None:
+        if nodes.size <= leaf_size:
+            order.append(nodes)
+            return
+        pts = X[nodes]
+        axis = int(np.argmax(pts.max(axis=0) - pts.min(axis=0)))
+        by_axis = nodes[np.argsort(pts[:, axis], kind="stable")]
+        half = nodes.size // 2
+        left, right = np.sort(by_axis[:half]), np.sort(by_axis[half:])
+        # separator: left nodes with a neighbour on the right
+        sub = adj[left][:, right]
+        is_sep = np.diff(sub.indptr) > 0
+        dissect(left[~is_sep])
+        dissect(right)
+        order.append(left[is_sep])
+
+    dissect(np.arange(adj.shape[0]))
+    return np.concatenate(order)
@@ -1,38 +1,129 @@
 from __future__ import annotations
+from typing import Iterator
 import numpy as np
 from .boundary import Boundary, edges_from_node_chain
+from .mesh import Mesh
+from pyfemlite.precision import index_dtype as _policy_index_dtype, storage_dtype
 
-def structured_unit_square_tri(nx: int, ny: int):
-    xs = np.linspace(0.0, 1.0, nx + 1)
-    ys = np.linspace(0.0, 1.0, ny + 1)
-    X = np.array([(x, y) for y in ys for x in xs], dtype=float)
-
-    def nid(i, j):
-        return j * (nx + 1) + i
-
-    elems = []
-    for j in range(ny):
-        for i in range(nx):
-            n00 = nid(i, j)
-            n10 = nid(i + 1, j)
-            n01 = nid(i, j + 1)
-            n11 = nid(i + 1, j + 1)
-            elems.append((n00, n10, n11))
-            elems.append((n00, n11, n01))
-    T = np.array(elems, dtype=int)
-
-    left   = np.array([nid(0,  j) for j in range(ny + 1)], dtype=int)
-    right  = np.array([nid(nx, j) for j in range(ny + 1)], dtype=int)
-    bottom = np.array([nid(i, 0) for i in range(nx + 1)], dtype=int)
-    top    = np.array([nid(i, ny) for i in range(nx + 1)], dtype=int)
-
-    nodes = {"left": left, "right": right, "bottom": bottom, "top": top}
-    edges = {
-        "left":   edges_from_node_chain(left),
-        "right":  edges_from_node_chain(right),
-        "bottom": edges_from_node_chain(bottom),
-        "top":    edges_from_node_chain(top),
+DIAGONALS = ("right", "left", "alternate")
+
+def structured_unit_square_tri(nx: int, ny: int, *, as_mesh: bool = False, validate: bool = True, index_dtype=None):
+    '''Structured T3 mesh of the unit square; see `structured_rectangle_tri`.'''
+    return structured_rectangle_tri(nx, ny, as_mesh=as_mesh, validate=validate, index_dtype=index_dtype)
+
+def structured_rectangle_tri(
+    nx: int,
+    ny: int,
+    *,
+    xlim: tuple[float, float] = (0.0, 1.0),
+    ylim: tuple[float, float] = (0.0, 1.0),
+    grading: float | tuple[float, float] = 1.0,
+    diagonal: str = "right",
+    index_dtype=None,
+    validate: bool = False,
+    as_mesh: bool = False,
+):
+    '''
+    Structured T3 mesh of the rectangle xlim x ylim with nx x ny cells split into two triangles.
+
+    grading : ratio of the last to the first cell size along x and y (a scalar applies to
+        both axes); cell sizes grow geometrically, 1.0 gives a uniform grid.
+    diagonal : "right" (lower-left to upper-right), "left" (lower-right to upper-left) or
+        "alternate" (checkerboard of both).
+    index_dtype : connectivity dtype; by default the `PrecisionPolicy` index dtype (int32
+        when the node ids fit). X uses the policy storage dtype (float64 unless float32 is set).
+    validate : run `Boundary.validate(strict=True)` on the result. The groups are correct by
+        construction, so the default skips it; solvers still check them on demand through
+        `validate_boundary=True`, reusing the `Mesh` topology cache.
+
+    Nodes are numbered row by row (x fastest). Returns (X, T, boundary), or (mesh, boundary)
+    if as_mesh is set. Groups: "left", "right", "bottom", "top".
+    '''
+    if nx < 1 or ny < 1:
+        raise ValueError("nx and ny must be positive.")
+    gx, gy = (grading, grading) if np.isscalar(grading) else grading
+    xs = _graded_coordinates(nx, xlim, gx)
+    ys = _graded_coordinates(ny, ylim, gy)
+    nnode = (nx + 1) * (ny + 1)
+    X = np.empty((nnode, 2), dtype=storage_dtype())
+    X[:, 0] = np.tile(xs, ny + 1)
+    X[:, 1] = np.repeat(ys, nx + 1)
+    T = _element_rows(nx, 0, ny, diagonal, _policy_index_dtype(nnode - 1, index_dtype))
+
+    stride = nx + 1
+    nodes = {
+        "left":   np.arange(0, nnode, stride, dtype=T.dtype),
+        "right":  np.arange(nx, nnode, stride, dtype=T.dtype),
+        "bottom": np.arange(0, stride, dtype=T.dtype),
+        "top":    np.arange(ny * stride, nnode, dtype=T.dtype),
     }
+    edges = {name: edges_from_node_chain(ids) for name, ids in nodes.items()}
     boundary = Boundary(nodes=nodes, edges=edges)
-    boundary.validate(X, T, strict=True)
+    if as_mesh:
+        mesh = Mesh(X, T)
+        if validate:
+            boundary.validate(mesh, strict=True)
+        return mesh, boundary
+    if validate:
+        boundary.validate(X, T, strict=True)
     return X, T, boundary
+
+def iter_structured_tri_elements(
+    nx: int,
+    ny: int,
+    *,
+    chunk_size: int = 1 << 20,
+    diagonal: str = "right",
+    index_dtype=None,
+) -> Iterator[tuple[int, np.ndarray]]:
+    '''
+    Connectivity of `structured_rectangle_tri(nx, ny, ...)` in blocks of whole cell rows with
+    at most `chunk_size` elements (at least one row).
+
+    Yields (first_element_id, T_block); concatenating the blocks gives the full T. Only one
+    block is held in memory at a time, for out-of-core assembly of very large grids.
+    '''
+    dtype = _policy_index_dtype((nx + 1) * (ny + 1) - 1, index_dtype)
+    rows = max(1, int(chunk_size) // (2 * nx))
+    for j0 in range(0, ny, rows):
+        j1 = min(ny, j0 + rows)
+        yield 2 * nx * j0, _element_rows(nx, j0, j1, diagonal, dtype)
+
+def _graded_coordinates(n: int, lim: tuple[float, float], ratio: float) -> np.ndarray:
+    lo, hi = float(lim[0]), float(lim[1])
+    if not hi > lo:
+        raise ValueError(f"Empty interval {lim}.")
+    if ratio <= 0.0:
+        raise ValueError(f"grading must be positive, got {ratio}.")
+    if ratio == 1.0 or n == 1:
+        return np.linspace(lo, hi, n + 1)
+    h = ratio ** (np.arange(n) / (n - 1))
+    s = np.concatenate([[0.0], np.cumsum(h)])
+    x = lo + (hi - lo) * s / s[-1]
+    x[-1] = hi
+    return x
+
+def _element_rows(nx: int, j0: int, j1: int, diagonal: str, dtype) -> np.ndarray:
+    '''Triangles of cell rows j0 <= j < j1, two per cell, counter-clockwise.'''
+    if diagonal not in DIAGONALS:
+        raise ValueError(f"Unknown diagonal '{diagonal}'. Choose from {DIAGONALS}.")
+    j = np.arange(j0, j1, dtype=dtype)[:, None]
+    i = np.arange(nx, dtype=dtype)[None, :]
+    n00 = j * dtype.type(nx + 1) + i
+    n10 = n00 + 1
+    n01 = n00 + dtype.type(nx + 1)
+    n11 = n01 + 1
+    T = np.empty((j1 - j0, nx, 2, 3), dtype=dtype)
+    if diagonal == "right":
+        right = True
+    elif diagonal == "left":
+        right = False
+    else:
+        right = ((i + j) % 2 == 0)
+    T[:, :, 0, 0] = n00
+    T[:, :, 0, 1] = n10
+    T[:, :, 0, 2] = np.where(right, n11, n01)
+    T[:, :, 1, 0] = np.where(right, n00, n10)
+    T[:, :, 1, 1] = n11
+    T[:, :, 1, 2] = n01
+    return T.reshape(-1, 3)
@@ -1 +1,3 @@
 from .beam_verify import tip_deflection_right_edge, euler_bernoulli_tip_deflection_end_traction
+from .stress import element_gradients, element_strains, element_stresses, von_mises, nodal_average_operator, nodal_average, spr_recovery, stress_fields
+from .probe import PointLocator, sample_line
@@ -0,0 +1,138 @@
+from __future__ import annotations
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from pyfemlite.fem.shape_t6 import t6_shape_functions
+from pyfemlite.mesh.mesh import Mesh, as_mesh
+
+class PointLocator:
+    '''
+    Uniform bucket grid over the triangles of a mesh for locating batches of points.
+
+    Every element is registered in the grid cells its bounding box overlaps (about
+    `cells_per_element` cells per element over the mesh bounding box), so a point is only
+    tested against the few elements of its cell: building is O(nelem) and a query
+    O(npoints) instead of the O(npoints x nelem) brute-force search. Geometry uses the corner
+    nodes (T6 elements are straight-sided); fields are interpolated with the element's own
+    shape functions. Build once per mesh and reuse it, or the matrix of
+    `interpolation_matrix`, for every load case.
+    '''
+
+    def __init__(self, X: np.ndarray | Mesh, T: np.ndarray | None = None, *, cells_per_element: float = 1.0):
+        if cells_per_element <= 0:
+            raise ValueError("cells_per_element must be positive.")
+        self.mesh = as_mesh(X, T)
+        P = self.mesh.X[self.mesh.T[:, :3]].astype(float, copy=False)   # (nelem,3,2)
+        lo, hi = P.min(axis=1), P.max(axis=1)
+        self.origin = lo.min(axis=0)
+        extent = np.maximum(hi.max(axis=0) - self.origin, 1e-300)
+        h = np.sqrt(extent[0] * extent[1] / (cells_per_element * self.mesh.nelem))
+        h = max(h, extent.max() / 4096.0)      # keep the grid size bounded on slivers
+        self.shape = np.maximum(np.ceil(extent / h).astype(np.int64), 1)
+        self.h = extent / self.shape
+
+        c0, c1 = self._cell_coords(lo), self._cell_coords(hi)
+        wx = c1[:, 0] - c0[:, 0] + 1
+        counts = wx * (c1[:, 1] - c0[:, 1] + 1)
+        elem = np.repeat(np.arange(self.mesh.nelem), counts)
+        local = np.arange(elem.size) - np.repeat(np.cumsum(counts) - counts, counts)
+        cells = (c0[elem, 1] + local // wx[elem]) * self.shape[0] + c0[elem, 0] + local % wx[elem]
+        order = np.argsort(cells, kind="stable")
+        self.cell_elems = elem[order]
+        self.cell_ptr = np.zeros(int(self.shape.prod()) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=int(self.shape.prod())), out=self.cell_ptr[1:])
+
+    def _cell_coords(self, p: np.ndarray) -> np.ndarray:
+        c = np.floor((p - self.origin) / self.h).astype(np.int64)
+        return np.clip(c, 0, self.shape - 1)
+
+    def locate(self, points, *, tol: float = 1e-10, chunk_size: int = 1 << 16):
+        '''
+        Element and barycentric coordinates of every point.
+
+        points : (npts,2)
+        tol    : points whose smallest barycentric coordinate is >= -tol count as inside, so
+            points on edges and vertices are found; among several candidates the element
+            that contains the point most deeply wins
+        Returns (elem (npts,) with -1 for points outside the mesh, bary (npts,3)).
+        '''
+        pts = np.asarray(points, dtype=float).reshape(-1, 2)
+        elem = np.full(pts.shape[0], -1, dtype=np.int64)
+        bary = np.zeros((pts.shape[0], 3))
+        for start in range(0, pts.shape[0], chunk_size):
+            sl = slice(start, start + chunk_size)
+            elem[sl], bary[sl] = self._locate_chunk(pts[sl], tol)
+        return elem, bary
+
+    def _locate_chunk(self, pts: np.ndarray, tol: float):
+        _, dLdx = self.mesh.geometry()
+        c = self._cell_coords(pts)
+        cell = c[:, 1] * self.shape[0] + c[:, 0]
+        counts = self.cell_ptr[cell + 1] - self.cell_ptr[cell]
+        pid = np.repeat(np.arange(pts.shape[0]), counts)
+        first = np.cumsum(counts) - counts
+        cand = self.cell_elems[np.repeat(self.cell_ptr[cell], counts) + np.arange(pid.size) - np.repeat(first, counts)]
+        # L_a(p) = grad(L_a) . (p - x_{a+1}), exact zero on the opposite edge
+        nxt = self.mesh.X[self.mesh.T[cand][:, [1, 2, 0]]].astype(float, copy=False)
+        L = np.einsum("kad,kad->ka", dLdx[cand], pts[pid][:, None, :] - nxt)
+        score = L.min(axis=1)
+        order = np.lexsort((-score, pid))           # best candidate first within each point
+        best = order[first[counts > 0]]
+        elem = np.full(pts.shape[0], -1, dtype=np.int64)
+        bary = np.zeros((pts.shape[0], 3))
+        inside = score[best] >= -tol
+        hit = pid[best[inside]]
+        elem[hit] = cand[best[inside]]
+        bary[hit] = L[best[inside]]
+        return elem, bary
+
+    def interpolation_matrix(self, points, *, tol: float = 1e-10) -> csr_matrix:
+        '''
+        Sparse (npts, nnode) matrix of shape function values: P @ u interpolates any nodal
+        field (or a block of fields / load cases) at the points. Rows of outside points are empty.
+        '''
+        return self._matrix(*self.locate(points, tol=tol))
+
+    def _matrix(self, elem: np.ndarray, bary: np.ndarray) -> csr_matrix:
+        found = np.flatnonzero(elem >= 0)
+        L = bary[found]
+        N = t6_shape_functions(L) if self.mesh.nen == 6 else L
+        nen = N.shape[1]
+        return csr_matrix((N.ravel(), (np.repeat(found, nen), self.mesh.T[elem[found]].ravel())),
+                          shape=(elem.size, self.mesh.nnode))
+
+    def interpolate(self, u, points, *, tol: float = 1e-10, fill: float = np.nan) -> np.ndarray:
+        '''
+        Values of a nodal field at the points: u is (nnode,), (nnode,ncomp) or an interleaved
+        (ncomp*nnode,) vector such as an elasticity solution. Returns (npts,) or (npts,ncomp);
+        points outside the mesh get `fill`.
+        '''
+        U = _nodal_field(u, self.mesh.nnode)
+        elem, bary = self.locate(points, tol=tol)
+        values = self._matrix(elem, bary) @ U
+        values[elem < 0] = fill
+        return values
+
+def _nodal_field(u, nnode: int) -> np.ndarray:
+    U = np.asarray(u, dtype=float)
+    if U.shape[0] == nnode:
+        return U
+    if U.ndim == 1 and U.size % nnode == 0:
+        return U.reshape(nnode, -1)
+    raise ValueError(f"Field with shape {U.shape} does not match {nnode} nodes.")
+
+def sample_line(locator: PointLocator | Mesh, u, start, end, num: int = 101, *, tol: float = 1e-10):
+    '''
+    Sample a nodal field at `num` equally spaced points of the segment start -> end (e.g. the
+    centerline deflection of a cantilever).
+
+    locator : a `PointLocator` (reused) or a `Mesh` (a locator is built)
+    Returns (s (num,) arc length from start, points (num,2), values (num,) or (num,ncomp));
+    points outside the mesh get NaN.
+    '''
+    if not isinstance(locator, PointLocator):
+        locator = PointLocator(locator)
+    start, end = np.asarray(start, dtype=float), np.asarray(end, dtype=float)
+    t = np.linspace(0.0, 1.0, num)
+    points = start + t[:, None] * (end - start)
+    return t * np.linalg.norm(end - start), points, locator.interpolate(u, points, tol=tol)
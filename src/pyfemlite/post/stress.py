@@ -0,0 +1,178 @@
+from __future__ import annotations
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from pyfemlite.fem.shape_t6 import T6_EDGES, t6_shape_gradients
+from pyfemlite.mesh.mesh import Mesh, as_mesh
+
+def _centroid_gradients(mesh: Mesh) -> np.ndarray:
+    '''Shape function gradients (nelem,nen,2) at the element centroids (the element mean on T6).'''
+    _, dNdx = mesh.geometry()
+    if mesh.nen == 6:
+        return t6_shape_gradients(np.full((1, 3), 1.0 / 3.0), dNdx)[:, 0]
+    return dNdx
+
+def element_gradients(X: np.ndarray | Mesh, T: np.ndarray | None, u: np.ndarray) -> np.ndarray:
+    '''
+    Gradients (nelem,2) of a nodal scalar field u (nnode,): constant on T3, the centroid value
+    (= element mean of the linear gradient) on T6.
+    '''
+    mesh = as_mesh(X, T)
+    return np.einsum("ea,ead->ed", np.asarray(u, dtype=float)[mesh.T], _centroid_gradients(mesh))
+
+def element_strains(X: np.ndarray | Mesh, T: np.ndarray | None, u: np.ndarray) -> np.ndarray:
+    '''
+    Strains of every element from the interleaved displacement vector u (2*nnode,): constant
+    on T3, the centroid value on T6.
+
+    Uses the cached mesh gradients. Returns (nelem,3) with (exx, eyy, gxy), gxy the engineering
+    shear strain (same ordering as `elasticity_B_matrices`).
+    '''
+    mesh = as_mesh(X, T)
+    U = np.asarray(u, dtype=float).reshape(-1, 2)[mesh.T]            # (nelem,nen,2)
+    G = np.einsum("eac,ead->ecd", U, _centroid_gradients(mesh))      # du_c/dx_d
+    return np.column_stack([G[:, 0, 0], G[:, 1, 1], G[:, 0, 1] + G[:, 1, 0]])
+
+def element_stresses(strain: np.ndarray, D: np.ndarray) -> np.ndarray:
+    '''Stresses (sxx, syy, sxy) from strains; D is (3,3) or per element (nelem,3,3).'''
+    D = np.asarray(D, dtype=float)
+    if D.ndim == 2:
+        return strain @ D.T
+    return np.einsum("eij,ej->ei", D, strain)
+
+def von_mises(stress: np.ndarray, szz=0.0) -> np.ndarray:
+    '''
+    Von Mises equivalent stress of (sxx, syy, sxy) rows (any leading shape).
+
+    szz : out-of-plane normal stress (0 for plane stress; nu*(sxx+syy) for plane strain).
+    '''
+    s = np.asarray(stress, dtype=float)
+    sx, sy, txy = s[..., 0], s[..., 1], s[..., 2]
+    szz = np.asarray(szz, dtype=float)
+    return np.sqrt(0.5 * ((sx - sy) ** 2 + (sy - szz) ** 2 + (szz - sx) ** 2) + 3.0 * txy ** 2)
+
+def nodal_average_operator(X: np.ndarray | Mesh, T: np.ndarray | None = None) -> csr_matrix:
+    '''
+    Sparse (nnode,nelem) operator of area-weighted averaging: (M @ v)[n] is the mean of the
+    element values v over the elements around node n (corner or T6 mid-edge), weighted by
+    element area.
+    '''
+    mesh = as_mesh(X, T)
+    A, _ = mesh.geometry()
+    rows = mesh.T.ravel()
+    cols = np.repeat(np.arange(mesh.nelem), mesh.nen)
+    w = A[cols]
+    w = w / np.bincount(rows, weights=w, minlength=mesh.nnode)[rows]
+    return csr_matrix((w, (rows, cols)), shape=(mesh.nnode, mesh.nelem))
+
+def nodal_average(X: np.ndarray | Mesh, T: np.ndarray | None, values: np.ndarray) -> np.ndarray:
+    '''Area-weighted nodal average of element values (nelem,) or (nelem,k).'''
+    return nodal_average_operator(X, T) @ np.asarray(values, dtype=float)
+
+def spr_recovery(X: np.ndarray | Mesh, T: np.ndarray | None, values: np.ndarray) -> np.ndarray:
+    '''
+    Superconvergent patch recovery (Zienkiewicz-Zhu) of element values (nelem,) or (nelem,k).
+
+    For every interior node a linear polynomial is least-squares fitted to the element values
+    sampled at the centroids of its element patch and evaluated at the node. Boundary nodes
+    take the mean of the fits of the interior patches they belong to (or of the nearest one);
+    meshes without any valid patch fall back to `nodal_average`. All patches are fitted at
+    once (batched 3x3 normal equations). On T6 meshes the patches are formed at the corner
+    nodes and mid-edge nodes take the mean of their two edge ends. Returns (nnode,) or
+    (nnode,k) nodal values.
+    '''
+    mesh = as_mesh(X, T)
+    v = np.asarray(values, dtype=float)
+    squeeze = v.ndim == 1
+    v = v.reshape(mesh.nelem, -1)
+    A, _ = mesh.geometry()
+    Xn, T3 = mesh.X, mesh.T[:, :3]
+    centroids = Xn[T3].mean(axis=1)
+
+    indptr, elems = mesh.node_elem
+    node = np.repeat(np.arange(mesh.nnode), np.diff(indptr))
+    h = np.sqrt(np.bincount(node, weights=A[elems], minlength=mesh.nnode) / np.maximum(np.diff(indptr), 1))
+    P = np.ones((node.size, 3))
+    P[:, 1:] = (centroids[elems] - Xn[node]) / h[node, None]
+    M = np.zeros((mesh.nnode, 3, 3))
+    np.add.at(M, node, P[:, :, None] * P[:, None, :])
+    rhs = np.zeros((mesh.nnode, 3, v.shape[1]))
+    np.add.at(rhs, node, P[:, :, None] * v[elems][:, None, :])
+
+    interior = np.ones(mesh.nnode, dtype=bool)
+    interior[mesh.boundary_edges.ravel()] = False
+    ok = interior & (np.diff(indptr) >= 3)
+    ok[ok] = np.abs(np.linalg.det(M[ok])) > 1e-8
+    coef = np.zeros_like(rhs)
+    coef[ok] = np.linalg.solve(M[ok], rhs[ok])
+
+    out = np.zeros((mesh.nnode, v.shape[1]))
+    out[ok] = coef[ok, 0]
+    # boundary nodes: mean of the fits of the interior patches (node p) whose elements touch them
+    p_of = node[ok[node]]
+    e_of = elems[ok[node]]
+    pairs = np.unique(np.column_stack([np.repeat(p_of, 3), T3[e_of].ravel()]), axis=0)
+    pairs = pairs[~ok[pairs[:, 1]]]
+    mids = mesh.T[:, 3:].ravel()
+    rest = ~ok
+    rest[pairs[:, 1]] = False
+    rest[mids] = False
+    if rest.any() and ok.any():
+        # e.g. corner elements without interior nodes: fit of the nearest interior patch
+        from scipy.spatial import cKDTree
+        p_ok = np.flatnonzero(ok)
+        n_rest = np.flatnonzero(rest)
+        nearest = p_ok[cKDTree(Xn[p_ok]).query(Xn[n_rest])[1]]
+        pairs = np.concatenate([pairs, np.column_stack([nearest, n_rest])])
+        rest[:] = False
+    p, n = pairs[:, 0], pairs[:, 1]
+    xi = (Xn[n] - Xn[p]) / h[p, None]
+    est = coef[p, 0] + xi[:, 0, None] * coef[p, 1] + xi[:, 1, None] * coef[p, 2]
+    count = np.bincount(n, minlength=mesh.nnode)
+    sums = np.zeros_like(out)
+    np.add.at(sums, n, est)
+    has = count > 0
+    out[has] = sums[has] / count[has, None]
+    if rest.any():
+        out[rest] = (nodal_average_operator(mesh) @ v)[rest]
+    if mids.size:
+        ends = mesh.T[:, T6_EDGES[:, :2]].reshape(-1, 2)
+        out[mids] = 0.5 * (out[ends[:, 0]] + out[ends[:, 1]])
+    return out[:, 0] if squeeze else out
+
+def stress_fields(
+    X: np.ndarray | Mesh,
+    T: np.ndarray | None,
+    u: np.ndarray,
+    D: np.ndarray,
+    *,
+    recovery: str = "average",
+    nu: float | None = None,
+) -> tuple[dict[str, np.ndarray], dict[str, np.ndarray]]:
+    '''
+    Displacement, strain, stress and von Mises fields ready for `write_vtu`.
+
+    recovery : nodal smoothing of the element stresses, "average" (`nodal_average`) or "spr"
+        (`spr_recovery`).
+    nu : Poisson's ratio for plane strain (szz = nu*(sxx+syy) enters von Mises); None for
+        plane stress.
+
+    Returns (point_data, cell_data): point_data has "displacement", "stress" and "von_mises"
+    (recovered), cell_data has "strain", "stress" and "von_mises" per element.
+    '''
+    mesh = as_mesh(X, T)
+    strain = element_strains(mesh, None, u)
+    stress = element_stresses(strain, D)
+    if recovery == "average":
+        nodal = nodal_average(mesh, None, stress)
+    elif recovery == "spr":
+        nodal = spr_recovery(mesh, None, stress)
+    else:
+        raise ValueError(f"Unknown recovery '{recovery}'. Use 'average' or 'spr'.")
+
+    def vm(s):
+        return von_mises(s, 0.0 if nu is None else nu * (s[:, 0] + s[:, 1]))
+
+    point_data = {"displacement": np.asarray(u, dtype=float).reshape(-1, 2), "stress": nodal, "von_mises": vm(nodal)}
+    cell_data = {"strain": strain, "stress": stress, "von_mises": vm(stress)}
+    return point_data, cell_data
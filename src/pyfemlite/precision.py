@@ -0,0 +1,101 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+import numpy as np
+
+INDEX_POLICIES = ("auto", "int32", "int64")
+STORAGE_DTYPES = ("float64", "float32")
+COMPUTE_DTYPE = np.dtype(np.float64)
+
+@dataclass(frozen=True)
+class PrecisionPolicy:
+    '''
+    dtypes of the arrays pyfemlite creates and keeps.
+
+    index : connectivity, dof tables, CSR indices/indptr and assembly slot maps. "auto" uses
+        int32 whenever the largest id fits and int64 otherwise; "int32" raises if it does
+        not fit; "int64" always uses 64 bits.
+    storage : floating point dtype of stored geometry (generated node coordinates) and of
+        output fields (VTU arrays, sweep results). "float32" halves their memory.
+
+    Element kernels, assembled operators and solves always run in float64 (`COMPUTE_DTYPE`);
+    float32 inputs are promoted where they enter a computation.
+    '''
+    index: str = "auto"
+    storage: str = "float64"
+
+    def __post_init__(self):
+        if self.index not in INDEX_POLICIES:
+            raise ValueError(f"Unknown index policy '{self.index}'. Choose from {INDEX_POLICIES}.")
+        if self.storage not in STORAGE_DTYPES:
+            raise ValueError(f"Unknown storage dtype '{self.storage}'. Choose from {STORAGE_DTYPES}.")
+
+    @property
+    def storage_dtype(self) -> np.dtype:
+        return np.dtype(self.storage)
+
+    def index_dtype(self, max_value: int) -> np.dtype:
+        '''Index dtype able to hold ids 0..max_value under this policy.'''
+        fits32 = int(max_value) <= np.iinfo(np.int32).max
+        if self.index == "int64" or (self.index == "auto" and not fits32):
+            return np.dtype(np.int64)
+        if not fits32:
+            raise ValueError(f"Index {max_value} does not fit in int32 (index policy 'int32').")
+        return np.dtype(np.int32)
+
+_POLICY: ContextVar[PrecisionPolicy] = ContextVar("pyfemlite_precision", default=PrecisionPolicy())
+
+def get_policy() -> PrecisionPolicy:
+    return _POLICY.get()
+
+def set_policy(*, index: str | None = None, storage: str | None = None) -> PrecisionPolicy:
+    '''Change the policy for the current context; returns the previous one.'''
+    old = _POLICY.get()
+    _POLICY.set(PrecisionPolicy(index=old.index if index is None else index,
+                                storage=old.storage if storage is None else storage))
+    return old
+
+@contextmanager
+def use_precision(*, index: str | None = None, storage: str | None = None):
+    '''
+    Temporarily change the policy:
+
+        with pyfemlite.use_precision(storage="float32"):
+            X, T, boundary = structured_rectangle_tri(2000, 1000)
+    '''
+    old = _POLICY.get()
+    token = _POLICY.set(PrecisionPolicy(index=old.index if index is None else index,
+                                        storage=old.storage if storage is None else storage))
+    try:
+        yield _POLICY.get()
+    finally:
+        _POLICY.reset(token)
+
+def index_dtype(max_value: int, dtype=None) -> np.dtype:
+    '''
+    Index dtype for ids 0..max_value: `dtype` if given (checked to fit), else the policy's.
+    '''
+    if dtype is None:
+        return _POLICY.get().index_dtype(max_value)
+    dtype = np.dtype(dtype)
+    if not np.issubdtype(dtype, np.integer):
+        raise ValueError(f"Index dtype must be an integer type, got {dtype}.")
+    if int(max_value) > np.iinfo(dtype).max:
+        raise ValueError(f"Index {max_value} does not fit in {dtype}.")
+    return dtype
+
+def storage_dtype(dtype=None) -> np.dtype:
+    '''Floating point storage dtype: `dtype` if given, else the policy's.'''
+    return _POLICY.get().storage_dtype if dtype is None else np.dtype(dtype)
+
+def as_storage(a, dtype=None) -> np.ndarray:
+    '''
+    Floating point arrays in the storage dtype when it is narrower than theirs (float64 data
+    under a float32 policy); integer and already narrow arrays are returned unchanged.
+    '''
+    a = np.asarray(a)
+    target = storage_dtype(dtype)
+    if np.issubdtype(a.dtype, np.floating) and a.dtype.itemsize > target.itemsize:
+        return a.astype(target)
+    return a
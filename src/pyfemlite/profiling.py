@@ -0,0 +1,213 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+_ACTIVE: ContextVar[Profiler | None] = ContextVar("pyfemlite_profiler", default=None)
+
+@dataclass(frozen=True)
+class StageRecord:
+    '''
+    One timed stage: start/duration in seconds (start relative to the profile start), nesting
+    depth, counters set by the stage (nnz, factor_nnz, iterations, ...), and with memory
+    tracing the peak traced allocation above the stage's starting level.
+    '''
+    name: str
+    start: float
+    duration: float
+    depth: int
+    thread: int
+    counters: dict = field(default_factory=dict)
+    peak_bytes: int | None = None
+
+@dataclass(frozen=True)
+class ProfileReport:
+    '''Stage records of a `profile` block, in completion order (children before their parent).'''
+    records: list[StageRecord]
+    total: float
+
+    def totals(self) -> dict[str, float]:
+        '''Summed duration per stage name.'''
+        out: dict[str, float] = {}
+        for r in self.records:
+            out[r.name] = out.get(r.name, 0.0) + r.duration
+        return out
+
+    def find(self, name: str) -> list[StageRecord]:
+        return [r for r in self.records if r.name == name]
+
+    def summary(self) -> str:
+        '''Table of the stages in start order, indented by nesting depth.'''
+        lines = [f"{'stage':32s} {'time [ms]':>11s} {'share':>6s}  counters"]
+        for r in sorted(self.records, key=lambda r: (r.start, r.depth)):
+            share = r.duration / self.total if self.total > 0 else 0.0
+            counters = dict(r.counters)
+            if r.peak_bytes is not None:
+                counters["peak_MiB"] = round(r.peak_bytes / 2**20, 2)
+            extra = " ".join(f"{k}={v}" for k, v in counters.items())
+            lines.append(f"{'  ' * r.depth + r.name:32s} {r.duration * 1e3:11.3f} {share:6.1%}  {extra}")
+        lines.append(f"{'total':32s} {self.total * 1e3:11.3f}")
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict:
+        return {"total": self.total, "records": [asdict(r) for r in self.records]}
+
+    def to_json(self, path: str | os.PathLike | None = None) -> str:
+        '''JSON text of `to_dict`; also written to `path` if given.'''
+        text = json.dumps(self.to_dict(), indent=1, default=_jsonable)
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write(text)
+        return text
+
+    def to_chrome_trace(self, path: str | os.PathLike | None = None) -> dict:
+        '''
+        Trace Event Format dict (complete "X" events in microseconds) for chrome://tracing or
+        Perfetto; also written to `path` if given.
+        '''
+        pid = os.getpid()
+        events = []
+        for r in self.records:
+            args = dict(r.counters)
+            if r.peak_bytes is not None:
+                args["peak_bytes"] = r.peak_bytes
+            events.append({"name": r.name, "cat": "pyfemlite", "ph": "X", "ts": r.start * 1e6,
+                           "dur": r.duration * 1e6, "pid": pid, "tid": r.thread, "args": args})
+        trace = {"traceEvents": events, "displayTimeUnit": "ms"}
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as fh:
+                json.dump(trace, fh, default=_jsonable)
+        return trace
+
+class Profiler:
+    '''Collects `StageRecord`s while active; created by `profile`.'''
+
+    def __init__(self, *, memory: bool = False):
+        self.memory = memory
+        self.records: list[StageRecord] = []
+        self._t0 = time.perf_counter()
+        self._t1: float | None = None
+        self._lock = threading.Lock()
+        self._depth = threading.local()
+        self._peaks: list[list[int]] = []    # [start level, peak seen in children] per open stage
+
+    @contextmanager
+    def stage(self, name: str, **counters):
+        depth = getattr(self._depth, "value", 0)
+        self._depth.value = depth + 1
+        counters = dict(counters)
+        frame = None
+        if self.memory:
+            frame = [tracemalloc.get_traced_memory()[0], 0]
+            self._peaks.append(frame)
+            tracemalloc.reset_peak()
+        t0 = time.perf_counter()
+        try:
+            yield counters
+        finally:
+            t1 = time.perf_counter()
+            self._depth.value = depth
+            peak = None
+            if frame is not None:
+                self._peaks.pop()
+                peak = max(frame[1], tracemalloc.get_traced_memory()[1]) - frame[0]
+                if self._peaks:
+                    parent = self._peaks[-1]
+                    parent[1] = max(parent[1], peak + frame[0])
+            record = StageRecord(name=name, start=t0 - self._t0, duration=t1 - t0, depth=depth,
+                                 thread=threading.get_ident(), counters=counters,
+                                 peak_bytes=None if peak is None else max(int(peak), 0))
+            with self._lock:
+                self.records.append(record)
+
+    def report(self) -> ProfileReport:
+        with self._lock:
+            end = time.perf_counter() if self._t1 is None else self._t1
+            return ProfileReport(records=list(self.records), total=end - self._t0)
+
+@contextmanager
+def profile(*, memory: bool = False):
+    '''
+    Record the stages of every pyfemlite call inside the block:
+
+        with pyfemlite.profile() as prof:
+            u = solve_elasticity_t3(...)
+        print(prof.report().summary())
+
+    Timing costs a few microseconds per stage. memory=True also records per-stage peak
+    allocations via tracemalloc, which slows Python-heavy code noticeably.
+    '''
+    prof = Profiler(memory=memory)
+    started = memory and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    token = _ACTIVE.set(prof)
+    try:
+        yield prof
+    finally:
+        prof._t1 = time.perf_counter()
+        _ACTIVE.reset(token)
+        if started:
+            tracemalloc.stop()
+
+@contextmanager
+def stage(name: str, **counters):
+    '''
+    Time a block as stage `name` of the active profile; yields a dict for counters set inside
+    the block (a throwaway dict when no profile is active).
+    '''
+    prof = _ACTIVE.get()
+    if prof is None:
+        yield counters
+        return
+    with prof.stage(name, **counters) as c:
+        yield c
+
+def is_profiling() -> bool:
+    return _ACTIVE.get() is not None
+
+def profiled(name: str):
+    '''
+    Decorator for solvers with a `profile` keyword: the call runs as stage `name`, and with
+    profile=True a `ProfileReport` of the call is appended to the result, u -> (u, report)
+    and (u, info) -> (u, info, report). Inside an active `profile` block the stages are
+    recorded there as well (the report holds the records of this call only); otherwise the
+    call runs in its own `profile` block.
+    '''
+    def wrap(func):
+        @functools.wraps(func)
+        def inner(*args, **kwargs):
+            if not kwargs.get("profile"):
+                with stage(name):
+                    return func(*args, **kwargs)
+            prof = _ACTIVE.get()
+            if prof is None:
+                with profile() as prof:
+                    with stage(name):
+                        result = func(*args, **kwargs)
+                report = prof.report()
+            else:
+                with prof._lock:
+                    first = len(prof.records)
+                t0 = time.perf_counter()
+                with stage(name):
+                    result = func(*args, **kwargs)
+                total = time.perf_counter() - t0
+                with prof._lock:
+                    report = ProfileReport(records=prof.records[first:], total=total)
+            return (*result, report) if isinstance(result, tuple) else (result, report)
+        return inner
+    return wrap
+
+def _jsonable(obj):
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if hasattr(obj, "item"):
+        return obj.item()
+    return str(obj)
@@ -0,0 +1,3 @@
+from .affine import AffineSystem
+from .pod import pod_basis
+from .model import ReducedModel, pod_reduced_model, greedy_reduced_model
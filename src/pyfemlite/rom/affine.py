@@ -0,0 +1,192 @@
+from __future__ import annotations
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from pyfemlite.fem.bc import DirichletPartition, merge_dirichlet
+from pyfemlite.fem.flux import add_poisson_neumann_rhs
+from pyfemlite.fem.linear_system import LinearSystem
+from pyfemlite.fem.loads import element_load_vectors, nodal_values
+from pyfemlite.fem.poisson2d import poisson_element_stiffness, poisson_element_stiffness_t6
+from pyfemlite.fem.sweep import ElasticitySweep
+from pyfemlite.mesh.boundary import Boundary
+from pyfemlite.mesh.mesh import Mesh, as_mesh
+
+class AffineSystem:
+    '''
+    Free-dof system K(c) u_f = f(c, theta) that is affine in Q operator coefficients c and
+    J load weights theta:
+
+        K(c)        = sum_q c_q K_q
+        f(c, theta) = sum_j theta_j (F_j[free] - sum_q c_q K_fd,q V_j)
+
+    where load case j has the force vector F_j and the Dirichlet values V_j; the full
+    solution carries the Dirichlet values sum_j theta_j V_j (`expand`). The terms K_q share
+    one CSR pattern and are stored as stacked data arrays, like `ElasticitySweep`.
+
+    Build with `from_elasticity` (c = `ElasticitySweep.coefficients(D)`, Q = 6) or
+    `from_poisson` (c = conductivity of each element region).
+    '''
+
+    def __init__(self, partition: DirichletPartition, ff: np.ndarray, ff_pattern, fd: np.ndarray, fd_pattern,
+                 F: np.ndarray, V: np.ndarray):
+        self.partition = partition
+        self._ff, self._ff_pattern = np.atleast_2d(ff), ff_pattern
+        self._fd, self._fd_pattern = np.atleast_2d(fd), fd_pattern
+        self.F = np.asarray(F, dtype=float).reshape(partition.n_dof, -1)
+        self.V = np.asarray(V, dtype=float).reshape(partition.dofs.size, -1)
+        if self.F.shape[1] != self.V.shape[1]:
+            raise ValueError("F and V must have one column per load case.")
+
+    @classmethod
+    def from_elasticity(cls, sweep: ElasticitySweep, load_cases, **load_kw) -> AffineSystem:
+        '''Elasticity system of an `ElasticitySweep` (mesh, Dirichlet groups) and its load cases.'''
+        F, V = sweep.load_vectors(load_cases, **load_kw)
+        return cls(sweep.partition, *sweep.reduced_terms(), F, V)
+
+    @classmethod
+    def from_poisson(
+        cls,
+        X: np.ndarray | Mesh,
+        T: np.ndarray | None = None,
+        *,
+        load_cases,
+        regions=None,
+        boundary: Boundary | None = None,
+        dirichlet: dict[str, callable] | None = None,
+        volume_quadrature: int | None = None,
+        edge_quadrature: int = 2,
+    ) -> AffineSystem:
+        '''
+        Poisson system with a piecewise constant conductivity c_q on element regions.
+
+        regions   : list of element id arrays (the conductivity terms, in order); None is one
+            region holding every element
+        dirichlet : group -> callable fixing the dof set and default values
+        load_cases: dicts with optional "source" (f(x,y)), "neumann" (group -> g(x,y)) and
+            "dirichlet" (values on the same groups), or (nnode,) force vectors
+        '''
+        mesh = as_mesh(X, T)
+        X, T = mesh.X, mesh.T
+        dirichlet = dict(dirichlet or {})
+        if dirichlet and boundary is None:
+            raise ValueError("dirichlet groups need a boundary.")
+        regions = [np.arange(mesh.nelem)] if regions is None else [np.asarray(r, dtype=np.int64) for r in regions]
+
+        def dirichlet_values(groups):
+            nodes = [np.asarray(boundary.nodes[g], dtype=int) for g in groups]
+            return merge_dirichlet(nodes, [nodal_values(X, n, fn) for n, fn in zip(nodes, groups.values())])
+
+        dofs, default_values = dirichlet_values(dirichlet)
+        partition = DirichletPartition.from_dofs(mesh.nnode, dofs)
+        plan = mesh.assembly_plan(1)
+        A, dNdx = mesh.geometry()
+        stiffness = poisson_element_stiffness_t6 if mesh.nen == 6 else poisson_element_stiffness
+        ff, fd = [], []
+        for region in regions:
+            indicator = np.zeros(mesh.nelem)
+            indicator[region] = 1.0
+            K_ff, K_fd = partition.reduce_matrix(plan.assemble(stiffness(A, dNdx, indicator)))
+            ff.append(K_ff.data)
+            fd.append(K_fd.data)
+
+        F = np.zeros((mesh.nnode, len(load_cases)))
+        V = np.empty((dofs.size, len(load_cases)))
+        for k, case in enumerate(load_cases):
+            V[:, k] = default_values
+            if not isinstance(case, dict):
+                F[:, k] = np.asarray(case, dtype=float)
+                continue
+            unknown = set(case) - {"source", "neumann", "dirichlet"}
+            if unknown:
+                raise ValueError(f"Unknown load case keys {sorted(unknown)}.")
+            if case.get("source") is not None:
+                F[:, k] += plan.assemble_vector(element_load_vectors(X, T, A, case["source"], ncomp=1,
+                                                                     quadrature=volume_quadrature))
+            for grp, g in (case.get("neumann") or {}).items():
+                add_poisson_neumann_rhs(F[:, k], X, boundary.edges[grp], g, order=edge_quadrature)
+            if case.get("dirichlet"):
+                if set(case["dirichlet"]) != set(dirichlet):
+                    raise ValueError("A load case must prescribe Dirichlet values on the system's groups.")
+                V[:, k] = dirichlet_values(case["dirichlet"])[1]
+        return cls(partition, np.stack(ff), (K_ff.indices, K_ff.indptr, K_ff.shape),
+                   np.stack(fd), (K_fd.indices, K_fd.indptr, K_fd.shape), F, V)
+
+    @property
+    def n_terms(self) -> int:
+        '''Number Q of operator coefficients.'''
+        return self._ff.shape[0]
+
+    @property
+    def n_loads(self) -> int:
+        '''Number J of load weights.'''
+        return self.F.shape[1]
+
+    @property
+    def n_free(self) -> int:
+        return int(self.partition.free.size)
+
+    def operator_term(self, q: int) -> csr_matrix:
+        indices, indptr, shape = self._ff_pattern
+        return csr_matrix((self._ff[q], indices, indptr), shape=shape)
+
+    def operator(self, c) -> csr_matrix:
+        '''K(c) on the free dofs.'''
+        indices, indptr, shape = self._ff_pattern
+        return csr_matrix((self._coefficients(c) @ self._ff, indices, indptr), shape=shape)
+
+    def rhs_terms(self) -> np.ndarray:
+        '''
+        Dense (n_free, J*(1+Q)) right-hand side terms: F_j[free] for every j, then
+        -K_fd,q V_j for q = 0..Q-1 (each over j); weighted by `rhs_weights`.
+        '''
+        indices, indptr, shape = self._fd_pattern
+        cols = [self.F[self.partition.free]]
+        for q in range(self.n_terms):
+            cols.append(-(csr_matrix((self._fd[q], indices, indptr), shape=shape) @ self.V))
+        return np.hstack(cols)
+
+    def rhs_weights(self, c, theta) -> np.ndarray:
+        '''Weights (J*(1+Q),) of `rhs_terms` for coefficients c and load weights theta.'''
+        c, theta = self._coefficients(c), self._weights(theta)
+        return np.concatenate([theta, np.outer(c, theta).ravel()])
+
+    def rhs(self, c, theta) -> np.ndarray:
+        return self.rhs_terms() @ self.rhs_weights(c, theta)
+
+    def solve(self, c, theta) -> np.ndarray:
+        '''Full-order solution of the free dofs for one parameter (a factorization per call).'''
+        return LinearSystem(self.operator(c)).solve(self.rhs(c, theta))
+
+    def snapshots(self, C, Theta) -> np.ndarray:
+        '''
+        Free-dof solutions (n_free, m) for the parameter pairs C (m,Q), Theta (m,J); every
+        distinct c is factorized once and all its load weights are solved as one block.
+        '''
+        C = np.atleast_2d(np.asarray(C, dtype=float))
+        Theta = np.atleast_2d(np.asarray(Theta, dtype=float))
+        if C.shape[0] != Theta.shape[0]:
+            raise ValueError("C and Theta need the same number of rows.")
+        terms = self.rhs_terms()
+        S = np.empty((self.n_free, C.shape[0]))
+        unique, inverse = np.unique(C, axis=0, return_inverse=True)
+        for k, c in enumerate(unique):
+            idx = np.flatnonzero(inverse.ravel() == k)
+            W = np.stack([self.rhs_weights(c, Theta[i]) for i in idx], axis=1)
+            S[:, idx] = LinearSystem(self.operator(c)).solve(terms @ W)
+        return S
+
+    def expand(self, u_free: np.ndarray, theta) -> np.ndarray:
+        '''Full solution (n_dof,) from free-dof values and the Dirichlet values of theta.'''
+        return self.partition.expand(u_free, self.V @ self._weights(theta))
+
+    def _coefficients(self, c) -> np.ndarray:
+        c = np.asarray(c, dtype=float).ravel()
+        if c.size != self.n_terms:
+            raise ValueError(f"Expected {self.n_terms} operator coefficients, got {c.size}.")
+        return c
+
+    def _weights(self, theta) -> np.ndarray:
+        theta = np.asarray(theta, dtype=float).ravel()
+        if theta.size != self.n_loads:
+            raise ValueError(f"Expected {self.n_loads} load weights, got {theta.size}.")
+        return theta
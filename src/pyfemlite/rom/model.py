@@ -0,0 +1,189 @@
+from __future__ import annotations
+from dataclasses import dataclass, fields
+import os
+import numpy as np
+from scipy.linalg import lapack
+
+from pyfemlite.fem.linear_system import LinearSystem
+from pyfemlite.io.meshfile import load_arrays, save_arrays
+from .affine import AffineSystem
+from .pod import pod_basis
+
+@dataclass(frozen=True)
+class ReducedModel:
+    '''
+    Galerkin projection of an `AffineSystem` onto a basis of free-dof vectors.
+
+    Offline (`build`), every affine term is projected: K_r[q] = W^T K_q W, f_r = W^T [rhs
+    terms], and the Gram matrix of all residual terms in the dual norm of a reference
+    operator K(c_ref) is stored. Online, a query assembles and solves one dense r x r system,
+    so its cost does not depend on the mesh (microseconds for r of a few tens).
+
+    The error indicator is the relative residual ||f - K W a||_{K_ref^-1} / ||f||_{K_ref^-1}:
+    the exact relative energy-norm error at c_ref, and within the ratio of the stability
+    constants of K(c) and K(c_ref) of it elsewhere. Evaluated from the Gram matrix, it cannot
+    resolve values below about 1e-7 (cancellation).
+    '''
+    basis: np.ndarray            # (n_free, r) free-dof basis W
+    K_r: np.ndarray              # (Q, r, r) projected operator terms
+    f_r: np.ndarray              # (J*(1+Q), r) projected right-hand side terms
+    gram: np.ndarray             # (J*(1+Q) + Q*r,)*2 residual term Gram matrix
+    free: np.ndarray             # free dof ids
+    dirichlet_dofs: np.ndarray   # constrained dof ids
+    V: np.ndarray                # (ndir, J) Dirichlet values of the load cases
+    outputs_r: np.ndarray        # (nout, r) output functionals on the basis
+    outputs_d: np.ndarray        # (nout, J) output functionals of the Dirichlet values
+    c_ref: np.ndarray            # (Q,) reference coefficients of the error indicator norm
+
+    @classmethod
+    def build(cls, system: AffineSystem, basis: np.ndarray, *, c_ref, outputs=None,
+              reference: LinearSystem | None = None) -> ReducedModel:
+        '''
+        Project `system` onto basis (n_free, r).
+
+        c_ref     : operator coefficients of the reference norm (e.g. a nominal material)
+        outputs   : optional (nout, n_dof) matrix of output functionals (dense or sparse,
+            e.g. a tip displacement selector or a `PointLocator.interpolation_matrix`)
+        reference : factorized K(c_ref), to reuse across builds
+        '''
+        W = np.asarray(basis, dtype=float)
+        if W.ndim != 2 or W.shape[0] != system.n_free:
+            raise ValueError(f"basis must have shape ({system.n_free}, r).")
+        c_ref = np.asarray(c_ref, dtype=float).ravel()
+        terms = system.rhs_terms()
+        KW = [system.operator_term(q) @ W for q in range(system.n_terms)]
+        R = np.hstack([terms] + KW)
+        if reference is None:
+            reference = LinearSystem(system.operator(c_ref))
+        gram = R.T @ reference.solve(R)
+        P = system.partition
+        if outputs is None:
+            L_free, L_dir = np.zeros((0, P.free.size)), np.zeros((0, P.dofs.size))
+        else:
+            L = outputs.tocsc() if hasattr(outputs, "tocsc") else np.atleast_2d(np.asarray(outputs, dtype=float))
+            if L.shape[1] != P.n_dof:
+                raise ValueError(f"outputs must have {P.n_dof} columns.")
+            L_free, L_dir = L[:, P.free], L[:, P.dofs]
+        return cls(
+            basis=W,
+            K_r=np.stack([W.T @ k for k in KW]),
+            f_r=(W.T @ terms).T.copy(),
+            gram=0.5 * (gram + gram.T),
+            free=P.free, dirichlet_dofs=P.dofs, V=system.V,
+            outputs_r=np.asarray(L_free @ W), outputs_d=np.asarray(L_dir @ system.V),
+            c_ref=c_ref,
+        )
+
+    @property
+    def rank(self) -> int:
+        return self.basis.shape[1]
+
+    @property
+    def n_dof(self) -> int:
+        return int(self.free.size + self.dirichlet_dofs.size)
+
+    def solve_reduced(self, c, theta) -> np.ndarray:
+        '''Reduced coefficients a (r,) for coefficients c (Q,) and load weights theta (J,).'''
+        c = np.asarray(c, dtype=float)
+        theta = np.asarray(theta, dtype=float)
+        Q, r = self.K_r.shape[0], self.K_r.shape[1]
+        K = (c @ self.K_r.reshape(Q, r * r)).reshape(r, r)
+        f = np.concatenate((theta, np.outer(c, theta).ravel())) @ self.f_r
+        _, a, info = lapack.dposv(K, f)
+        if info != 0:
+            raise ValueError(f"Reduced operator is not positive definite for c={c.tolist()}.")
+        return a
+
+    def solve(self, c, theta) -> np.ndarray:
+        '''Full-length approximate solution (n_dof,) of the query.'''
+        theta = np.asarray(theta, dtype=float)
+        u = np.empty(self.n_dof)
+        u[self.dirichlet_dofs] = self.V @ theta
+        u[self.free] = self.basis @ self.solve_reduced(c, theta)
+        return u
+
+    def output(self, c, theta, a: np.ndarray | None = None) -> np.ndarray:
+        '''Output functionals (nout,) of the query without expanding the solution.'''
+        a = self.solve_reduced(c, theta) if a is None else a
+        return self.outputs_r @ a + self.outputs_d @ np.asarray(theta, dtype=float)
+
+    def error_indicator(self, c, theta, a: np.ndarray | None = None) -> float:
+        '''Relative residual dual norm of the query (see the class docstring).'''
+        c = np.asarray(c, dtype=float)
+        theta = np.asarray(theta, dtype=float)
+        a = self.solve_reduced(c, theta) if a is None else a
+        w = np.concatenate((theta, np.outer(c, theta).ravel()))
+        z = np.concatenate((w, -np.outer(c, a).ravel()))
+        nw = w.size
+        rhs2 = w @ self.gram[:nw, :nw] @ w
+        if rhs2 <= 0.0:
+            return 0.0
+        return float(np.sqrt(max(z @ self.gram @ z, 0.0) / rhs2))
+
+    def save(self, filename: str | os.PathLike) -> None:
+        '''Write every array of the model to an .npz (`pyfemlite.io.meshfile.save_arrays`).'''
+        save_arrays(filename, {f.name: getattr(self, f.name) for f in fields(self)})
+
+    @classmethod
+    def load(cls, filename: str | os.PathLike) -> ReducedModel:
+        arrays = load_arrays(filename, mmap=False)
+        missing = [f.name for f in fields(cls) if f.name not in arrays]
+        if missing:
+            raise ValueError(f"{os.fspath(filename)} is not a reduced model (missing {missing}).")
+        return cls(**{f.name: arrays[f.name] for f in fields(cls)})
+
+def pod_reduced_model(system: AffineSystem, C, Theta, *, c_ref, tol: float = 1e-6,
+                      max_rank: int | None = None, outputs=None) -> ReducedModel:
+    '''
+    Snapshots at the parameter pairs (C (m,Q), Theta (m,J)), POD in the K(c_ref) inner
+    product (`pod_basis`), and projection (`ReducedModel.build`).
+    '''
+    reference = LinearSystem(system.operator(c_ref))
+    S = system.snapshots(C, Theta)
+    basis, _ = pod_basis(S, tol=tol, max_rank=max_rank, inner=system.operator(c_ref))
+    return ReducedModel.build(system, basis, c_ref=c_ref, outputs=outputs, reference=reference)
+
+def greedy_reduced_model(system: AffineSystem, C_train, *, c_ref, tol: float = 1e-4,
+                         max_rank: int | None = None, outputs=None):
+    '''
+    Weak greedy basis over training coefficients C_train (m,Q).
+
+    Starts from C_train[0]; each step evaluates the error indicator online for every training
+    coefficient and unit load case, and adds the full solutions of all J unit load cases at
+    the worst coefficient (one factorization; the model is then exact there for any load
+    weights). Stops when the largest indicator is <= tol, at max_rank, or when the worst
+    coefficient was already added.
+
+    Returns (model, history) with one dict per step: rank, max_indicator, index.
+    '''
+    C_train = np.atleast_2d(np.asarray(C_train, dtype=float))
+    J = system.n_loads
+    units = np.eye(J)
+    reference = LinearSystem(system.operator(c_ref))
+    max_rank = system.n_free if max_rank is None else int(max_rank)
+    basis = np.zeros((system.n_free, 0))
+    picked, history = [], []
+    index = 0
+    while True:
+        new = system.snapshots(np.repeat(C_train[index][None], J, axis=0), units)
+        basis = _extend_orthonormal(basis, new, max_rank)
+        picked.append(index)
+        model = ReducedModel.build(system, basis, c_ref=c_ref, outputs=outputs, reference=reference)
+        eta = np.array([[model.error_indicator(c, e) for e in units] for c in C_train]).max(axis=1)
+        index = int(np.argmax(eta))
+        history.append(dict(rank=model.rank, max_indicator=float(eta[index]), index=picked[-1]))
+        if eta[index] <= tol or model.rank >= max_rank or index in picked:
+            return model, history
+
+def _extend_orthonormal(basis: np.ndarray, new: np.ndarray, max_rank: int) -> np.ndarray:
+    '''
+    Append an orthonormal basis of the part of `new` orthogonal to `basis` (twice-iterated
+    Gram-Schmidt, then the left singular vectors of the remainder above a relative
+    tolerance, so zero or repeated snapshots add nothing).
+    '''
+    scale = np.linalg.norm(new, axis=0).max()
+    for _ in range(2):
+        new = new - basis @ (basis.T @ new)
+    U, s, _ = np.linalg.svd(new, full_matrices=False)
+    keep = s > 1e-10 * max(scale, 1e-300)
+    return np.hstack([basis, U[:, keep]])[:, :max_rank]
@@ -0,0 +1,34 @@
+from __future__ import annotations
+import numpy as np
+
+def pod_basis(snapshots: np.ndarray, *, tol: float = 1e-6, max_rank: int | None = None, inner=None):
+    '''
+    Proper orthogonal decomposition of snapshot columns S (n, m).
+
+    Keeps the smallest rank r whose discarded energy sum_{i>r} s_i^2 / sum_i s_i^2 is at most
+    tol^2 (a relative projection error of about tol), capped at max_rank.
+
+    inner : optional SPD matrix M (e.g. the stiffness at a reference parameter); the basis is
+        then M-orthonormal, computed by the method of snapshots (eigenvectors of S^T M S),
+        which resolves singular values down to about sqrt(machine eps) times the largest.
+    Returns (basis (n, r), singular values s (min(n, m),)).
+    '''
+    S = np.asarray(snapshots, dtype=float)
+    if S.ndim != 2 or S.shape[1] == 0:
+        raise ValueError("snapshots must be a non-empty (n, m) array.")
+    if inner is None:
+        U, s, _ = np.linalg.svd(S, full_matrices=False)
+    else:
+        lam, psi = np.linalg.eigh(S.T @ (inner @ S))
+        lam, psi = lam[::-1], psi[:, ::-1]
+        s = np.sqrt(np.maximum(lam, 0.0))
+    energy = np.cumsum(s ** 2)
+    if energy[-1] == 0.0:
+        raise ValueError("All snapshots are zero.")
+    discarded = 1.0 - energy / energy[-1]
+    r = int(np.argmax(discarded <= tol ** 2)) + 1
+    if max_rank is not None:
+        r = min(r, int(max_rank))
+    if inner is None:
+        return U[:, :r], s
+    return S @ (psi[:, :r] / s[:r]), s
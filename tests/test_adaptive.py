@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from pyfemlite.mesh import structured_rectangle_tri, refine_newest_vertex, longest_edge_first, prolong
+from pyfemlite.mesh.boundary import mesh_edges
+from pyfemlite.mesh.quadratic import structured_rectangle_t6
+from pyfemlite.fem.shape_t3 import t3_areas_and_grads
+from pyfemlite.adapt import dorfler_mark, zz_error_estimate, poisson_residual_estimate, adaptive_poisson
+
+def test_newest_vertex_bisection_is_conforming_and_carries_boundary():
+    X, T, boundary = structured_rectangle_tri(4, 3, xlim=(0.0, 2.0))
+    T = longest_edge_first(X, T)
+    rng = np.random.default_rng(0)
+    for _ in range(5):
+        X_old = X
+        X, T, boundary, P = refine_newest_vertex(X, T, rng.random(T.shape[0]) < 0.25, boundary)
+        A, _ = t3_areas_and_grads(X, T)          # positive orientation kept
+        assert abs(A.sum() - 2.0) < 1e-12
+        boundary.validate(X, T, strict=True)      # group edges are mesh boundary edges
+        edges, _, counts = mesh_edges(T)
+        nb = sum(np.asarray(e).shape[0] for e in boundary.edges.values())
+        assert nb == int((counts == 1).sum())     # no hanging nodes: group edges cover the boundary
+        f = 3.0 * X_old[:, 0] - X_old[:, 1]
+        assert np.allclose(prolong(P, f), 3.0 * X[:, 0] - X[:, 1])
+        assert np.allclose(prolong(P, np.repeat(f, 2), 2)[::2], 3.0 * X[:, 0] - X[:, 1])
+
+def test_refining_nothing_returns_the_same_mesh():
+    X, T, boundary = structured_rectangle_tri(3, 2)
+    T = longest_edge_first(X, T)
+    X2, T2, _, P = refine_newest_vertex(X, T, [], boundary)
+    assert np.array_equal(X2, X) and np.array_equal(T2, T) and P.shape == (X.shape[0],) * 2
+
+def test_refinement_and_estimators_reject_t6_meshes():
+    X, T, boundary = structured_rectangle_t6(4, 4)
+    with pytest.raises(ValueError, match="T3"):
+        refine_newest_vertex(X, T, np.arange(4), boundary)
+    with pytest.raises(ValueError, match="T3"):
+        longest_edge_first(X, T)
+    with pytest.raises(ValueError, match="T3"):
+        poisson_residual_estimate(X, T, np.zeros(X.shape[0]), 1.0, lambda x, y: 1.0 + 0.0 * x)
+    with pytest.raises(ValueError, match="T3"):
+        adaptive_poisson(X, T, 1.0, lambda x, y: 1.0 + 0.0 * x, boundary=boundary, max_iter=2)
+
+def test_dorfler_marking_selects_bulk():
+    eta = np.array([1.0, 3.0, 2.0, 0.5])
+    assert np.array_equal(dorfler_mark(eta, 0.5), [False, True, False, False])
+    assert np.array_equal(dorfler_mark(eta, 0.9), [False, True, True, False])
+    assert dorfler_mark(eta, 1.0).all()
+
+def test_zz_estimate_vanishes_for_linear_recoverable_flux():
+    mesh, _ = structured_rectangle_tri(6, 6, as_mesh=True)
+    flux = np.tile([1.0, -2.0], (mesh.nelem, 1))
+    assert np.allclose(zz_error_estimate(mesh, None, flux), 0.0)
+
+def test_adaptive_poisson_beats_uniform_refinement():
+    a = 200.0
+    ue = lambda x, y: np.exp(-a * ((x - 0.5) ** 2 + (y - 0.5) ** 2))
+    f = lambda x, y: -ue(x, y) * (4 * a * a * ((x - 0.5) ** 2 + (y - 0.5) ** 2) - 4 * a)
+    X, T, boundary = structured_rectangle_tri(4, 4)
+    dirichlet = {g: ue for g in ("left", "right", "bottom", "top")}
+    res = adaptive_poisson(X, T, 1.0, f, boundary=boundary, dirichlet=dirichlet, max_dofs=1500, theta=0.4,
+                           solver="cg", preconditioner="amg", rtol=1e-12)
+    assert res.reason == "max_dofs" and res.history[-1]["ndof"] <= 1500
+    errors = [h["error"] for h in res.history]
+    assert errors[-1] < 0.5 * errors[0]
+    err_adapt = np.abs(res.u - ue(res.X[:, 0], res.X[:, 1])).max()
+
+    from pyfemlite.fem import solve_poisson_t3
+    n = int(np.sqrt(res.history[-1]["ndof"])) - 1
+    Xu, Tu, bu = structured_rectangle_tri(n, n)
+    uu = solve_poisson_t3(Xu, Tu, 1.0, f, boundary=bu, dirichlet=dirichlet)
+    assert err_adapt < np.abs(uu - ue(Xu[:, 0], Xu[:, 1])).max()
@@ -0,0 +1,28 @@
+import numpy as np
+from pyfemlite.mesh.structured_tri import structured_unit_square_tri
+from pyfemlite.fem.assembly import AssemblyPlan, assemble_global, element_triplets
+from pyfemlite.fem.elasticity2d import solve_elasticity_t3
+from pyfemlite.fem.materials import D_plane_stress
+
+def test_plan_matches_coo_assembly():
+    X, T, _ = structured_unit_square_tri(5, 4)
+    plan = AssemblyPlan.from_connectivity(T, 2)
+    rng = np.random.default_rng(0)
+    Ke = rng.standard_normal((T.shape[0], 6, 6))
+    K_plan = plan.assemble(Ke)
+    K_coo = assemble_global(plan.n_dof, *element_triplets(plan.edofs, Ke))
+    assert K_plan.nnz == plan.nnz
+    assert abs(K_plan - K_coo).max() < 1e-12
+
+def test_plan_reused_across_solves():
+    X, T, boundary = structured_unit_square_tri(6, 3)
+    plan = AssemblyPlan.from_connectivity(T, 2)
+    clamp = lambda x, y: (0.0, 0.0)
+    body = lambda x, y: (0.0, 0.0)
+    for E in (1.0, 2.0):
+        u_ref = solve_elasticity_t3(X, T, D_plane_stress(E, 0.3), body, boundary=boundary,
+                                    dirichlet={"left": clamp}, traction={"right": lambda x, y: (0.0, -1.0)})
+        u = solve_elasticity_t3(X, T, D_plane_stress(E, 0.3), body, boundary=boundary,
+                                dirichlet={"left": clamp}, traction={"right": lambda x, y: (0.0, -1.0)},
+                                plan=plan)
+        assert np.allclose(u, u_ref)
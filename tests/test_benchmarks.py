@@ -0,0 +1,41 @@
+import importlib.util
+import json
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+def _load_runner():
+    spec = importlib.util.spec_from_file_location("bench_run", ROOT / "benchmarks" / "run.py")
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+def test_benchmark_run_and_compare(tmp_path):
+    bench = _load_runner()
+    out = tmp_path / "base.json"
+    assert bench.main(["run", "--sizes", "200", "--repeat", "1", "-o", str(out)]) == 0
+    base = json.loads(out.read_text())
+    stages = {(r["physics"], r["stage"]) for r in base["results"]}
+    for physics in ("poisson", "elasticity"):
+        for stage in ("mesh", "boundary_validate", "assembly", "loads", "dirichlet", "solve", "vtk_output"):
+            assert (physics, stage) in stages
+    assert all(r["peak_bytes"] is not None and r["min"] > 0 for r in base["results"])
+
+    assert not any(r["regression"] for r in bench.compare_results(base, base))
+    slow = json.loads(json.dumps(base))
+    slow["results"][0]["min"] = base["results"][0]["min"] * 2 + 1.0
+    rows = bench.compare_results(base, slow, threshold=1.25)
+    assert [r["regression"] for r in rows].count(True) == 1
+    new = tmp_path / "new.json"
+    new.write_text(json.dumps(slow))
+    assert bench.main(["compare", str(out), str(new)]) == 1
+
+def test_accuracy_t6_beats_t3():
+    spec = importlib.util.spec_from_file_location("bench_accuracy", ROOT / "benchmarks" / "accuracy.py")
+    acc = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(acc)
+    ref = acc.cantilever_tip(80, 8, quadratic=True)["tip"]
+    t3 = acc.refine_to_tolerance(False, 0.05, ref, max_nx=160)
+    t6 = acc.refine_to_tolerance(True, 0.05, ref, max_nx=160)
+    assert t3[-1]["error"] <= 0.05 and t6[-1]["error"] <= 0.05
+    assert t6[-1]["ndof"] * 10 < t3[-1]["ndof"]
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from pyfemlite.mesh.structured_tri import structured_unit_square_tri
+from pyfemlite.mesh.boundary import (
+    Boundary, build_boundary_from_predicates, extract_boundary_edges, mesh_edges,
+)
+
+def test_extract_boundary_edges_structured():
+    nx, ny = 5, 3
+    X, T, boundary = structured_unit_square_tri(nx, ny)
+    bnd = extract_boundary_edges(T)
+    assert bnd.shape == (2 * (nx + ny), 2)
+    assert np.all(bnd[:, 0] < bnd[:, 1])
+    edges, elem_edge, counts = mesh_edges(T)
+    assert edges.shape[0] == (nx + 1) * ny + (ny + 1) * nx + nx * ny
+    assert elem_edge.shape == T.shape and counts.max() == 2
+
+def test_vectorized_and_scalar_predicates_agree():
+    X, T, boundary = structured_unit_square_tri(6, 4)
+    preds_vec = {"left": lambda x, y: np.isclose(x, 0.0), "top": lambda x, y: np.isclose(y, 1.0)}
+    preds_scalar = {"left": lambda x, y: abs(x) < 1e-12 and True,
+                    "top": lambda x, y: abs(y - 1.0) < 1e-12 and True}
+    b_vec = build_boundary_from_predicates(X, T, preds_vec)
+    b_sca = build_boundary_from_predicates(X, T, preds_scalar)
+    for g in ("left", "top"):
+        assert np.array_equal(b_vec.nodes[g], boundary.nodes[g])
+        assert np.array_equal(b_vec.nodes[g], b_sca.nodes[g])
+        assert np.array_equal(b_vec.edges[g], b_sca.edges[g])
+        assert b_vec.edges[g].shape == boundary.edges[g].shape
+    b_vec.validate(X, T, strict=True, boundary_edges=extract_boundary_edges(T))
+
+def test_validate_rejects_interior_edge():
+    X, T, boundary = structured_unit_square_tri(4, 4)
+    interior = np.array([[T[0, 0], T[0, 2]]])   # diagonal of the first cell
+    bad = Boundary(nodes={"d": np.unique(interior)}, edges={"d": interior})
+    with pytest.raises(ValueError, match="not on the mesh boundary"):
+        bad.validate(X, T)
@@ -7,6 +7,11 @@ def test_boundary_validate_passes_structured():
     X, T, boundary = structured_unit_square_tri(10, 6)
     boundary.validate(X, T, strict=True)
 
+def test_boundary_validate_requires_T_for_arrays():
+    X, T, boundary = structured_unit_square_tri(4, 3)
+    with pytest.raises(ValueError, match="T is required"):
+        boundary.validate(X)
+
 def test_boundary_validate_catches_out_of_range_node():
     X, T, boundary = structured_unit_square_tri(4, 3)
     bad_nodes = boundary.nodes["left"].copy()
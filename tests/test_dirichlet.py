@@ -0,0 +1,48 @@
+import numpy as np
+from scipy.sparse.linalg import spsolve
+from pyfemlite.mesh.structured_tri import structured_unit_square_tri
+from pyfemlite.fem.assembly import AssemblyPlan
+from pyfemlite.fem.shape_t3 import t3_areas_and_grads
+from pyfemlite.fem.poisson2d import poisson_element_stiffness
+from pyfemlite.fem.bc import apply_dirichlet, apply_dirichlet_symmetric, DirichletPartition
+
+def _system():
+    X, T, boundary = structured_unit_square_tri(7, 5)
+    A, dNdx = t3_areas_and_grads(X, T)
+    K = AssemblyPlan.from_connectivity(T, 1).assemble(poisson_element_stiffness(A, dNdx, 1.0))
+    f = np.linspace(0.0, 1.0, K.shape[0])
+    dofs = np.unique(np.r_[boundary.nodes["left"], boundary.nodes["top"]])
+    values = np.sin(dofs.astype(float))
+    return K, f, dofs, values
+
+def test_legacy_and_symmetric_modes_agree():
+    K, f, dofs, values = _system()
+    Kb, fb = apply_dirichlet(K, f.copy(), dict(zip(dofs.tolist(), values.tolist())))
+    u_legacy = spsolve(Kb, fb)
+    Ks, fs = apply_dirichlet_symmetric(K, f, dofs, values)
+    assert abs(Ks - Ks.T).max() == 0.0
+    assert Ks.nnz == K.nnz
+    u_sym = spsolve(Ks, fs)
+    assert np.allclose(u_sym, u_legacy)
+    assert np.allclose(u_sym[dofs], values)
+
+def test_partition_reduce_expand_multi_rhs():
+    K, f, dofs, values = _system()
+    part = DirichletPartition.from_dofs(K.shape[0], dofs[::-1])
+    assert np.array_equal(part.dofs, dofs)
+    F = np.column_stack([f, 2.0 * f])
+    K_ff, rhs = part.reduce(K, F, values)
+    assert abs(K_ff - K_ff.T).max() == 0.0
+    assert np.allclose(K_ff.toarray(), K.toarray()[np.ix_(part.free, part.free)])
+    U = part.expand(np.column_stack([spsolve(K_ff, rhs[:, 0]), spsolve(K_ff, rhs[:, 1])]), values)
+    Ks, fs = apply_dirichlet_symmetric(K, F[:, 1], dofs, values)
+    assert np.allclose(U[:, 1], spsolve(Ks, fs))
+
+def test_partition_from_unsorted_dofs_and_values():
+    K, f, dofs, values = _system()
+    perm = np.random.default_rng(2).permutation(dofs.size)
+    part, vals = DirichletPartition.from_dofs_values(K.shape[0], np.r_[dofs[perm], dofs[0]], np.r_[values[perm], 7.0])
+    assert np.array_equal(part.dofs, dofs) and np.allclose(vals, np.r_[7.0, values[1:]])
+    K_ff, rhs = part.reduce(K, f, vals)
+    u = part.expand(spsolve(K_ff, rhs), vals)
+    assert np.allclose(u[dofs[perm]], np.where(dofs[perm] == dofs[0], 7.0, values[perm]))
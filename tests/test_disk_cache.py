@@ -0,0 +1,92 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pytest
+from pyfemlite.cache import DiskCache, resolve_disk_cache
+from pyfemlite.fem.linear_system import FactorizationCache, LinearSystem, StoredFactors
+from pyfemlite.fem.poisson2d import poisson_element_stiffness, solve_poisson_t3
+from pyfemlite.mesh.mesh import Mesh
+from pyfemlite.mesh.structured_tri import structured_rectangle_tri
+
+def _put_and_read(directory, seed):
+    cache = DiskCache(directory)
+    a = np.full(50_000, 7.0)
+    for _ in range(20):
+        cache.put("shared", {"a": a, "seed": np.asarray(seed)})
+        got = cache.get("shared")
+        assert got is not None and np.array_equal(got["a"], a)
+    return True
+
+def test_entries_are_memory_mapped_and_lru_bounded(tmp_path):
+    cache = DiskCache(tmp_path / "c", max_bytes=10_000)
+    assert cache.get("a") is None and cache.misses == 1
+    cache.put("a", {"x": np.arange(500.0), "n": np.asarray(3)})
+    got = cache.get("a")
+    assert isinstance(got["x"], np.memmap) and not got["x"].flags.writeable
+    assert np.array_equal(got["x"], np.arange(500.0)) and int(got["n"]) == 3 and cache.hits == 1
+    cache.put("b", {"x": np.zeros(500)})
+    os.utime(cache._path("a"), (1, 1))
+    os.utime(cache._path("b"), (2, 2))
+    cache.get("a")                   # refreshes a, so b is now least recently used
+    cache.put("c", {"x": np.ones(500)})
+    assert cache.keys() == ["a", "c"] and cache.size_bytes() <= 10_000
+    (tmp_path / "c" / "bad.npz").write_bytes(b"partial")
+    assert cache.get("bad") is None and "bad" not in cache
+    with pytest.raises(ValueError):
+        cache.get("../escape")
+
+def test_concurrent_writers_and_readers(tmp_path):
+    with ProcessPoolExecutor(max_workers=3) as pool:
+        assert all(pool.map(_put_and_read, [tmp_path] * 3, range(3)))
+    assert DiskCache(tmp_path).keys() == ["shared"]
+    assert not [p for p in os.listdir(tmp_path) if p.endswith(".tmp")]
+
+def test_stored_factorization_solves_like_superlu(tmp_path):
+    X, T, _ = structured_rectangle_tri(12, 9)
+    mesh = Mesh(X, T)
+    K = mesh.assembly_plan(1).assemble(poisson_element_stiffness(*mesh.geometry(), 1.0))
+    system = LinearSystem(K, np.arange(13))
+    cache = DiskCache(tmp_path)
+    cache.put("lu", system.to_arrays())
+    stored = LinearSystem.from_arrays(cache.get("lu"))
+    F = np.random.default_rng(1).standard_normal((K.shape[0], 3))
+    assert np.allclose(stored.solve(F), system.solve(F), rtol=1e-12, atol=1e-12)
+    assert stored.factor_nnz == system.factor_nnz and np.array_equal(stored.dirichlet_dofs, np.arange(13))
+
+def test_solver_reuses_operator_plan_and_factorization(tmp_path, monkeypatch):
+    X, T, b = structured_rectangle_tri(16, 10)
+    kw = dict(boundary=b, dirichlet={"left": lambda x, y: 0.0 * x, "right": lambda x, y: 1.0 + 0.0 * x},
+              validate_boundary=True)
+    f = lambda x, y: 1.0 + 0.0 * x
+    u_ref = solve_poisson_t3(X, T, 2.0, f, **kw)
+    cache = DiskCache(tmp_path)
+    u1 = solve_poisson_t3(X, T, 2.0, f, disk_cache=cache, **kw)
+    assert len(cache) == 4 and cache.hits == 0      # boundary check, plan, K, factorization
+    u2 = solve_poisson_t3(X.copy(), T.copy(), 2.0, f, disk_cache=cache, **kw)
+    assert cache.hits == 3 and np.allclose(u1, u_ref) and np.allclose(u2, u_ref, rtol=1e-12)
+    u3 = solve_poisson_t3(X, T, 2.0, f, disk_cache=cache, solver="cg", rtol=1e-12, **kw)
+    assert cache.hits == 6 and np.allclose(u3, u_ref, atol=1e-9)       # memory-mapped K
+    solve_poisson_t3(X, T, 3.0, f, disk_cache=cache, **kw)
+    assert len(cache) == 6
+
+    monkeypatch.setenv("PYFEMLITE_CACHE_DIR", str(tmp_path / "env"))
+    assert resolve_disk_cache(None).directory == str(tmp_path / "env")
+    assert resolve_disk_cache(False) is None
+    solve_poisson_t3(X, T, 2.0, f, **kw)
+    assert len(DiskCache(tmp_path / "env")) == 4
+    monkeypatch.delenv("PYFEMLITE_CACHE_DIR")
+    assert resolve_disk_cache(None) is None
+    with pytest.raises(ValueError):
+        resolve_disk_cache(True)
+
+def test_memory_cache_keeps_superlu_factors_on_disk_hit(tmp_path):
+    X, T, b = structured_rectangle_tri(10, 8)
+    kw = dict(boundary=b, dirichlet={"left": lambda x, y: 0.0 * x})
+    f = lambda x, y: 1.0 + 0.0 * x
+    disk = DiskCache(tmp_path)
+    u_ref = solve_poisson_t3(X, T, 1.0, f, disk_cache=disk, **kw)
+    memory = FactorizationCache()
+    for _ in range(2):
+        assert np.allclose(solve_poisson_t3(X, T, 1.0, f, cache=memory, disk_cache=disk, **kw), u_ref)
+    (system,) = memory._systems.values()
+    assert not isinstance(system._lu, StoredFactors) and memory.hits == 1
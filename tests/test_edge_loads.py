@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from pyfemlite.mesh.structured_tri import structured_unit_square_tri
+from pyfemlite.fem.traction import add_elasticity_traction_rhs
+from pyfemlite.fem.flux import add_poisson_neumann_rhs
+from pyfemlite.fem.loads import evaluate_pointwise
+
+def test_vectorized_and_scalar_traction_agree():
+    X, T, boundary = structured_unit_square_tri(4, 6)
+    f_vec = np.zeros(2 * X.shape[0])
+    f_sca = np.zeros(2 * X.shape[0])
+    tr = lambda x, y: (np.sin(y), -1.0)
+    add_elasticity_traction_rhs(f_vec, X, boundary.edges["right"], tr, vectorized=True)
+    add_elasticity_traction_rhs(f_sca, X, boundary.edges["right"], tr, vectorized=False)
+    assert np.allclose(f_vec, f_sca)
+    assert abs(f_vec[1::2].sum() + 1.0) < 1e-12
+    assert abs(f_vec[0::2].sum() - (1.0 - np.cos(1.0))) < 1e-4
+
+def test_higher_order_edge_quadrature_is_exact():
+    X, T, boundary = structured_unit_square_tri(3, 3)
+    g = lambda x, y: y**5
+    f2 = np.zeros(X.shape[0])
+    f4 = np.zeros(X.shape[0])
+    add_poisson_neumann_rhs(f2, X, boundary.edges["left"], g)
+    add_poisson_neumann_rhs(f4, X, boundary.edges["left"], g, order=4)
+    assert abs(f4.sum() - 1.0 / 6.0) < 1e-14
+    assert abs(f2.sum() - 1.0 / 6.0) > 1e-6
+    # first moment: sum_i f_i y_i = int y^6 dy for a linear interpolant of y
+    assert abs(f4 @ X[:, 1] - 1.0 / 7.0) < 1e-14
+
+def test_evaluate_pointwise_shapes_and_fallback():
+    x = np.linspace(0.0, 1.0, 5)
+    y = np.zeros(5)
+    assert evaluate_pointwise(lambda a, b: 2.0, x, y).shape == (5,)
+    scalar_only = lambda a, b: 1.0 if a < 0.5 else 0.0
+    assert np.array_equal(evaluate_pointwise(scalar_only, x, y), [1, 1, 0, 0, 0])
+    with pytest.raises(ValueError):
+        evaluate_pointwise(scalar_only, x, y, vectorized=True)
+    v = evaluate_pointwise(lambda a, b: (a, 0.0), x, y, ncomp=2)
+    assert v.shape == (5, 2) and np.array_equal(v[:, 0], x)
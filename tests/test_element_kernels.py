@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+from pyfemlite.mesh.structured_tri import structured_unit_square_tri
+from pyfemlite.fem.shape_t3 import t3_area_and_grads, t3_areas_and_grads
+from pyfemlite.fem.elasticity2d import elasticity_B_matrices, elasticity_element_stiffness
+from pyfemlite.fem.materials import D_plane_stress
+
+def test_batched_grads_match_single_element():
+    X, T, _ = structured_unit_square_tri(4, 3)
+    X = X + 0.05 * np.sin(3.0 * X[:, ::-1])
+    A, dNdx = t3_areas_and_grads(X, T)
+    for e in range(T.shape[0]):
+        Ae, dNe = t3_area_and_grads(X[T[e]])
+        assert abs(A[e] - Ae) < 1e-14
+        assert np.allclose(dNdx[e], dNe, atol=1e-12)
+
+def test_batched_elasticity_stiffness_is_symmetric_with_rigid_modes():
+    X, T, _ = structured_unit_square_tri(3, 3)
+    A, dNdx = t3_areas_and_grads(X, T)
+    Ke = elasticity_element_stiffness(A, elasticity_B_matrices(dNdx), D_plane_stress(1.0, 0.3))
+    assert Ke.shape == (T.shape[0], 6, 6)
+    assert np.allclose(Ke, Ke.transpose(0, 2, 1))
+    translation = np.tile([1.0, 0.0], 3)
+    assert np.allclose(Ke @ translation, 0.0)
+
+def test_degenerate_elements_all_reported():
+    X, T, _ = structured_unit_square_tri(2, 2)
+    T = T.copy()
+    T[1] = [0, 1, 2]   # collinear nodes on the bottom edge
+    T[5] = [4, 4, 3]
+    with pytest.raises(ValueError, match=r"elements \[1, 5\]"):
+        t3_areas_and_grads(X, T)
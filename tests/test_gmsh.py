@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+from pyfemlite.io import load_mesh, read_msh, save_mesh
+from pyfemlite.mesh.quadratic import t3_to_t6
+from pyfemlite.mesh.structured_tri import structured_rectangle_tri
+
+def write_msh41(path, X, T, groups, binary=False, tag0=101):
+    '''Minimal MSH 4.1 writer: one entity per physical group, groups = name -> (dim, node ids).'''
+    etype = {(0, 1): 15, (1, 2): 1, (1, 3): 8, (2, 3): 2, (2, 6): 9}
+    ents = [(2, 1, "domain", np.asarray(T))] + [(d, i + 1, n, np.asarray(c).reshape(len(c), -1))
+                                                 for i, (n, (d, c)) in enumerate(groups.items())]
+    out = bytearray(b"$MeshFormat\n4.1 %d 8\n" % int(binary))
+    if binary:
+        out += np.int32(1).tobytes() + b"\n"
+    out += b"$EndMeshFormat\n$PhysicalNames\n%d\n" % len(ents)
+    for k, (d, _, name, _) in enumerate(ents):
+        out += b'%d %d "%s"\n' % (d, k + 1, name.encode())
+    out += b"$EndPhysicalNames\n"
+    def put(kind, *vals):
+        nonlocal out
+        if binary:
+            out += np.asarray(vals, dtype={"i": "<i4", "s": "<u8", "d": "<f8"}[kind]).tobytes()
+        else:
+            out += (" ".join(repr(float(v)) if kind == "d" else str(int(v)) for v in vals) + "\n").encode()
+    counts = [sum(e[0] == d for e in ents) for d in range(4)]
+    out += b"$Entities\n"
+    put("s", *counts)
+    for d in range(3):
+        for k, (dim, tag, _, _) in enumerate(ents):
+            if dim != d:
+                continue
+            put("i", tag)
+            put("d", *([0.0] * (3 if d == 0 else 6)))
+            put("s", 1)
+            put("i", k + 1)
+            if d > 0:
+                put("s", 0)
+    out += b"$EndEntities\n$Nodes\n"
+    tags = np.arange(X.shape[0]) + tag0
+    put("s", 1, X.shape[0] + 1, tag0, 999)
+    put("i", 2, 1, 0)
+    put("s", X.shape[0] + 1)
+    put("s", *tags, 999)      # node 999 is not used by any element
+    put("d", *np.column_stack([np.vstack([X, [5.0, 5.0]]), np.zeros(X.shape[0] + 1)]).ravel())
+    out += b"$EndNodes\n$Elements\n"
+    put("s", len(ents), sum(e[3].shape[0] for e in ents), 1, 10 ** 6)
+    for dim, tag, _, conn in ents:
+        put("i", dim, tag, etype[(dim, conn.shape[1])])
+        put("s", conn.shape[0])
+        put("s", *np.column_stack([np.arange(conn.shape[0]) + 1, conn + tag0]).ravel())
+    out += b"$EndElements\n"
+    path.write_bytes(bytes(out))
+    return path
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_read_msh_linear_groups_and_regions(tmp_path, binary):
+    X, T, b = structured_rectangle_tri(4, 3)
+    groups = {"left": (1, b.edges["left"]), "bottom": (1, b.edges["bottom"]), "corner": (0, [[0]])}
+    path = write_msh41(tmp_path / "m.msh", X, T, groups, binary=binary)
+    X2, T2, b2, regions = read_msh(path, return_regions=True)
+    assert np.array_equal(X2, X) and np.array_equal(T2, T) and T2.dtype == np.int32
+    assert np.array_equal(b2.edges["left"], b.edges["left"]) and np.array_equal(b2.nodes["bottom"], b.nodes["bottom"])
+    assert np.array_equal(b2.nodes["corner"], [0]) and "corner" not in b2.edges
+    assert np.array_equal(regions["domain"], np.arange(T.shape[0]))
+    b2.validate(X2, T2, strict=True)
+
+def test_read_msh_quadratic_and_reorientation(tmp_path):
+    X, T, b = t3_to_t6(*structured_rectangle_tri(3, 2))
+    Tcw = T.copy()
+    Tcw[::2] = T[::2][:, [0, 2, 1, 5, 4, 3]]      # clockwise with the mid nodes following
+    path = write_msh41(tmp_path / "q.msh", X, Tcw, {"top": (1, b.edges["top"])}, binary=True)
+    X2, T2, b2 = read_msh(path)
+    assert np.array_equal(T2, T) and b2.edges["top"].shape == (3, 3)
+    assert np.array_equal(b2.edges["top"], b.edges["top"])
+    bad = tmp_path / "old.msh"
+    bad.write_bytes(b"$MeshFormat\n2.2 0 8\n$EndMeshFormat\n")
+    with pytest.raises(ValueError):
+        read_msh(bad)
+
+def test_native_mesh_file_is_memory_mapped(tmp_path):
+    X, T, b = structured_rectangle_tri(30, 20)
+    save_mesh(tmp_path / "m.npz", X, T, b)
+    X2, T2, b2 = load_mesh(tmp_path / "m.npz")
+    assert isinstance(X2, np.memmap) and isinstance(T2, np.memmap) and not X2.flags.writeable
+    assert X2.ctypes.data % 64 == 0 and T2.ctypes.data % 64 == 0
+    assert np.array_equal(X2, X) and np.array_equal(T2, T) and T2.dtype == T.dtype
+    assert all(np.array_equal(b2.edges[k], b.edges[k]) and np.array_equal(b2.nodes[k], b.nodes[k]) for k in b.edges)
+    X3, T3, _ = load_mesh(tmp_path / "m.npz", mmap=False)
+    assert not isinstance(X3, np.memmap) and np.array_equal(T3, T)
+    with np.load(tmp_path / "m.npz") as npz:      # still a plain npz
+        assert np.array_equal(npz["edges/left"], b.edges["left"])
+    np.savez(tmp_path / "other.npz", a=X)
+    with pytest.raises(ValueError):
+        load_mesh(tmp_path / "other.npz")
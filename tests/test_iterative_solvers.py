@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from scipy.sparse import identity, tril
+from pyfemlite.mesh.structured_tri import structured_unit_square_tri
+from pyfemlite.fem.elasticity2d import solve_elasticity_t3
+from pyfemlite.fem.poisson2d import solve_poisson_t3
+from pyfemlite.fem.materials import D_plane_stress
+from pyfemlite.fem.amg import SmoothedAggregationAMG
+from pyfemlite.fem.iterative import incomplete_cholesky
+from pyfemlite.fem.assembly import AssemblyPlan
+from pyfemlite.fem.shape_t3 import t3_areas_and_grads
+from pyfemlite.fem.poisson2d import poisson_element_stiffness
+
+def _cantilever(**kw):
+    X, T, boundary = structured_unit_square_tri(24, 6)
+    X[:, 0] *= 4.0
+    return solve_elasticity_t3(X, T, D_plane_stress(1000.0, 0.3), lambda x, y: (0.0, 0.0),
+                               boundary=boundary, dirichlet={"left": lambda x, y: (0.0, 0.0)},
+                               traction={"right": lambda x, y: (0.0, -1.0)}, **kw)
+
+@pytest.mark.parametrize("pc", ["none", "jacobi", "ic", "amg"])
+def test_cg_matches_direct_elasticity(pc):
+    u_ref = _cantilever()
+    u, info = _cantilever(solver="cg", preconditioner=pc, rtol=1e-12, return_info=True)
+    assert info.converged and info.method == "cg"
+    assert info.history.size == info.iterations + 1
+    assert np.allclose(u, u_ref, rtol=0.0, atol=1e-8 * np.abs(u_ref).max())
+
+def test_cg_warm_start_and_preconditioner_quality():
+    X, T, boundary = structured_unit_square_tri(30, 30)
+    zero = lambda x, y: 0.0
+    kw = dict(boundary=boundary, dirichlet={"left": zero, "bottom": zero}, solver="cg", return_info=True)
+    u_j, info_j = solve_poisson_t3(X, T, 1.0, lambda x, y: 1.0, preconditioner="jacobi", **kw)
+    u_a, info_a = solve_poisson_t3(X, T, 1.0, lambda x, y: 1.0, preconditioner="amg", **kw)
+    u_i, info_i = solve_poisson_t3(X, T, 1.0, lambda x, y: 1.0, preconditioner="ilu", **kw)
+    assert info_a.iterations < info_j.iterations and info_i.iterations < info_j.iterations
+    assert np.allclose(u_a, u_j) and np.allclose(u_i, u_j)
+    _, info_w = solve_poisson_t3(X, T, 1.0, lambda x, y: 1.0, preconditioner="amg", x0=u_a, **kw)
+    assert info_w.iterations < info_a.iterations
+
+def test_cg_raises_when_not_converged_unless_info_requested():
+    X, T, boundary = structured_unit_square_tri(12, 12)
+    zero = lambda x, y: 0.0
+    kw = dict(boundary=boundary, dirichlet={"left": zero}, solver="cg", maxiter=2)
+    with pytest.raises(ValueError, match="did not converge in 2 iterations"):
+        solve_poisson_t3(X, T, 1.0, lambda x, y: 1.0, **kw)
+    u, info = solve_poisson_t3(X, T, 1.0, lambda x, y: 1.0, return_info=True, **kw)
+    assert not info.converged and info.iterations == 2 and u.shape == (X.shape[0],)
+
+def test_incomplete_cholesky_matches_matrix_on_its_pattern():
+    X, T, _ = structured_unit_square_tri(12, 9)
+    K = AssemblyPlan.from_connectivity(T, 1).assemble(poisson_element_stiffness(*t3_areas_and_grads(X, T), 1.0))
+    K = K + 1e-2 * identity(K.shape[0])
+    L = incomplete_cholesky(K)
+    P = tril(K, format="csr")
+    assert np.array_equal(L.indices, P.indices) and np.array_equal(L.indptr, P.indptr)
+    LLt = (L @ L.T).tocsr()
+    rows = np.repeat(np.arange(K.shape[0]), np.diff(P.indptr))
+    assert np.allclose(np.asarray(LLt[rows, P.indices]).ravel(), P.data, rtol=1e-12)
+
+def test_amg_builds_hierarchy():
+    X, T, _ = structured_unit_square_tri(40, 40)
+    A, dNdx = t3_areas_and_grads(X, T)
+    K = AssemblyPlan.from_connectivity(T, 1).assemble(poisson_element_stiffness(A, dNdx, 1.0))
+    K = K + 1e-3 * K.diagonal().mean() * identity(K.shape[0])   # pure Neumann: shift to SPD
+    amg = SmoothedAggregationAMG(K, max_coarse=50)
+    assert amg.n_levels >= 3
+    assert 1.0 < amg.operator_complexity < 3.0
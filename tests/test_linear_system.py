@@ -0,0 +1,56 @@
+import numpy as np
+from scipy.sparse.linalg import spsolve
+from pyfemlite.mesh.structured_tri import structured_unit_square_tri
+from pyfemlite.fem.assembly import AssemblyPlan
+from pyfemlite.fem.bc import apply_dirichlet
+from pyfemlite.fem.shape_t3 import t3_areas_and_grads
+from pyfemlite.fem.poisson2d import poisson_element_stiffness, solve_poisson_t3
+from pyfemlite.fem.linear_system import LinearSystem, FactorizationCache
+
+def test_multi_rhs_matches_individual_solves():
+    X, T, boundary = structured_unit_square_tri(6, 5)
+    plan = AssemblyPlan.from_connectivity(T, 1)
+    A, dNdx = t3_areas_and_grads(X, T)
+    K = plan.assemble(poisson_element_stiffness(A, dNdx, 1.0))
+    dofs = boundary.nodes["left"]
+    system = LinearSystem(K, dofs)
+
+    rng = np.random.default_rng(1)
+    F = rng.standard_normal((plan.n_dof, 3))
+    vals = rng.standard_normal((dofs.size, 3))
+    U = system.solve(F, vals)
+    assert U.shape == F.shape
+    for k in range(3):
+        Kb, fb = apply_dirichlet(K, F[:, k].copy(), {int(d): float(v) for d, v in zip(dofs, vals[:, k])})
+        assert np.allclose(U[:, k], spsolve(Kb, fb))
+
+def test_dirichlet_values_follow_the_given_dof_order():
+    X, T, _ = structured_unit_square_tri(4, 4)
+    K = AssemblyPlan.from_connectivity(T, 1).assemble(poisson_element_stiffness(*t3_areas_and_grads(X, T), 1.0))
+    f = np.zeros(K.shape[0])
+    system = LinearSystem(K, [24, 0])
+    u = system.solve(f, [5.0, 1.0])
+    assert (u[24], u[0]) == (5.0, 1.0) and np.array_equal(system.dirichlet_dofs, [24, 0])
+    assert np.allclose(LinearSystem.from_arrays(system.to_arrays()).solve(f, [5.0, 1.0]), u)
+    U = LinearSystem(K, [0, 24, 0]).solve(np.zeros((K.shape[0], 2)), [[9.0, 9.0], [5.0, 6.0], [1.0, 2.0]])
+    assert np.allclose(U[[0, 24]], [[1.0, 2.0], [5.0, 6.0]])
+
+def test_solver_reuses_cached_factorization():
+    X, T, boundary = structured_unit_square_tri(8, 8)
+    zero = lambda x, y: 0.0
+    cache = FactorizationCache()
+    for c in (1.0, 2.0, 3.0):
+        u_ref = solve_poisson_t3(X, T, 1.0, lambda x, y: c, boundary=boundary,
+                                 dirichlet={"left": zero, "right": zero})
+        u = solve_poisson_t3(X, T, 1.0, lambda x, y: c, boundary=boundary,
+                             dirichlet={"left": zero, "right": zero}, cache=cache)
+        assert np.allclose(u, u_ref)
+    assert len(cache) == 1
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    solve_poisson_t3(X, T, 2.0, zero, boundary=boundary, dirichlet={"left": zero}, cache=cache)
+    assert len(cache) == 2
+    key = cache.keys()[0]
+    assert cache.evict(key) and key not in cache
+    cache.clear()
+    assert len(cache) == 0
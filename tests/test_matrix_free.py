@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+from scipy.sparse.linalg import cg
+from pyfemlite.mesh.mesh import Mesh
+from pyfemlite.mesh.structured_tri import structured_rectangle_tri
+from pyfemlite.fem.bc import DirichletPartition
+from pyfemlite.fem.elasticity2d import elasticity_B_matrices, elasticity_element_stiffness, solve_elasticity_t3
+from pyfemlite.fem.materials import D_plane_stress
+from pyfemlite.fem.matrix_free import ElasticityOperator, PoissonOperator
+from pyfemlite.fem.poisson2d import poisson_element_stiffness, solve_poisson_t3
+
+def _mesh():
+    X, T, boundary = structured_rectangle_tri(9, 6, xlim=(0.0, 2.0), ylim=(0.0, 1.0), grading=(1.4, 1.0))
+    return Mesh(X, T), boundary
+
+def test_products_and_diagonal_match_assembled_matrices():
+    mesh, _ = _mesh()
+    A, dNdx = mesh.geometry()
+    rng = np.random.default_rng(3)
+
+    kappa = rng.uniform(1.0, 3.0, mesh.nelem)
+    K = mesh.assembly_plan(1).assemble(poisson_element_stiffness(A, dNdx, kappa))
+    op = PoissonOperator(mesh, None, kappa, chunk_size=11)
+    u = rng.standard_normal(op.shape[0])
+    assert np.allclose(op @ u, K @ u)
+    assert np.allclose(op.diagonal(), K.diagonal())
+
+    D = D_plane_stress(200.0, 0.3)
+    K = mesh.assembly_plan(2).assemble(elasticity_element_stiffness(A, elasticity_B_matrices(dNdx), D))
+    op = ElasticityOperator(mesh, None, np.broadcast_to(D, (mesh.nelem, 3, 3)), chunk_size=13)
+    u = rng.standard_normal(op.shape[0])
+    assert np.allclose(op @ u, K @ u)
+    assert np.allclose(op.diagonal(), K.diagonal())
+
+def test_masked_operator_reproduces_partitioned_system():
+    mesh, boundary = _mesh()
+    A, dNdx = mesh.geometry()
+    K = mesh.assembly_plan(1).assemble(poisson_element_stiffness(A, dNdx, 2.0))
+    dofs = boundary.nodes["left"]
+    op = PoissonOperator(mesh, None, 2.0, dirichlet_dofs=dofs)
+    part = DirichletPartition.from_dofs(mesh.nnode, dofs)
+    K_ff, _ = part.reduce_matrix(K)
+    rng = np.random.default_rng(0)
+    u = rng.standard_normal(mesh.nnode)
+    y = op @ u
+    assert np.allclose(y[part.free], K_ff @ u[part.free])
+    assert np.allclose(y[part.dofs], u[part.dofs])
+
+    f = rng.standard_normal(mesh.nnode)
+    vals = rng.standard_normal(part.dofs.size)
+    x, status = cg(op, op.dirichlet_rhs(f, vals), M=op.jacobi(), rtol=1e-12)
+    assert status == 0
+    K_ff, rhs = part.reduce(K, f, vals)
+    assert np.allclose(x, part.expand(np.linalg.solve(K_ff.toarray(), rhs), vals))
+
+def test_solvers_matrix_free_option():
+    mesh, boundary = _mesh()
+    zero = lambda x, y: (0.0, 0.0)
+    kw = dict(boundary=boundary, dirichlet={"left": zero}, traction={"right": lambda x, y: (0.0, -1.0)})
+    D = D_plane_stress(100.0, 0.25)
+    u_ref = solve_elasticity_t3(mesh, None, D, zero, **kw)
+    u, info = solve_elasticity_t3(mesh, None, D, zero, solver="matrix_free", return_info=True, **kw)
+    assert info.method == "matrix_free" and info.converged
+    assert np.allclose(u, u_ref, rtol=1e-8, atol=1e-10)
+
+    g = lambda x, y: x + y
+    p_ref = solve_poisson_t3(mesh, None, 1.5, lambda x, y: 1.0, boundary=boundary, dirichlet={"bottom": g})
+    p = solve_poisson_t3(mesh, None, 1.5, lambda x, y: 1.0, boundary=boundary, dirichlet={"bottom": g},
+                         solver="matrix_free", preconditioner=None)
+    assert np.allclose(p, p_ref, rtol=1e-8, atol=1e-10)
+    with pytest.raises(ValueError):
+        solve_poisson_t3(mesh, None, 1.0, lambda x, y: 1.0, boundary=boundary, dirichlet={"bottom": g},
+                         solver="matrix_free", preconditioner="amg")
+    with pytest.raises(ValueError, match="did not converge in 3 iterations"):
+        solve_elasticity_t3(mesh, None, D, zero, solver="matrix_free", maxiter=3, **kw)
+    _, info = solve_elasticity_t3(mesh, None, D, zero, solver="matrix_free", maxiter=3, return_info=True, **kw)
+    assert not info.converged and info.iterations == 3
@@ -0,0 +1,31 @@
+import numpy as np
+from pyfemlite.mesh import Mesh, structured_unit_square_tri, extract_boundary_edges
+from pyfemlite.fem.poisson2d import solve_poisson_t3
+
+def test_mesh_topology_is_consistent_and_cached():
+    mesh, boundary = structured_unit_square_tri(4, 3, as_mesh=True)
+    assert isinstance(mesh, Mesh)
+    assert np.array_equal(mesh.boundary_edges, extract_boundary_edges(mesh.T))
+    assert mesh.edges is mesh.edges
+    assert mesh.assembly_plan(2) is mesh.assembly_plan(2)
+
+    ee = mesh.edge_elem
+    interior = mesh.edge_count == 2
+    assert np.all(ee[~interior, 1] == -1) and np.all(ee[interior, 1] >= 0)
+    for k in np.flatnonzero(interior)[:10]:
+        for e in ee[k]:
+            assert k in mesh.elem_edge[e]
+
+    indptr, indices = mesh.node_elem
+    for n in (0, 7, mesh.nnode - 1):
+        elems = indices[indptr[n]:indptr[n + 1]]
+        assert np.array_equal(elems, np.flatnonzero((mesh.T == n).any(axis=1)))
+
+def test_solver_accepts_mesh():
+    mesh, boundary = structured_unit_square_tri(6, 6, as_mesh=True)
+    zero = lambda x, y: 0.0
+    kw = dict(boundary=boundary, dirichlet={"left": zero, "right": zero}, validate_boundary=True)
+    u_mesh = solve_poisson_t3(mesh, None, 1.0, lambda x, y: 1.0, **kw)
+    u_arr = solve_poisson_t3(mesh.X, mesh.T, 1.0, lambda x, y: 1.0, **kw)
+    assert np.allclose(u_mesh, u_arr)
+    assert mesh.geometry()[0].shape == (mesh.nelem,)
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from pyfemlite.mesh import structured_rectangle_tri
+from pyfemlite.fem import ParallelAssembler, solve_elasticity_t3, solve_poisson_t3
+from pyfemlite.fem.elasticity2d import elasticity_stiffness_kernel, elasticity_element_stiffness, elasticity_B_matrices
+from pyfemlite.fem.poisson2d import poisson_stiffness_kernel, poisson_element_stiffness
+from pyfemlite.fem.materials import D_plane_stress
+
+@pytest.mark.parametrize("backend", ["thread", "process"])
+def test_parallel_assembly_is_bitwise_identical_to_serial(backend):
+    mesh, _ = structured_rectangle_tri(12, 9, diagonal="alternate", grading=2.0, as_mesh=True)
+    D = D_plane_stress(210e3, 0.3)
+    plan = mesh.assembly_plan(2)
+    A, dNdx = mesh.geometry()
+    K0 = plan.assemble(elasticity_element_stiffness(A, elasticity_B_matrices(dNdx), D))
+    for workers, chunk_size in [(1, 1000), (2, 17), (3, 40)]:
+        with ParallelAssembler(plan, workers=workers, chunk_size=chunk_size, backend=backend) as pa:
+            K = pa.assemble(elasticity_stiffness_kernel, mesh.X, mesh.T, D)
+        assert np.array_equal(K.indptr, K0.indptr) and np.array_equal(K.indices, K0.indices)
+        assert np.array_equal(K.data, K0.data)
+
+def test_per_element_arguments_are_chunked():
+    mesh, _ = structured_rectangle_tri(6, 5, as_mesh=True)
+    kappa = np.linspace(1.0, 3.0, mesh.nelem)
+    A, dNdx = mesh.geometry()
+    plan = mesh.assembly_plan(1)
+    K0 = plan.assemble(poisson_element_stiffness(A, dNdx, kappa))
+    with ParallelAssembler(plan, workers=2, chunk_size=7) as pa:
+        K = pa.assemble(poisson_stiffness_kernel, mesh.X, mesh.T, elem_args=(kappa,))
+        with pytest.raises(ValueError):
+            pa.assemble(poisson_stiffness_kernel, mesh.X, mesh.T, elem_args=(kappa[:-1],))
+    assert np.array_equal(K.data, K0.data)
+
+def test_solvers_accept_workers():
+    X, T, boundary = structured_rectangle_tri(16, 4, xlim=(0.0, 4.0))
+    D = D_plane_stress(1e3, 0.3)
+    kw = dict(boundary=boundary, dirichlet={"left": lambda x, y: (0.0, 0.0)},
+              traction={"right": lambda x, y: (0.0, -1.0)})
+    u0 = solve_elasticity_t3(X, T, D, lambda x, y: (0.0, 0.0), **kw)
+    u1 = solve_elasticity_t3(X, T, D, lambda x, y: (0.0, 0.0), workers=2, chunk_size=10, **kw)
+    assert np.array_equal(u0, u1)
+    p0 = solve_poisson_t3(X, T, 2.0, lambda x, y: 1.0, boundary=boundary, dirichlet={"left": lambda x, y: 0.0})
+    p1 = solve_poisson_t3(X, T, 2.0, lambda x, y: 1.0, boundary=boundary, dirichlet={"left": lambda x, y: 0.0},
+                          workers=2, chunk_size=10, parallel_backend="process")
+    assert np.array_equal(p0, p1)
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+import pyfemlite
+from pyfemlite.precision import PrecisionPolicy, index_dtype, storage_dtype
+from pyfemlite.mesh.structured_tri import structured_rectangle_tri
+from pyfemlite.fem.assembly import AssemblyPlan, element_dofs
+from pyfemlite.fem.elasticity2d import solve_elasticity_t3
+from pyfemlite.fem.materials import D_plane_stress
+from pyfemlite.io.vtu import write_vtu
+
+def test_index_policy_dtypes():
+    assert index_dtype(2**31 - 1) == np.int32 and index_dtype(2**31) == np.int64
+    assert PrecisionPolicy(index="int64").index_dtype(10) == np.int64
+    with pytest.raises(ValueError):
+        PrecisionPolicy(index="int32").index_dtype(2**31)
+    with pytest.raises(ValueError):
+        PrecisionPolicy(storage="float16")
+    with pytest.raises(ValueError):
+        index_dtype(300, np.int8)
+
+def test_plan_and_mesh_follow_policy():
+    _, T, boundary = structured_rectangle_tri(4, 3)
+    plan = AssemblyPlan.from_connectivity(T, 2)
+    assert T.dtype == boundary.nodes["left"].dtype == boundary.edges["top"].dtype == np.int32
+    assert plan.edofs.dtype == plan.indices.dtype == plan.indptr.dtype == plan.slots.dtype == np.int32
+    with pyfemlite.use_precision(index="int64"):
+        _, T64, _ = structured_rectangle_tri(4, 3)
+        plan64 = AssemblyPlan.from_connectivity(T64, 2)
+    assert T64.dtype == plan64.indices.dtype == plan64.slots.dtype == np.int64
+    assert np.array_equal(plan64.slots, plan.slots) and np.array_equal(plan64.indices, plan.indices)
+    assert pyfemlite.get_policy() == PrecisionPolicy()
+
+def test_dof_table_widens_past_int32():
+    T = np.array([[0, 1, 2**30]], dtype=np.int32)
+    assert element_dofs(T, 2).dtype == np.int64
+    assert element_dofs(T, 2)[0, -1] == 2**31 + 1
+
+def test_float32_storage_solves_in_float64(tmp_path):
+    D = D_plane_stress(100.0, 0.3)
+    zero = lambda x, y: (0.0, 0.0)
+    def solve():
+        X, T, boundary = structured_rectangle_tri(16, 4, xlim=(0.0, 4.0), ylim=(0.0, 1.0))
+        u = solve_elasticity_t3(X, T, D, zero, boundary=boundary, dirichlet={"left": zero},
+                                traction={"right": lambda x, y: (0.0, -1.0)})
+        return X, T, u
+    X64, _, u64 = solve()
+    old = pyfemlite.set_policy(storage="float32")
+    try:
+        assert storage_dtype() == np.float32
+        X32, T, u32 = solve()
+        path = write_vtu(tmp_path / "u.vtu", X32, T, {"u": u64.reshape(-1, 2)})
+    finally:
+        pyfemlite.set_policy(storage=old.storage)
+    assert X32.dtype == np.float32 and u32.dtype == np.float64
+    assert np.max(np.abs(u32 - u64)) < 1e-5 * np.max(np.abs(u64))
+    head = path.read_bytes().split(b"<AppendedData")[0].decode()
+    assert 'type="Float32" Name="u"' in head and 'type="Float32" Name="Points"' in head
+    assert X64.dtype == np.float64
@@ -0,0 +1,51 @@
+import numpy as np
+from pyfemlite.mesh.quadratic import structured_rectangle_t6
+from pyfemlite.mesh.structured_tri import structured_rectangle_tri
+from pyfemlite.post import PointLocator, sample_line
+
+def brute_force_locate(X, T, points, tol=1e-10):
+    P = X[T[:, :3]]
+    found = np.full(len(points), -1)
+    for k, p in enumerate(points):
+        v0, v1 = P[:, 1] - P[:, 0], P[:, 2] - P[:, 0]
+        w = p - P[:, 0]
+        det = v0[:, 0] * v1[:, 1] - v0[:, 1] * v1[:, 0]
+        l1 = (w[:, 0] * v1[:, 1] - w[:, 1] * v1[:, 0]) / det
+        l2 = (v0[:, 0] * w[:, 1] - v0[:, 1] * w[:, 0]) / det
+        inside = np.flatnonzero(np.minimum(np.minimum(l1, l2), 1 - l1 - l2) >= -tol)
+        found[k] = inside[0] if inside.size else -1
+    return found
+
+def test_locate_matches_brute_force():
+    X, T, _ = structured_rectangle_tri(23, 11, xlim=(0.0, 3.0), grading=(1.0, 2.0), diagonal="alternate")
+    rng = np.random.default_rng(3)
+    pts = np.vstack([rng.uniform([-0.2, -0.2], [3.2, 1.2], (400, 2)), X[::7], 0.5 * (X[T[:5, 0]] + X[T[:5, 1]])])
+    loc = PointLocator(X, T, cells_per_element=0.5)
+    elem, bary = loc.locate(pts)
+    ref = brute_force_locate(X, T, pts)
+    assert np.array_equal(elem >= 0, ref >= 0)
+    ok = elem >= 0
+    assert np.allclose(np.einsum("ka,kad->kd", bary[ok], X[T[elem[ok]]]), pts[ok], atol=1e-13)
+    assert bary[ok].min() >= -1e-10 and np.allclose(bary[ok].sum(axis=1), 1.0)
+
+def test_interpolation_is_exact_for_the_element_space_and_reusable():
+    X, T, _ = structured_rectangle_t6(6, 5, xlim=(0.0, 2.0))
+    loc = PointLocator(X, T)
+    pts = np.random.default_rng(4).uniform([0.0, 0.0], [2.0, 1.0], (200, 2))
+    q = lambda x, y: x ** 2 - x * y + 3.0 * y ** 2 - y
+    U = np.column_stack([q(*X.T), 2.0 * X[:, 0], X[:, 1] ** 2])     # three "load cases"
+    P = loc.interpolation_matrix(pts)
+    assert P.shape == (200, X.shape[0]) and np.allclose(P @ U, np.column_stack([q(*pts.T), 2.0 * pts[:, 0], pts[:, 1] ** 2]))
+    u = np.column_stack([X[:, 0], -X[:, 1]]).ravel()                # interleaved (2*nnode,)
+    vals = loc.interpolate(u, [[1.0, 0.5], [5.0, 5.0]])
+    assert np.allclose(vals[0], [1.0, -0.5]) and np.isnan(vals[1]).all()
+
+def test_sample_line_centerline():
+    X, T, _ = structured_rectangle_tri(40, 4, xlim=(0.0, 10.0))
+    uy = -0.01 * X[:, 0]        # linear, so reproduced exactly by T3
+    loc = PointLocator(X, T)
+    s, pts, vals = sample_line(loc, uy, (0.0, 0.5), (10.0, 0.5), 21)
+    assert np.allclose(s, np.linspace(0.0, 10.0, 21)) and np.allclose(pts[:, 1], 0.5)
+    assert np.allclose(vals, -0.01 * pts[:, 0])
+    _, _, outside = sample_line(loc, uy, (9.0, 0.5), (11.0, 0.5), 3)
+    assert np.isnan(outside[-1]) and np.isclose(outside[1], -0.1)
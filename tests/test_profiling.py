@@ -0,0 +1,66 @@
+import json
+import numpy as np
+import pyfemlite
+from pyfemlite.mesh.structured_tri import structured_rectangle_tri
+from pyfemlite.fem.elasticity2d import solve_elasticity_t3
+from pyfemlite.fem.materials import D_plane_stress
+from pyfemlite.fem.poisson2d import solve_poisson_t3
+
+def _problem():
+    X, T, boundary = structured_rectangle_tri(16, 4, xlim=(0.0, 4.0), ylim=(0.0, 1.0))
+    zero = lambda x, y: (0.0, 0.0)
+    kw = dict(boundary=boundary, dirichlet={"left": zero}, traction={"right": lambda x, y: (0.0, -1.0)})
+    return X, T, zero, kw
+
+def test_profile_flag_returns_report_and_same_solution(tmp_path):
+    X, T, zero, kw = _problem()
+    D = D_plane_stress(100.0, 0.3)
+    u_ref = solve_elasticity_t3(X, T, D, zero, **kw)
+    u, info, report = solve_elasticity_t3(X, T, D, zero, return_info=True, profile=True, **kw)
+    assert np.array_equal(u, u_ref) and info.method == "direct"
+
+    names = [r.name for r in report.records]
+    for name in ("solve_elasticity_t3", "setup", "loads", "assemble", "reduce", "factorize", "solve"):
+        assert name in names
+    assert report.find("assemble")[0].counters["nnz"] > 0
+    fact = report.find("factorize")[0].counters
+    assert fact["factor_nnz"] >= report.find("reduce")[0].counters["nnz_ff"] and fact["fill"] >= 1.0
+    root = report.find("solve_elasticity_t3")[0]
+    assert root.depth == 0 and root.duration <= report.total
+    assert "factorize" in report.summary()
+
+    data = json.loads(report.to_json(tmp_path / "profile.json"))
+    assert len(data["records"]) == len(report.records)
+    trace = report.to_chrome_trace(tmp_path / "trace.json")
+    assert all(e["ph"] == "X" and e["dur"] >= 0 for e in trace["traceEvents"])
+    assert json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+
+def test_profile_context_manager_records_iterations_and_memory():
+    X, T, zero, kw = _problem()
+    with pyfemlite.profile(memory=True) as prof:
+        solve_elasticity_t3(X, T, D_plane_stress(100.0, 0.3), zero, solver="cg", preconditioner="amg", **kw)
+        solve_poisson_t3(X, T, 1.0, lambda x, y: 1.0, boundary=kw["boundary"], dirichlet={"left": lambda x, y: 0.0})
+    report = prof.report()
+    assert [r.name for r in report.records if r.depth == 0] == ["solve_elasticity_t3", "solve_poisson_t3"]
+    cg = report.find("cg")[0]
+    assert cg.counters["iterations"] > 0 and cg.counters["converged"]
+    assert report.find("preconditioner")[0].counters["kind"] == "amg"
+    assert all(r.peak_bytes is not None for r in report.records)
+    assert report.totals()["solve_elasticity_t3"] > 0.0
+
+    # outside a profile block nothing is recorded
+    solve_poisson_t3(X, T, 1.0, lambda x, y: 1.0, boundary=kw["boundary"], dirichlet={"left": lambda x, y: 0.0})
+    assert len(prof.report().records) == len(report.records)
+
+def test_profile_flag_inside_profile_block_records_into_it():
+    X, T, zero, kw = _problem()
+    D = D_plane_stress(100.0, 0.3)
+    with pyfemlite.profile() as prof:
+        solve_poisson_t3(X, T, 1.0, lambda x, y: 1.0 + 0.0 * x, boundary=kw["boundary"],
+                         dirichlet={"left": lambda x, y: 0.0 * x})
+        n_before = len(prof.records)
+        u, report = solve_elasticity_t3(X, T, D, zero, profile=True, **kw)
+    outer = prof.report()
+    assert report.records and report.records == outer.records[n_before:]
+    assert [r.name for r in outer.records].count("solve_elasticity_t3") == 1
+    assert report.find("solve_elasticity_t3")[0].duration <= report.total <= outer.total
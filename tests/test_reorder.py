@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from pyfemlite.mesh import (Mesh, structured_rectangle_tri, compute_node_renumbering, renumber_mesh,
+                            matrix_bandwidth, reordering_report)
+from pyfemlite.mesh.reorder import node_adjacency
+from pyfemlite.fem import solve_elasticity_t3, solve_poisson_t3
+from pyfemlite.fem.materials import D_plane_stress
+
+def _shuffled_mesh():
+    X, T, boundary = structured_rectangle_tri(16, 6, xlim=(0.0, 4.0))
+    p = np.random.default_rng(1).permutation(X.shape[0])
+    inv = np.argsort(p)
+    nodes = {k: inv[v] for k, v in boundary.nodes.items()}
+    edges = {k: inv[v] for k, v in boundary.edges.items()}
+    return X[p], inv[T], type(boundary)(nodes=nodes, edges=edges)
+
+@pytest.mark.parametrize("method", ["rcm", "nd"])
+def test_renumbering_is_a_permutation_and_keeps_geometry(method):
+    X, T, boundary = _shuffled_mesh()
+    X2, T2, b2, r = renumber_mesh(X, T, boundary, method=method)
+    assert np.array_equal(np.sort(r.perm), np.arange(X.shape[0]))
+    assert np.array_equal(X2[T2], X[T])
+    assert np.array_equal(X2[b2.nodes["left"]], X[boundary.nodes["left"]])
+    b2.validate(X2, T2)
+    u = np.arange(2 * X.shape[0], dtype=float)
+    assert np.array_equal(r.to_original(r.to_new(u, 2), 2), u)
+
+def test_rcm_reduces_bandwidth():
+    X, T, _ = _shuffled_mesh()
+    r = compute_node_renumbering(X, T)
+    bw0, prof0 = matrix_bandwidth(node_adjacency(T))
+    bw1, prof1 = matrix_bandwidth(node_adjacency(r.permute_mesh(X, T)[1]))
+    assert bw1 < bw0 / 4 and prof1 < prof0
+
+def test_solvers_return_original_numbering():
+    X, T, boundary = _shuffled_mesh()
+    D = D_plane_stress(1e3, 0.3)
+    kw = dict(boundary=boundary, dirichlet={"left": lambda x, y: (0.0, 0.0)},
+              traction={"right": lambda x, y: (0.0, -1.0)})
+    u0 = solve_elasticity_t3(X, T, D, lambda x, y: (0.0, 0.0), **kw)
+    for method in ("rcm", "nd"):
+        u1 = solve_elasticity_t3(Mesh(X, T), None, D, lambda x, y: (0.0, 0.0), reorder=method, **kw)
+        assert np.allclose(u1, u0, rtol=1e-10, atol=1e-12 * np.abs(u0).max())
+    left = boundary.nodes["left"]
+    p0 = solve_poisson_t3(X, T, 1.0, lambda x, y: 1.0, dirichlet_nodes=left, dirichlet_value_func=lambda x, y: y)
+    p1 = solve_poisson_t3(X, T, 1.0, lambda x, y: 1.0, dirichlet_nodes=left, dirichlet_value_func=lambda x, y: y,
+                          reorder="rcm")
+    assert np.allclose(p0, p1)
+
+def test_reordering_report():
+    X, T, _ = _shuffled_mesh()
+    rep = reordering_report(X, T, dofs_per_node=1)
+    assert [s.method for s in rep.stats] == ["original", "rcm", "nd"]
+    assert rep.stats[1].bandwidth < rep.stats[0].bandwidth
+    assert "rcm: bandwidth x" in rep.summary()
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+from pyfemlite.fem.elasticity2d import solve_elasticity_t3
+from pyfemlite.fem.materials import D_plane_stress
+from pyfemlite.fem.poisson2d import solve_poisson_t3
+from pyfemlite.fem.sweep import ElasticitySweep, material_grid
+from pyfemlite.mesh.structured_tri import structured_rectangle_tri
+from pyfemlite.post import PointLocator
+from pyfemlite.rom import AffineSystem, ReducedModel, greedy_reduced_model, pod_basis, pod_reduced_model
+from pyfemlite.rom.model import _extend_orthonormal
+
+def test_pod_basis_energy_truncation_and_inner_product():
+    rng = np.random.default_rng(0)
+    S = rng.standard_normal((50, 3)) @ np.diag([1.0, 1e-2, 1e-8]) @ rng.standard_normal((3, 20))
+    W, s = pod_basis(S, tol=1e-4)
+    assert W.shape == (50, 2) and np.allclose(W.T @ W, np.eye(2))
+    M = np.diag(rng.uniform(1.0, 2.0, 50))
+    W, _ = pod_basis(S, tol=1e-4, inner=M)
+    assert W.shape == (50, 2) and np.allclose(W.T @ M @ W, np.eye(2))
+    assert pod_basis(S, tol=1e-12, max_rank=1)[0].shape == (50, 1)
+
+def test_extend_orthonormal_skips_zero_and_repeated_snapshots():
+    rng = np.random.default_rng(3)
+    basis = np.linalg.qr(rng.standard_normal((40, 3)))[0]
+    S = rng.standard_normal((40, 3))
+    new = np.column_stack([np.zeros(40), S[:, 0], basis[:, 1], S, S[:, 1]])
+    W = _extend_orthonormal(basis, new, 40)
+    assert W.shape == (40, 6) and np.allclose(W.T @ W, np.eye(6), atol=1e-12)
+    assert np.allclose(W @ (W.T @ S), S)
+
+def test_poisson_regions_pod_model_outputs_and_serialization(tmp_path):
+    X, T, b = structured_rectangle_tri(20, 10, xlim=(0.0, 2.0))
+    right_half = np.flatnonzero(X[T].mean(axis=1)[:, 0] > 1.0)
+    regions = [np.setdiff1d(np.arange(T.shape[0]), right_half), right_half]
+    cases = [{"source": lambda x, y: 1.0 + 0.0 * x}, {"neumann": {"right": lambda x, y: 1.0 + 0.0 * y}},
+             {"dirichlet": {"left": lambda x, y: y}}]
+    system = AffineSystem.from_poisson(X, T, load_cases=cases, regions=regions, boundary=b,
+                                       dirichlet={"left": lambda x, y: 0.0 * x})
+    c, theta = np.array([1.0, 4.0]), np.array([2.0, -1.0, 0.5])
+    kappa = np.where(np.isin(np.arange(T.shape[0]), right_half), c[1], c[0])
+    u_ref = solve_poisson_t3(X, T, kappa, lambda x, y: 2.0 + 0.0 * x, boundary=b,
+                             dirichlet={"left": lambda x, y: 0.5 * y}, neumann={"right": lambda x, y: -1.0 + 0.0 * y})
+    assert np.allclose(system.expand(system.solve(c, theta), theta), u_ref)
+
+    rng = np.random.default_rng(1)
+    C, Theta = rng.uniform(0.5, 5.0, (30, 2)), rng.standard_normal((30, 3))
+    probes = PointLocator(X, T).interpolation_matrix([[1.5, 0.5], [0.5, 0.25]])
+    model = pod_reduced_model(system, C, Theta, c_ref=[1.0, 1.0], tol=1e-8, outputs=probes)
+    u = model.solve(c, theta)
+    assert model.rank < 30 and np.allclose(u, u_ref, rtol=1e-6, atol=1e-6 * np.abs(u_ref).max())
+    assert np.allclose(model.output(c, theta), probes @ u_ref, rtol=1e-6)
+    coarse = ReducedModel.build(system, model.basis[:, :2], c_ref=[1.0, 1.0])
+    err = lambda m: np.sqrt((m.solve(c, theta) - u_ref)[system.partition.free] @
+                            (system.operator(c) @ (m.solve(c, theta) - u_ref)[system.partition.free]))
+    assert coarse.error_indicator(c, theta) > 10 * model.error_indicator(c, theta) and err(coarse) > 10 * err(model)
+
+    model.save(tmp_path / "rom.npz")
+    loaded = ReducedModel.load(tmp_path / "rom.npz")
+    assert np.array_equal(loaded.solve(c, theta), u) and loaded.rank == model.rank
+    with pytest.raises(ValueError):
+        model.solve_reduced([1.0, -50.0], theta)      # indefinite conductivity
+
+def test_elasticity_greedy_model_matches_full_solves():
+    X, T, b = structured_rectangle_tri(40, 4, xlim=(0.0, 10.0))
+    zero = lambda x, y: (0.0, 0.0)
+    sweep = ElasticitySweep(X, T, boundary=b, dirichlet={"left": zero})
+    cases = [{"traction": {"right": lambda x, y: (0.0, -1.0)}}, {"body_force": lambda x, y: (0.0, -1.0)}]
+    system = AffineSystem.from_elasticity(sweep, cases)
+    D_train, _ = material_grid(np.linspace(100.0, 300.0, 4), np.linspace(0.1, 0.45, 4))
+    c_ref = ElasticitySweep.coefficients(D_plane_stress(200.0, 0.3))
+    model, history = greedy_reduced_model(system, ElasticitySweep.coefficients(D_train), c_ref=c_ref, tol=1e-5)
+    assert history[-1]["max_indicator"] <= 1e-5 and model.rank == 2 * len(history)
+    assert all(h1["max_indicator"] > h2["max_indicator"] for h1, h2 in zip(history, history[1:]))
+    D = D_plane_stress(150.0, 0.33)
+    u = model.solve(ElasticitySweep.coefficients(D), [1.0, 0.25])
+    u_ref = solve_elasticity_t3(X, T, D, lambda x, y: (0.0, -0.25), boundary=b, dirichlet={"left": zero},
+                                traction={"right": lambda x, y: (0.0, -1.0)})
+    assert np.abs(u - u_ref).max() < 1e-5 * np.abs(u_ref).max()
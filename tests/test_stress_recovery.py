@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from pyfemlite.mesh import Mesh, structured_rectangle_tri
+from pyfemlite.mesh.quadratic import structured_rectangle_t6
+from pyfemlite.fem import solve_elasticity_t3
+from pyfemlite.fem.materials import D_plane_stress
+from pyfemlite.post import (element_gradients, element_strains, element_stresses, von_mises, nodal_average,
+                            nodal_average_operator, spr_recovery, stress_fields)
+from pyfemlite.io import write_vtu
+
+def test_strains_of_linear_field_are_exact():
+    mesh, _ = structured_rectangle_tri(4, 3, grading=2.0, as_mesh=True)
+    x, y = mesh.X[:, 0], mesh.X[:, 1]
+    u = np.column_stack([0.1 * x + 0.2 * y, 0.3 * x - 0.05 * y]).ravel()
+    eps = element_strains(mesh, None, u)
+    assert np.allclose(eps, [0.1, -0.05, 0.5])
+    D = D_plane_stress(1.0, 0.25)
+    assert np.allclose(element_stresses(eps, D), eps @ D.T)
+    assert np.allclose(element_stresses(eps, np.broadcast_to(D, (mesh.nelem, 3, 3))), eps @ D.T)
+
+def test_t6_gradients_and_recovery_use_quadratic_shape_functions():
+    X, T, _ = structured_rectangle_t6(4, 4)
+    mesh = Mesh(X, T)
+    c = X[T[:, :3]].mean(axis=1)
+    x, y = X[:, 0], X[:, 1]
+    assert np.allclose(element_gradients(mesh, None, x ** 2 + x * y), np.column_stack([2 * c[:, 0] + c[:, 1], c[:, 0]]))
+    u = np.column_stack([x ** 2, x * y]).ravel()
+    assert np.allclose(element_strains(mesh, None, u), np.column_stack([2 * c[:, 0], c[:, 0], c[:, 1]]))
+    f = lambda p: 1.0 + 2.0 * p[:, 0] - 3.0 * p[:, 1]
+    assert np.allclose(spr_recovery(mesh, None, f(c)), f(X), atol=1e-12)
+    assert np.allclose(nodal_average(mesh, None, np.ones(mesh.nelem)), 1.0)
+
+def test_von_mises():
+    assert np.isclose(von_mises(np.array([1.0, 0.0, 0.0])), 1.0)
+    assert np.isclose(von_mises(np.array([0.0, 0.0, 1.0])), np.sqrt(3.0))
+    assert np.isclose(von_mises(np.array([1.0, 1.0, 0.0]), szz=1.0), 0.0)
+
+@pytest.mark.parametrize("diagonal", ["right", "alternate"])
+def test_spr_reproduces_linear_fields(diagonal):
+    mesh, _ = structured_rectangle_tri(8, 6, xlim=(0.0, 2.0), grading=1.5, diagonal=diagonal, as_mesh=True)
+    f = lambda p: np.column_stack([1.0 + 2.0 * p[:, 0] - 3.0 * p[:, 1], p[:, 0]])
+    c = mesh.X[mesh.T].mean(axis=1)
+    assert np.allclose(spr_recovery(mesh, None, f(c)), f(mesh.X), atol=1e-12)
+    avg = nodal_average(mesh, None, f(c))
+    assert np.abs(avg - f(mesh.X)).max() > 1e-2   # plain averaging is not exact on the boundary
+    M = nodal_average_operator(mesh)
+    assert np.allclose(M @ np.ones(mesh.nelem), 1.0)
+
+def test_stress_fields_feed_vtu(tmp_path):
+    X, T, boundary = structured_rectangle_tri(20, 4, xlim=(0.0, 5.0))
+    D = D_plane_stress(1e3, 0.3)
+    u = solve_elasticity_t3(X, T, D, lambda x, y: (0.0, 0.0), boundary=boundary,
+                            dirichlet={"left": lambda x, y: (0.0, 0.0)}, traction={"right": lambda x, y: (0.0, -1.0)})
+    point_data, cell_data = stress_fields(X, T, u, D, recovery="spr")
+    assert point_data["stress"].shape == (X.shape[0], 3) and cell_data["von_mises"].shape == (T.shape[0],)
+    assert np.all(cell_data["von_mises"] >= 0.0)
+    path = write_vtu(tmp_path / "stress.vtu", X, T, point_data, cell_data)
+    text = path.read_bytes()
+    assert b'Name="von_mises"' in text and b'Name="strain"' in text
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from pyfemlite.mesh import structured_rectangle_tri, iter_structured_tri_elements
+from pyfemlite.fem.shape_t3 import t3_areas_and_grads
+
+@pytest.mark.parametrize("diagonal", ["right", "left", "alternate"])
+def test_rectangle_mesh_is_valid_and_covers_domain(diagonal):
+    X, T, boundary = structured_rectangle_tri(5, 3, xlim=(-1.0, 2.0), ylim=(0.0, 0.5),
+                                              grading=(4.0, 0.5), diagonal=diagonal, validate=True)
+    assert T.shape == (30, 3) and T.dtype == np.int32
+    A, _ = t3_areas_and_grads(X, T)   # raises on degenerate elements only (|detJ|)
+    assert abs(A.sum() - 1.5) < 1e-12
+    P = X[T]
+    e1, e2 = P[:, 1] - P[:, 0], P[:, 2] - P[:, 0]
+    assert np.allclose(0.5 * (e1[:, 0] * e2[:, 1] - e1[:, 1] * e2[:, 0]), A)   # counter-clockwise
+    xs = X[boundary.nodes["bottom"], 0]
+    h = np.diff(xs)
+    assert xs[0] == -1.0 and xs[-1] == 2.0
+    assert abs(h[-1] / h[0] - 4.0) < 1e-12
+    assert np.allclose(X[boundary.nodes["top"], 1], 0.5)
+
+def test_chunked_elements_match_full_connectivity():
+    _, T, _ = structured_rectangle_tri(7, 6, diagonal="alternate")
+    blocks = list(iter_structured_tri_elements(7, 6, chunk_size=30, diagonal="alternate"))
+    assert all(b.shape[0] <= 30 for _, b in blocks)
+    assert [start for start, _ in blocks] == list(np.cumsum([0] + [b.shape[0] for _, b in blocks[:-1]]))
+    assert np.array_equal(np.concatenate([b for _, b in blocks]), T)
+
+def test_index_dtype_and_bad_arguments():
+    _, T, _ = structured_rectangle_tri(2, 2, index_dtype=np.int64)
+    assert T.dtype == np.int64
+    with pytest.raises(ValueError):
+        structured_rectangle_tri(20, 20, index_dtype=np.int8)
+    with pytest.raises(ValueError):
+        structured_rectangle_tri(2, 2, diagonal="cross")
+    with pytest.raises(ValueError):
+        structured_rectangle_tri(2, 2, xlim=(1.0, 1.0))
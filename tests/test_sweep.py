@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from pyfemlite.mesh.structured_tri import structured_rectangle_tri
+from pyfemlite.fem.elasticity2d import solve_elasticity_t3
+from pyfemlite.fem.sweep import ElasticitySweep, material_grid
+
+def _cantilever():
+    return structured_rectangle_tri(12, 4, xlim=(0.0, 3.0), ylim=(0.0, 1.0))
+
+def test_sweep_matches_individual_solves():
+    X, T, boundary = _cantilever()
+    zero = lambda x, y: (0.0, 0.0)
+    sweep = ElasticitySweep(X, T, boundary=boundary, dirichlet={"left": zero})
+    cases = [
+        {"traction": {"right": lambda x, y: (0.0, -1.0)}},
+        {"body_force": lambda x, y: (0.3, -0.2 * x)},
+        {"traction": {"top": lambda x, y: (0.5, 0.0)}, "dirichlet": {"left": lambda x, y: (0.0, 0.01 * y)}},
+    ]
+    D, params = material_grid([100.0, 250.0], [0.2, 0.35], plane="strain")
+    assert D.shape == (4, 3, 3) and np.allclose(params[1], (100.0, 0.35))
+    res = sweep.solve(D, cases)
+    assert res.u.shape == (4, 3, 2 * X.shape[0])
+    assert {"setup", "loads", "assemble", "factorize", "solve", "total"} <= set(res.timings)
+    ff, (indices, indptr, shape), fd, _ = sweep.reduced_terms()
+    K_ff, _ = sweep.operator(D[1])
+    assert ff.shape[0] == fd.shape[0] == 6
+    assert np.allclose(sweep.coefficients(D[1]) @ ff, K_ff.data) and np.array_equal(indptr, K_ff.indptr)
+
+    for i, Di in enumerate(D):
+        for j, case in enumerate(cases):
+            u_ref = solve_elasticity_t3(X, T, Di, case.get("body_force", zero), boundary=boundary,
+                                        dirichlet=case.get("dirichlet", {"left": zero}),
+                                        traction=case.get("traction"))
+            assert np.allclose(res.u[i, j], u_ref, rtol=1e-10, atol=1e-12)
+
+def test_sweep_rejects_bad_input():
+    X, T, boundary = _cantilever()
+    zero = lambda x, y: (0.0, 0.0)
+    sweep = ElasticitySweep(X, T, boundary=boundary, dirichlet={"left": zero})
+    with pytest.raises(ValueError):
+        sweep.operator(np.arange(9.0).reshape(3, 3))
+    with pytest.raises(ValueError):
+        sweep.load_vectors([{"dirichlet": {"right": zero}}])
+    with pytest.raises(ValueError):
+        material_grid([1.0], [0.3], plane="shell")
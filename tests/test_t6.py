@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from pyfemlite.mesh import Mesh, build_boundary_from_predicates, extract_boundary_edges
+from pyfemlite.mesh.quadratic import t3_to_t6, structured_rectangle_t6
+from pyfemlite.mesh.structured_tri import structured_rectangle_tri
+from pyfemlite.fem.elasticity2d import solve_elasticity_t3
+from pyfemlite.fem.materials import D_plane_stress
+from pyfemlite.fem.matrix_free import PoissonOperator
+from pyfemlite.fem.poisson2d import solve_poisson_t3
+from pyfemlite.fem.shape_t6 import t6_shape_functions, t6_shape_gradients
+from pyfemlite.fem.sweep import ElasticitySweep
+from pyfemlite.io.vtu import write_vtu
+
+NODES_L = np.array([[1, 0, 0], [0, 1, 0], [0, 0, 1], [.5, .5, 0], [0, .5, .5], [.5, 0, .5]])
+
+def test_shape_functions_are_nodal_and_complete():
+    assert np.allclose(t6_shape_functions(NODES_L), np.eye(6))
+    L = np.random.default_rng(0).dirichlet(np.ones(3), size=5)
+    assert np.allclose(t6_shape_functions(L).sum(axis=1), 1.0)
+    dLdx = np.array([[[-1.0, -1.0], [1.0, 0.0], [0.0, 1.0]]])     # reference triangle
+    G = t6_shape_gradients(L, dLdx)
+    assert G.shape == (1, 5, 6, 2) and np.allclose(G.sum(axis=2), 0.0)
+
+def test_t3_to_t6_mesh_and_boundary():
+    X, T, b = structured_rectangle_tri(4, 2, xlim=(0.0, 2.0))
+    X6, T6, b6 = t3_to_t6(X, T, b)
+    nedge = Mesh(X, T).edges.shape[0]
+    assert X6.shape[0] == X.shape[0] + nedge and T6.shape == (T.shape[0], 6)
+    assert np.allclose(X6[T6[:, 3]], 0.5 * (X6[T6[:, 0]] + X6[T6[:, 1]]))
+    assert np.allclose(X6[T6[:, 5]], 0.5 * (X6[T6[:, 2]] + X6[T6[:, 0]]))
+    b6.validate(X6, T6, strict=True)
+    assert b6.edges["top"].shape == (4, 3) and b6.nodes["top"].size == 9
+    assert np.allclose(X6[b6.nodes["left"], 0], 0.0)
+    rebuilt = build_boundary_from_predicates(X6, T6, {"top": lambda x, y: np.isclose(y, 1.0)})
+    key = lambda E: sorted(map(tuple, np.sort(E[:, :2], axis=1).tolist()))
+    assert key(rebuilt.edges["top"]) == key(b6.edges["top"])
+    assert extract_boundary_edges(T6).shape == (12, 3)
+
+def test_poisson_t6_reproduces_quadratics():
+    u_ex = lambda x, y: x ** 2 + x * y - 2.0 * y ** 2 + 1.0      # -lap(u) = 2
+    X, T, b = structured_rectangle_t6(3, 4, xlim=(0.0, 1.5), ylim=(0.0, 2.0), diagonal="alternate")
+    u = solve_poisson_t3(X, T, 1.0, lambda x, y: 2.0 + 0.0 * x, boundary=b,
+                         dirichlet={"left": u_ex, "bottom": u_ex, "top": u_ex},
+                         neumann={"right": lambda x, y: 2.0 * x + y})     # du/dx on x = 1.5
+    assert np.allclose(u, u_ex(X[:, 0], X[:, 1]), atol=1e-12)
+    with pytest.raises(ValueError):
+        PoissonOperator(X, T, 1.0)
+
+def test_elasticity_t6_accuracy_solvers_and_output(tmp_path):
+    D = D_plane_stress(1000.0, 0.3)
+    zero = lambda x, y: (0.0, 0.0)
+    kw = dict(dirichlet={"left": zero}, traction={"right": lambda x, y: (0.0, -1.0)})
+    def tip(X, T, b, **extra):
+        u = solve_elasticity_t3(X, T, D, zero, boundary=b, **kw, **extra)
+        return u, np.abs(u.reshape(-1, 2)[b.nodes["right"], 1]).max()
+    u6, d6 = tip(*structured_rectangle_t6(20, 2, xlim=(0.0, 10.0)))
+    _, d3 = tip(*structured_rectangle_tri(20, 2, xlim=(0.0, 10.0)))
+    _, ref = tip(*structured_rectangle_t6(80, 8, xlim=(0.0, 10.0)))
+    assert abs(d6 - ref) < 2e-3 * ref and abs(d3 - ref) > 0.3 * ref      # T3 locks in bending
+
+    X, T, b = structured_rectangle_t6(20, 2, xlim=(0.0, 10.0))
+    u_cg, info = solve_elasticity_t3(X, T, D, zero, boundary=b, solver="cg", preconditioner="amg",
+                                     rtol=1e-12, return_info=True, **kw)
+    assert info.converged and np.allclose(u_cg, u6, rtol=1e-7, atol=1e-9 * np.abs(u6).max())
+    assert np.allclose(solve_elasticity_t3(X, T, D, zero, boundary=b, workers=2, chunk_size=7, **kw), u6)
+    assert np.allclose(solve_elasticity_t3(X, T, D, zero, boundary=b, reorder="rcm", **kw), u6)
+    sweep = ElasticitySweep(X, T, boundary=b, dirichlet={"left": zero})
+    res = sweep.solve(D, [{"traction": kw["traction"]}])
+    assert np.allclose(res.u[0, 0], u6)
+
+    path = write_vtu(tmp_path / "t6.vtu", X, T, {"u": u6.reshape(-1, 2)})
+    head = path.read_bytes().split(b"<AppendedData")[0].decode()
+    assert 'NumberOfPoints="%d"' % X.shape[0] in head
+    cells = path.read_bytes().split(b"_", 1)[1]
+    assert bytes([22]) * T.shape[0] in cells
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from pyfemlite.mesh.structured_tri import structured_unit_square_tri
+from pyfemlite.fem.quadrature import triangle_rule
+from pyfemlite.fem.loads import element_load_vectors
+from pyfemlite.fem.shape_t3 import t3_areas_and_grads
+from pyfemlite.fem.poisson2d import solve_poisson_t3
+
+@pytest.mark.parametrize("npts,degree", [(1, 1), (3, 2), (6, 4), (7, 5)])
+def test_triangle_rule_exactness(npts, degree):
+    bary, w = triangle_rule(npts)
+    assert abs(w.sum() - 1.0) < 1e-12
+    assert np.allclose(bary.sum(axis=1), 1.0)
+    # reference triangle (0,0),(1,0),(0,1): int x^i y^j = i! j! / (i+j+2)!, area 1/2
+    x, y = bary[:, 1], bary[:, 2]
+    from math import factorial
+    for i in range(degree + 1):
+        for j in range(degree + 1 - i):
+            exact = factorial(i) * factorial(j) / factorial(i + j + 2)
+            assert abs(0.5 * w @ (x**i * y**j) - exact) < 1e-12
+
+def test_vectorized_and_scalar_sources_agree():
+    X, T, _ = structured_unit_square_tri(5, 4)
+    A, _ = t3_areas_and_grads(X, T)
+    src = lambda x, y: (np.exp(x) * y, 1.0)
+    fv = element_load_vectors(X, T, A, src, ncomp=2, quadrature=6, vectorized=True)
+    fs = element_load_vectors(X, T, A, src, ncomp=2, quadrature=6, vectorized=False)
+    assert fv.shape == (T.shape[0], 6)
+    assert np.allclose(fv, fs)
+    assert abs(fv[:, 1::2].sum() - 1.0) < 1e-12
+
+def test_higher_order_source_quadrature_reduces_mms_error():
+    pi = np.pi
+    u_exact = lambda x, y: np.sin(pi * x) * np.sin(pi * y)
+    f_rhs = lambda x, y: 2 * pi**2 * np.sin(pi * x) * np.sin(pi * y)
+    X, T, boundary = structured_unit_square_tri(8, 8)
+    dirichlet = {g: u_exact for g in ("left", "right", "bottom", "top")}
+    err = []
+    for q in (1, 6):
+        u = solve_poisson_t3(X, T, 1.0, f_rhs, boundary=boundary, dirichlet=dirichlet, volume_quadrature=q)
+        err.append(np.abs(u - u_exact(X[:, 0], X[:, 1])).max())
+    assert err[1] < err[0]
@@ -0,0 +1,72 @@
+import base64
+import re
+import xml.etree.ElementTree as ET
+import zlib
+import numpy as np
+import pytest
+from pyfemlite.mesh.structured_tri import structured_unit_square_tri
+from pyfemlite.io.vtu import write_vtu, PVDWriter
+
+_NP = {"Float32": "<f4", "Float64": "<f8", "Int32": "<i4", "Int64": "<i8", "UInt8": "u1"}
+
+def _payload(buf: bytes, compressed: bool):
+    if not compressed:
+        n = int(np.frombuffer(buf[:8], "<u8")[0])
+        return buf[8:8 + n]
+    nb = int(np.frombuffer(buf[:8], "<u8")[0])
+    hdr = np.frombuffer(buf[:8 * (3 + nb)], "<u8")
+    out, pos = b"", 8 * (3 + nb)
+    for size in hdr[3:]:
+        out += zlib.decompress(buf[pos:pos + int(size)])
+        pos += int(size)
+    return out
+
+def _read(path):
+    raw = path.read_bytes()
+    compressed = b"vtkZLibDataCompressor" in raw[:400]
+    if b"<AppendedData" in raw:
+        head, tail = raw.split(b'<AppendedData encoding="raw">', 1)
+        data = tail[tail.index(b"_") + 1:]
+        root = ET.fromstring(head.decode() + "</VTKFile>")
+    else:
+        root, data = ET.fromstring(raw.decode()), None
+    out = {}
+    for da in root.iter("DataArray"):
+        if data is not None:
+            buf = data[int(da.get("offset")):]
+        elif compressed:
+            text = da.text.strip()
+            nb = int(np.frombuffer(base64.b64decode(text[:12])[:8], "<u8")[0])
+            hlen = 4 * -(-(8 * (3 + nb)) // 3)
+            buf = base64.b64decode(text[:hlen]) + base64.b64decode(text[hlen:])
+        else:
+            buf = base64.b64decode(da.text.strip())
+        arr = np.frombuffer(_payload(buf, compressed), _NP[da.get("type")])
+        out[da.get("Name")] = arr.reshape(-1, int(da.get("NumberOfComponents")))
+    return out
+
+@pytest.mark.parametrize("encoding", ["appended", "base64"])
+@pytest.mark.parametrize("compress", [False, True])
+def test_vtu_roundtrip(tmp_path, encoding, compress):
+    X, T, _ = structured_unit_square_tri(5, 4)
+    U = np.column_stack([X[:, 0], -X[:, 1]])
+    s = np.arange(T.shape[0], dtype=np.float32)
+    path = write_vtu(tmp_path / "m.vtu", X, T, {"U": U}, {"sxx": s, "sig": np.tile(s[:, None], 3)},
+                     encoding=encoding, compress=compress, block_size=256)
+    arrs = _read(path)
+    assert np.array_equal(arrs["Points"][:, :2], X)
+    assert np.array_equal(arrs["connectivity"].reshape(-1, 3), T)
+    assert np.array_equal(arrs["offsets"].ravel(), 3 * np.arange(1, T.shape[0] + 1))
+    assert np.all(arrs["types"] == 5)
+    assert np.array_equal(arrs["U"][:, :2], U) and np.all(arrs["U"][:, 2] == 0)
+    assert np.array_equal(arrs["sxx"].ravel(), s) and arrs["sig"].shape == (T.shape[0], 3)
+
+def test_pvd_collection_is_valid_after_each_step(tmp_path):
+    X, T, _ = structured_unit_square_tri(2, 2)
+    pvd = PVDWriter(tmp_path / "run.pvd")
+    for k in range(3):
+        pvd.write(X, T, time=0.5 * k, point_data={"u": X[:, 0] * k})
+        root = ET.parse(tmp_path / "run.pvd").getroot()
+        files = [d.get("file") for d in root.iter("DataSet")]
+        assert len(files) == k + 1
+        assert all((tmp_path / f).exists() for f in files)